@@ -0,0 +1,53 @@
+"""Benchmark the parsing of the ATOMIC_POSITIONS card of a pw.x input with many atoms.
+
+A synthetic supercell with the requested number of atoms (with `if_pos` flags) is parsed
+one atom at a time with regular expressions, as before the fast path (which is still used
+for cards it does not cover), and with `parse_atomic_positions` returning arrays or lists.
+The wall time and the peak of the memory allocated while parsing are reported.
+
+Usage: `python dev/benchmarks/atomic_positions.py [--atoms 200000]`
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from qe_tools.inputs.base import _parse_atomic_positions_re, parse_atomic_positions
+
+
+def make_input(atoms: int) -> str:
+    """Return the cards of a pw.x input with `atoms` atoms."""
+    rng = random.Random(0)
+    lines = [
+        f"{rng.choice(['Si', 'O', 'Fe1'])} {rng.uniform(0, 80):.10f} "
+        f"{rng.uniform(0, 80):.10f} {rng.uniform(0, 80):.10f} 1 1 {rng.randint(0, 1)}\n"
+        for _ in range(atoms)
+    ]
+    return "ATOMIC_POSITIONS angstrom\n" + "".join(lines) + "K_POINTS gamma\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--atoms", type=int, default=200000)
+    args = parser.parse_args()
+
+    txt = make_input(args.atoms)
+    print(f"ATOMIC_POSITIONS card of {args.atoms} atoms, {len(txt) / 1024**2:.0f} MB")
+
+    for label, function in (
+        ("per atom", _parse_atomic_positions_re),
+        ("arrays", lambda txt: parse_atomic_positions(txt, arrays=True)),
+        ("lists", parse_atomic_positions),
+    ):
+        tracemalloc.start()
+        start = time.perf_counter()
+        function(txt)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+        print(f"{label:<9} {elapsed:.2f} s, peak {peak:.0f} MB allocated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark the band-structure outputs of `PwOutput` with and without `band_arrays`.
+
+A synthetic `data-file-schema.xml` with many k-points is built by repeating the
+`ks_energies` block of one of the test fixtures. For each decoding mode, the script
+reports the time needed to parse the XML and to evaluate the `eigenvalues` output.
+
+Usage: `python dev/benchmarks/band_arrays.py [--nks 10000] [--repeat 5]`
+"""
+
+import argparse
+import re
+import tempfile
+import timeit
+from pathlib import Path
+
+from qe_tools.outputs.pw import PwOutput
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+FIXTURE = (
+    ROOT / "tests" / "outputs" / "fixtures" / "pw" / "nospin" / "data-file-schema.xml"
+)
+
+
+def make_xml(nks: int, path: Path) -> None:
+    """Write a copy of `FIXTURE` with `nks` k-points to `path`."""
+    content = FIXTURE.read_text()
+    blocks = re.findall(r"\s*<ks_energies>.*?</ks_energies>", content, flags=re.DOTALL)
+    repeated = "".join(blocks[index % len(blocks)] for index in range(nks))
+
+    content = content.replace("".join(blocks), repeated)
+    content = re.sub(r"<nks>\d+</nks>", f"<nks>{nks}</nks>", content)
+    path.write_text(content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml = Path(tmp) / "data-file-schema.xml"
+        make_xml(args.nks, xml)
+
+        print(f"nks = {args.nks}, best of {args.repeat}")
+        print(f"{'mode':<24}{'parse (s)':>12}{'eigenvalues (ms)':>20}")
+
+        for xml_mode, band_arrays in [
+            ("validate", False),
+            ("validate", True),
+            ("fast", False),
+            ("fast", True),
+            ("stream", True),
+        ]:
+            parse_time = min(
+                timeit.repeat(
+                    lambda xml_mode=xml_mode, band_arrays=band_arrays: (
+                        PwOutput.from_files(
+                            xml=xml, xml_mode=xml_mode, band_arrays=band_arrays
+                        )
+                    ),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            output = PwOutput.from_files(
+                xml=xml, xml_mode=xml_mode, band_arrays=band_arrays
+            )
+            # The evaluated outputs are memoised: clear them so every repeat decodes
+            access_time = min(
+                timeit.repeat(
+                    lambda output=output: output.get_output("eigenvalues"),
+                    setup=output.clear_cache,
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            label = f"{xml_mode}{' + band_arrays' if band_arrays else ''}"
+            print(f"{label:<24}{parse_time:>12.3f}{access_time * 1e3:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
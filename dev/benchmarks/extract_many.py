@@ -0,0 +1,56 @@
+"""Benchmark extracting many pw.x input files, one at a time and with `extract_many`.
+
+A directory of synthetic pw.x inputs (see `namelists.py`) is extracted with `extract` in
+a loop, and with `extract_many` for the requested numbers of worker processes, writing
+the results to a JSON-lines sink.
+
+Usage: `python dev/benchmarks/extract_many.py [--files 5000] [--workers 1 2 4]`
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from namelists import make_input
+
+from qe_tools.extractors import extract, extract_many
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunksize", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        rng = random.Random(0)
+        paths = []
+        for index in range(args.files):
+            path = Path(directory, f"{index:07d}.in")
+            path.write_text(make_input(rng))
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            extract(str(path), "pw")
+        print(f"extract     {time.perf_counter() - start:.2f} s for {args.files} files")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = extract_many(
+                paths,
+                "pw",
+                workers=workers,
+                chunksize=args.chunksize,
+                sink=Path(directory, "extracted.jsonl"),
+            )
+            assert all(result.ok for result in results)
+            elapsed = time.perf_counter() - start
+            print(f"{workers} worker(s) {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark finding the pw.x runs that changed with `changed_since`, against parsing them.
+
+Copies of a pw.x run of the test fixtures are parsed once with `PwOutput.from_dir`,
+recorded in a `FingerprintIndex` and stored in a `CacheConfig`. A few of the copies are
+then modified, and the time of finding them with `changed_since` is compared with parsing
+every copy again, and with loading every copy from the cache with and without the index
+(which skips reading the files to compute the cache key).
+
+Usage: `python dev/benchmarks/fingerprint_index.py [--runs 500] [--changed 10]`
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from qe_tools.outputs import CacheConfig, FingerprintIndex, PwOutput, changed_since
+
+FIXTURES = Path(__file__).resolve().parents[2] / "tests" / "outputs" / "fixtures" / "pw"
+
+
+def timed(label: str, function) -> None:
+    """Print the wall time of calling `function` once."""
+    start = time.perf_counter()
+    function()
+    print(f"{label:<26} {time.perf_counter() - start:7.3f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--run", default="default_xml_250521")
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--xml-mode", default="fast")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [Path(directory, f"{number:06d}") for number in range(args.runs)]
+        for run in runs:
+            shutil.copytree(FIXTURES / args.run, run)
+        cache = CacheConfig(Path(directory, "cache"), max_bytes=None)
+        index = FingerprintIndex(Path(directory, "index.sqlite"))
+        for run in runs:
+            PwOutput.from_dir(run, xml_mode=args.xml_mode, cache=cache, index=index)
+
+        for run in runs[: args.changed]:
+            with (run / "pw.out").open("a") as handle:
+                handle.write("\n")
+
+        changed: list[Path] = []
+        timed("changed_since", lambda: changed.extend(changed_since(index, runs)))
+        assert changed == runs[: args.changed]
+        timed(
+            "parse all",
+            lambda: [PwOutput.from_dir(run, xml_mode=args.xml_mode) for run in runs],
+        )
+        timed(
+            "cache hit, hashing",
+            lambda: [
+                PwOutput.from_dir(run, xml_mode=args.xml_mode, cache=cache)
+                for run in runs
+            ],
+        )
+        timed(
+            "cache hit, index",
+            lambda: [
+                PwOutput.from_dir(run, xml_mode=args.xml_mode, cache=cache, index=index)
+                for run in runs
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
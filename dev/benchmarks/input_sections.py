@@ -0,0 +1,101 @@
+"""Benchmark parsing the cards of a pw.x input from the text of each card.
+
+A synthetic pw.x input with the requested numbers of atoms and explicit k-points is
+parsed as before the input was split into sections, with every card parser (and those
+`parse_structure` called again for the missing `CELL_PARAMETERS` card) searching the
+whole text, and as `PwInputFile` does now: split once with `split_sections`, and every
+parser reading the text of its card. The parsed cards are checked to be identical.
+
+Usage: `python dev/benchmarks/input_sections.py [--atoms 2000] [--kpoints 20000]`
+"""
+
+import argparse
+import random
+import time
+
+from qe_tools.inputs import (
+    parse_atomic_positions,
+    parse_atomic_species,
+    parse_cell_parameters,
+    parse_namelists,
+    split_sections,
+)
+from qe_tools.inputs.pw import parse_k_points
+
+
+def make_input(atoms: int, kpoints: int) -> str:
+    """Return a pw.x input with `atoms` atoms and `kpoints` explicit k-points."""
+    rng = random.Random(0)
+    positions = "".join(
+        f"Si {rng.uniform(0, 1):.10f} {rng.uniform(0, 1):.10f} {rng.uniform(0, 1):.10f}\n"
+        for _ in range(atoms)
+    )
+    points = "".join(
+        f"{rng.uniform(0, 1):.8f} {rng.uniform(0, 1):.8f} {rng.uniform(0, 1):.8f} 1.0\n"
+        for _ in range(kpoints)
+    )
+    return (
+        "&CONTROL\n  calculation = 'bands'\n/\n"
+        f"&SYSTEM\n  ibrav = 2, celldm(1) = 10.2, nat = {atoms}, ntyp = 1\n"
+        "  ecutwfc = 30.0\n/\n"
+        "&ELECTRONS\n/\n"
+        "ATOMIC_SPECIES\nSi 28.0855 Si.pbe-rrkj.UPF\n"
+        f"ATOMIC_POSITIONS crystal\n{positions}"
+        f"K_POINTS crystal\n{kpoints}\n{points}"
+    )
+
+
+def parse_whole_text(txt):
+    """Parse every card from the whole text, as before `split_sections`."""
+    parse_cell_parameters(txt)  # again by `parse_structure`, as the card is missing
+    return (
+        parse_namelists(txt),
+        parse_atomic_positions(txt),
+        parse_cell_parameters(txt),
+        parse_atomic_species(txt),
+        parse_k_points(txt),
+    )
+
+
+def parse_sections(txt):
+    """Parse every card from its own text."""
+    namelists, cards = split_sections(txt)
+    return (
+        parse_namelists(namelists),
+        parse_atomic_positions(cards["ATOMIC_POSITIONS"][1]),
+        None,
+        parse_atomic_species(cards["ATOMIC_SPECIES"][1]),
+        parse_k_points(cards["K_POINTS"][1]),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--atoms", type=int, default=2000)
+    parser.add_argument("--kpoints", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    txt = make_input(args.atoms, args.kpoints)
+    print(f"{args.atoms} atoms, {args.kpoints} k-points, {len(txt) / 1024:.0f} kB")
+    assert parse_whole_text(txt) == parse_sections(txt)
+
+    timings = {}
+    for label, function in (
+        ("whole text", parse_whole_text),
+        ("sections", parse_sections),
+    ):
+        # The best of a few repetitions, to limit the noise of other processes
+        elapsed = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            function(txt)
+            elapsed.append(time.perf_counter() - start)
+        timings[label] = min(elapsed)
+        print(f"{label:<11} {timings[label] * 1000:.1f} ms")
+
+    print(f"speed-up    {timings['whole text'] / timings['sections']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
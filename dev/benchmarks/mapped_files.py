@@ -0,0 +1,70 @@
+"""Benchmark the peak memory of parsing a large dos.x file, as text and memory-mapped.
+
+A synthetic spin-polarised `.dos` file of the requested size is parsed by `DosParser` in a
+fresh process for each path: from its content (the text path of `parse_from_file` for
+small files) and from a memory map (the path taken from `MMAP_THRESHOLD` on). The peak
+resident set size of each process is reported.
+
+Usage: `python dev/benchmarks/mapped_files.py [--size-mb 250]`
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+HEADER = "#  E (eV)   dosup(E)   dosdw(E)  Int dos(E) EFermi =    5.123 eV\n"
+
+PARSE = """
+import resource, sys, time
+from qe_tools.outputs.parsers.dos import DosParser
+
+DosParser.mmap_threshold = {threshold}
+start = time.perf_counter()
+parsed = DosParser.parse_from_file(sys.argv[1])
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(f"{{elapsed:.2f}} s, peak RSS {{peak:.0f}} MB ({{len(parsed['energy'])}} energies)")
+"""
+
+
+def make_dos(size_mb: int, path: Path) -> None:
+    """Write a `.dos` file of roughly `size_mb` megabytes to `path`."""
+    rows = size_mb * 1024 * 1024 // 42
+    energy = np.linspace(-20, 20, rows)
+    table = np.column_stack(
+        [energy, np.abs(np.sin(energy)), np.abs(np.cos(energy)), 2 * energy]
+    )
+    with path.open("w") as handle:
+        handle.write(HEADER)
+        np.savetxt(handle, table, fmt="%7.3f %.4E %.4E %.4E")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=250)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "prefix.dos"
+        make_dos(args.size_mb, path)
+        print(f".dos file of {path.stat().st_size / 1024**2:.0f} MB")
+
+        for label, threshold in (("text", 2**63), ("memory map", 1)):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-c", PARSE.format(threshold=threshold), str(path)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            total = time.perf_counter() - start
+            print(f"{label:<12} {result.stdout.strip()}, process {total:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
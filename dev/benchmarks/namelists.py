@@ -0,0 +1,257 @@
+"""Benchmark `parse_namelists` on a corpus of pw.x input files.
+
+A corpus of synthetic pw.x inputs with typical namelists (about 40 parameters, comments,
+per-species arrays such as `starting_magnetization(1)`, Fortran `d` exponents) and
+structures of a few to a hundred atoms is parsed with the previous implementation of
+`parse_namelists`, which compiled its regular expressions for every input (and those of
+`_str2val` for every value) and stripped the comments one character at a time, and with
+the current one, with and without the cache of `_str2val`. The results of both are checked
+to be identical, including on the input files of the test suite.
+
+Usage: `python dev/benchmarks/namelists.py [--files 10000] [--repeat 3]`
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from unittest import mock
+
+from qe_tools.exceptions import ParsingError
+from qe_tools.inputs import base, parse_namelists
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+TEST_INPUTS = sorted((ROOT / "tests" / "data").glob("*.in"))
+
+
+def reference_str2val(valstr):
+    """`_str2val` before the regular expressions were compiled once."""
+    float_re = re.compile(
+        r"""
+        [-+]?                 # optional sign
+        (?:                   # either
+         \d*[\.]\d+            # 10.53 or .53
+         |                    # or
+         \d+[\.]?\d* )          # 10.53 or 10. or 10
+        (?:[dEeE][-+]?[0-9]+)?  # optional exponent
+        """,
+        re.X,
+    )
+    valstr = valstr.strip()
+    re_fn_tuple = (
+        (re.compile(r"[.](true|t)[.]", re.I), lambda _: True),
+        (re.compile(r"[.](false|f)[.]", re.I), lambda _: False),
+        (float_re, lambda s: float(s.replace("d", "e").replace("D", "E"))),
+        (re.compile(r"[-+]?\d+$"), int),
+        (re.compile(r"""['"].*['"]"""), lambda s: str(s.strip("'\""))),
+    )
+    val = None
+    for regex, conversion_fn in re_fn_tuple:
+        if regex.match(valstr):
+            try:
+                val = conversion_fn(valstr)
+            except ValueError as error:
+                raise ValueError(f"Error converting {valstr!r} to a value") from error
+    if val is None:
+        raise ValueError(
+            f"Unable to convert {valstr} to a python variable.\n"
+            "NOTE: Support for algebraic expressions is not yet implemented."
+        )
+    return val
+
+
+def reference_strip_comment(string):
+    """`_strip_comment` before it was done with a regular expression."""
+    new_string = []
+    in_string = False
+    string_quote = None
+    for char in string:
+        if in_string and char == string_quote:
+            in_string = False
+            string_quote = None
+        elif not in_string and char in ('"', "'"):
+            in_string = True
+            string_quote = char
+        if not in_string and char == "!":
+            return "".join(new_string)
+        new_string.append(char)
+    if in_string:
+        raise ValueError(
+            f"String >>{string}<< is not closed, it was open with the {string_quote} char"
+        )
+    return string
+
+
+def reference_parse_namelists(txt):
+    """`parse_namelists` before the compiled tokenizer."""
+    namelist_re = re.compile(
+        r"""
+        ^ [ \t]* &(\S+) [ \t]* $\n  # match line w/ nmlst tag; save nmlst name
+        (
+         [\S\s]*?                # match any line non-greedily
+        )                        # save the group of text between nmlst
+        ^ [ \t]* / [ \t]* $\n    # match line w/ "/" as only non-whitespace char
+        """,
+        re.M | re.X,
+    )
+    key_value_re = re.compile(
+        r"""
+        [ \t]* (\S+?) [ \t]*  # match and store key
+        =               # equals sign separates key and value
+        [ \t]* (\S+?) [ \t]*  # match and store value
+        [\n,]           # return or comma separates "key = value" pairs
+        """,
+        re.M | re.X,
+    )
+    params_dict = {}
+    for nmlst, blockstr in namelist_re.findall(txt):
+        nmlst_dict = {}
+        blocklines = [
+            f"{reference_strip_comment(line)}\n" for line in blockstr.splitlines()
+        ]
+        for blockline in blocklines:
+            for key, valstr in key_value_re.findall(blockline):
+                if key.lower() in nmlst_dict:
+                    raise ValueError(
+                        f"Key {key.lower()} found more than once in namelist {nmlst}"
+                    )
+                nmlst_dict[key.lower()] = reference_str2val(valstr)
+        if len(nmlst_dict.keys()) > 0:
+            params_dict[nmlst.upper()] = nmlst_dict
+    if len(params_dict) == 0:
+        raise ParsingError(
+            "No data was found while parsing the namelist in the following text\n" + txt
+        )
+    return params_dict
+
+
+def make_input(rng: random.Random) -> str:
+    """Return a synthetic pw.x input file."""
+    species = rng.sample(
+        ["Si", "O", "Fe", "Ni", "Mg", "Al", "Ga", "As"], rng.randint(1, 4)
+    )
+    nat = rng.randint(2, 100)
+    magnetization = "".join(
+        f"    starting_magnetization({index}) = {rng.uniform(-1, 1):.2f}\n"
+        for index in range(1, len(species) + 1)
+    )
+    hubbard = "".join(
+        f"    hubbard_u({index}) = {rng.uniform(0, 5):.1f}d0\n"
+        for index in range(1, len(species) + 1)
+    )
+    species_lines = "".join(
+        f"{name} 1.0 {name}.pbe-n-kjpaw_psl.1.0.0.UPF\n" for name in species
+    )
+    positions = "".join(
+        f"{rng.choice(species)} {rng.uniform(0, 9):.8f} {rng.uniform(0, 9):.8f} "
+        f"{rng.uniform(0, 9):.8f}\n"
+        for _ in range(nat)
+    )
+    return f"""&CONTROL
+    calculation = '{rng.choice(["scf", "relax", "vc-relax", "nscf"])}'
+    prefix = 'aiida', outdir = './out/'
+    pseudo_dir = '/home/user/calculations/pseudopotentials/SSSP_1.3_PBE_efficiency/'
+    tprnfor = .true.
+    tstress = .true.
+    verbosity = 'high' ! print everything
+    etot_conv_thr = {rng.uniform(1, 9):.1f}d-5
+    forc_conv_thr = {rng.uniform(1, 9):.1f}d-4
+    max_seconds = {rng.randint(1000, 90000)}
+    disk_io = 'low'
+/
+&SYSTEM
+    ibrav = 0
+    nat = {nat}
+    ntyp = {len(species)}
+    ecutwfc = {rng.choice([30, 40, 45, 50, 60])}.0
+    ecutrho = {rng.choice([240, 320, 360, 480])}.0
+    occupations = 'smearing', smearing = 'cold'
+    degauss = {rng.uniform(0.005, 0.03):.4f}
+    nspin = 2
+{magnetization}    lda_plus_u = .false.
+{hubbard}    nosym = .false. ! 'symmetry' is kept
+/
+&ELECTRONS
+    conv_thr = {rng.uniform(1, 9):.1f}d-10
+    mixing_beta = {rng.choice([0.3, 0.4, 0.5, 0.7])}
+    electron_maxstep = {rng.randint(50, 200)}
+    diagonalization = 'david'
+    startingwfc = 'atomic+random'
+/
+&IONS
+    ion_dynamics = 'bfgs'
+/
+&CELL
+    cell_dynamics = 'bfgs'
+    press_conv_thr = 0.5
+/
+ATOMIC_SPECIES
+{species_lines}
+ATOMIC_POSITIONS angstrom
+{positions}
+CELL_PARAMETERS angstrom
+9.0 0.0 0.0
+0.0 9.0 0.0
+0.0 0.0 9.0
+K_POINTS automatic
+4 4 4 0 0 0
+"""
+
+
+def parse_all(function, corpus: list[str]) -> None:
+    """Parse every input of `corpus` with `function`."""
+    for text in corpus:
+        function(text)
+
+
+def parse_all_uncached(function, corpus: list[str]) -> None:
+    """Parse every input of `corpus` with `function`, without the cache of `_str2val`."""
+    with mock.patch.object(base, "_str2val", base._str2val.__wrapped__):
+        parse_all(function, corpus)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    corpus = [make_input(rng) for _ in range(args.files)]
+
+    for text in [path.read_text() for path in TEST_INPUTS] + corpus[:100]:
+        try:
+            expected = reference_parse_namelists(text)
+        except (ValueError, ParsingError) as exception:
+            expected = repr(exception)
+        try:
+            result = parse_namelists(text)
+        except (ValueError, ParsingError) as exception:
+            result = repr(exception)
+        assert result == expected, text
+
+    # The current implementation is also timed without the cache of `_str2val`, whose
+    # hits account for part of the speed-up
+    runs = {
+        "previous": lambda: parse_all(reference_parse_namelists, corpus),
+        "current": lambda: parse_all(parse_namelists, corpus),
+        "uncached": lambda: parse_all_uncached(parse_namelists, corpus),
+    }
+    # The best of a few repetitions, interleaved to limit the noise of other processes
+    elapsed: dict[str, list[float]] = {label: [] for label in runs}
+    for _ in range(args.repeat):
+        for label, run in runs.items():
+            start = time.perf_counter()
+            run()
+            elapsed[label].append(time.perf_counter() - start)
+    timings = {label: min(times) for label, times in elapsed.items()}
+    for label, timing in timings.items():
+        print(f"{label:<9} {timing:.3f} s for {len(corpus)} files")
+
+    for label in ("current", "uncached"):
+        print(f"speed-up  {timings['previous'] / timings[label]:.1f}x ({label})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark parsing pw.x runs with `PwOutput.from_dir`, without and with a cache hit.
+
+Every pw.x run of the test fixtures is parsed with the given `xml_mode`, then stored in a
+temporary `CacheConfig` and loaded from it. The best time of a few repetitions is
+reported for each run, and the cached `raw_outputs` are checked to be identical.
+
+Usage: `python dev/benchmarks/output_cache.py [--xml-mode validate] [--repeat 5]`
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from qe_tools.outputs import CacheConfig, PwOutput
+
+FIXTURES = Path(__file__).resolve().parents[2] / "tests" / "outputs" / "fixtures" / "pw"
+
+
+def best_time(function, repeat: int) -> float:
+    """Return the best wall time of `repeat` calls of `function`, in milliseconds."""
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--xml-mode", default="validate")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CacheConfig(directory)
+        totals = [0.0, 0.0]
+        for run in sorted(path for path in FIXTURES.iterdir() if path.is_dir()):
+            reference = PwOutput.from_dir(run, xml_mode=args.xml_mode)
+            PwOutput.from_dir(run, xml_mode=args.xml_mode, cache=cache)
+            cached = PwOutput.from_dir(run, xml_mode=args.xml_mode, cache=cache)
+            np.testing.assert_equal(cached.raw_outputs, reference.raw_outputs)
+
+            timings = [
+                best_time(
+                    lambda: PwOutput.from_dir(run, xml_mode=args.xml_mode), args.repeat
+                ),
+                best_time(
+                    lambda: PwOutput.from_dir(run, xml_mode=args.xml_mode, cache=cache),
+                    args.repeat,
+                ),
+            ]
+            totals = [total + timing for total, timing in zip(totals, timings)]
+            print(
+                f"{run.name:<20} parse {timings[0]:6.1f} ms, hit {timings[1]:5.1f} ms"
+            )
+
+    print(f"{'total':<20} parse {totals[0]:6.1f} ms, hit {totals[1]:5.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
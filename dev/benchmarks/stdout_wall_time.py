@@ -0,0 +1,83 @@
+"""Benchmark the extraction of the wall time from a large pw.x stdout.
+
+A synthetic stdout of the requested size is built by repeating MD-step lines between
+the header and the timing summary of one of the test fixtures. The script compares the
+original backtracking regular expression on the full content with `BaseStdoutParser`,
+both on the content and from the file (which only reads its start and end), and
+`PwStdoutParser` with and without its body.
+
+Usage: `python dev/benchmarks/stdout_wall_time.py [--size-mb 500]`
+"""
+
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from qe_tools.outputs.parsers.pw import PwStdoutParser
+from qe_tools.outputs.parsers.stdout import BaseStdoutParser
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+FIXTURE = ROOT / "tests" / "outputs" / "fixtures" / "pw" / "nospin" / "pw.out"
+
+MD_STEP = (
+    "     total cpu time spent up to now is        1.2 secs\n"
+    "     Ekin + Etot (const)   =     -93.45310000 Ry\n"
+    "     temperature           =     300.00000000 K \n"
+)
+
+
+def make_stdout(size_mb: int, path: Path) -> None:
+    """Write a pw.x stdout of roughly `size_mb` megabytes to `path`."""
+    head, summary = FIXTURE.read_text().split("     init_run     :", 1)
+    block = MD_STEP * 1000
+
+    with path.open("w") as handle:
+        handle.write(head)
+        for _ in range(size_mb * 1024 * 1024 // len(block)):
+            handle.write(block)
+        handle.write("     init_run     :" + summary)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "pw.out"
+        make_stdout(args.size_mb, path)
+
+        read_time, content = timed(path.read_text)
+        print(f"stdout of {len(content) / 1024**2:.0f} MB, read in {read_time:.2f} s")
+
+        regex_time, match = timed(
+            lambda: re.search(
+                r"PWSCF\s+:[\s\S]+CPU\s+(?P<wall_time>[\s.\dsmdh]+)\sWALL", content
+            )
+        )
+        parse_time, parsed = timed(lambda: BaseStdoutParser.parse(content))
+        file_time, from_file = timed(lambda: BaseStdoutParser.parse_from_file(path))
+
+        pw_time, _ = timed(lambda: PwStdoutParser.parse_from_file(path))
+        pw_head_tail_time, pw_head_tail = timed(
+            lambda: PwStdoutParser.parse_from_file(path, body=False)
+        )
+
+        assert parsed == from_file == pw_head_tail
+        print(f"original regex:          {regex_time:8.4f} s ({match['wall_time']!r})")
+        print(f"BaseStdoutParser.parse:  {parse_time:8.4f} s")
+        print(f"parse_from_file:         {file_time:8.4f} s  -> {from_file}")
+        print(f"pw.x, body:              {pw_time:8.4f} s")
+        print(f"pw.x, body=False:        {pw_head_tail_time:8.4f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Fan a function out over many items with a process pool, streaming the results back."""
+
+from __future__ import annotations
+
+import os
+import traceback
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Any, TypeVar
+
+__all__ = ("imap_unordered",)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _format_error(exception: BaseException) -> str:
+    return "".join(traceback.format_exception(exception)).rstrip()
+
+
+def _run_chunk(
+    function: Callable[[Any], Any], chunk: list[Any]
+) -> list[tuple[Any, str | None]]:
+    """Apply `function` to every item of `chunk`, capturing failures as formatted tracebacks.
+
+    Exceptions are formatted in the worker, since they are not always picklable.
+    """
+    results: list[tuple[Any, str | None]] = []
+
+    for item in chunk:
+        try:
+            results.append((function(item), None))
+        except Exception as exception:  # noqa: BLE001 - reported to the caller
+            results.append((None, _format_error(exception)))
+
+    return results
+
+
+def _outcomes(
+    future: Future, chunk: list[Any]
+) -> Iterator[tuple[Any, Any, str | None]]:
+    """Yield the `(item, result, error)` tuples of a finished `future` of `_run_chunk`."""
+    try:
+        outcomes = future.result()
+    except Exception as exception:  # noqa: BLE001 - e.g. a crashed worker
+        error = _format_error(exception)
+        outcomes = [(None, error)] * len(chunk)
+    for item, (result, item_error) in zip(chunk, outcomes):
+        yield item, result, item_error
+
+
+def imap_unordered(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int | None = None,
+    chunksize: int = 1,
+) -> Iterator[tuple[T, R | None, str | None]]:
+    """Apply `function` to `items` in a process pool, yielding results as they complete.
+
+    Yields `(item, result, error)` tuples, in completion order. When `function` raises for
+    an item, `result` is `None` and `error` is the formatted traceback; the remaining
+    items are still processed. When a worker process dies (e.g. killed for lack of
+    memory), every chunk in flight fails with it, and the remaining items are processed
+    in a new pool.
+
+    :param function: picklable callable, e.g. a module-level function or a
+        `functools.partial` of one.
+    :param workers: number of worker processes; defaults to `os.cpu_count()`. With
+        `workers=1`, the items are processed in the current process.
+    :param chunksize: number of items sent to a worker at once. Larger chunks reduce the
+        inter-process overhead for many small items.
+    """
+    if chunksize < 1:
+        raise ValueError(f"`chunksize` must be a positive integer, got {chunksize}.")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    iterator = iter(items)
+    chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+
+    if workers <= 1:
+        for chunk in chunks:
+            for item, (result, error) in zip(chunk, _run_chunk(function, chunk)):
+                yield item, result, error
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending: dict[Future, list[T]] = {}
+
+    def submit(count: int) -> bool:
+        """Submit up to `count` chunks, returning whether the pool is still usable."""
+        for chunk in islice(chunks, count):
+            try:
+                future = executor.submit(_run_chunk, function, chunk)
+            except BrokenProcessPool as exception:
+                # Broken by a worker that died since the last results
+                future = Future()
+                future.set_exception(exception)
+                pending[future] = chunk
+                return False
+            pending[future] = chunk
+        return True
+
+    try:
+        # Keep a bounded number of chunks in flight, so that results of a slow consumer
+        # do not pile up and `items` can be a lazy iterable
+        broken = not submit(2 * workers)
+
+        while pending or broken:
+            if broken:
+                # The chunk of the dead worker cannot be told apart from the other chunks
+                # in flight, which all fail with the pool: report them, and go on with a
+                # new pool
+                wait(pending)
+                for future, chunk in pending.items():
+                    yield from _outcomes(future, chunk)
+                pending.clear()
+                executor.shutdown()
+                executor = ProcessPoolExecutor(max_workers=workers)
+                broken = not submit(2 * workers)
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                if isinstance(future.exception(), BrokenProcessPool):
+                    broken = True
+                yield from _outcomes(future, chunk)
+            if not broken:
+                broken = not submit(len(done))
+    finally:
+        executor.shutdown()
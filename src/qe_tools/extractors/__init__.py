@@ -1,5 +1,12 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import json
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
+from qe_tools._parallel import imap_unordered
 from qe_tools.exceptions import PathIsNotAFileError
 from qe_tools.inputs import CpInputFile, PwInputFile
 
@@ -52,3 +59,93 @@ def extract(filepath: str, parser: str) -> dict:
         return CpInputFile(input_str).as_dict()
 
     raise ValueError(f"Supported parsers: {SUPPORTED_PARSERS}; given: '{parser}'")
+
+
+@dataclasses.dataclass(frozen=True)
+class ExtractResult:
+    """Outcome of extracting one input file with `extract_many`."""
+
+    path: Path
+    """Path of the input file."""
+
+    data: dict | None = None
+    """The parsed input as a dictionary, or `None` if the extraction failed."""
+
+    error: str | None = None
+    """Formatted traceback of the exception raised while extracting, if any."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the input file was extracted successfully."""
+        return self.error is None
+
+
+def _extract(parser: str, path: Path) -> dict:
+    return extract(str(path), parser)
+
+
+def extract_many(
+    paths: Iterable[str | Path],
+    parser: str,
+    *,
+    workers: int | None = None,
+    chunksize: int = 64,
+    sink: str | Path | None = None,
+) -> Iterator[ExtractResult]:
+    """Extract many QE input files, spread over a pool of worker processes.
+
+    Results are yielded in the order in which the files finish extracting (use
+    `ExtractResult.path` to match them). A file that fails to extract yields a result
+    with the `error` instead of stopping the batch.
+
+    Parameters
+    ----------
+    `paths` : `Iterable[str | Path]`
+        The paths to the files; may be a lazy iterable.
+    `parser` : `str`
+        The QE parser type. Supported: ['PW', 'CP']
+    `workers` : `int | None`
+        The number of worker processes, defaults to the number of CPUs. With
+        `workers=1` the files are extracted in the current process.
+    `chunksize` : `int`
+        The number of files sent to a worker at once.
+    `sink` : `str | Path | None`
+        A JSON-lines file to which every result is also written, as an object with
+        the `path`, `data` and `error` keys.
+
+    Yields
+    ------
+    `ExtractResult`
+        The outcome of extracting each file.
+
+    Raises
+    ------
+    `ValueError`
+        If the parser type is not supported.
+    """
+    parser = parser.upper()
+    if parser not in SUPPORTED_PARSERS:
+        raise ValueError(f"Supported parsers: {SUPPORTED_PARSERS}; given: '{parser}'")
+
+    results = (
+        ExtractResult(path, data=data, error=error)
+        for path, data, error in imap_unordered(
+            functools.partial(_extract, parser),
+            (Path(path) for path in paths),
+            workers=workers,
+            chunksize=chunksize,
+        )
+    )
+    if sink is None:
+        yield from results
+        return
+
+    with Path(sink).open("w", encoding="utf-8") as handle:
+        for result in results:
+            record = {
+                "path": str(result.path),
+                "data": result.data,
+                "error": result.error,
+            }
+            handle.write(json.dumps(record) + "\n")
+            yield result
@@ -6,6 +6,7 @@ from qe_tools.inputs.base import (
     parse_cell_parameters,
     parse_namelists,
     parse_structure,
+    split_sections,
 )
 from qe_tools.inputs.cp import CpInputFile
 from qe_tools.inputs.pw import PwInputFile
@@ -18,6 +19,7 @@ __all__ = (
     "parse_atomic_species",
     "parse_namelists",
     "parse_structure",
+    "split_sections",
     "CpInputFile",
     "PwInputFile",
 )
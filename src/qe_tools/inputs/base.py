@@ -4,6 +4,7 @@ Tools for parsing QE PW input files.
 
 from __future__ import annotations
 
+import functools
 import re
 from collections.abc import Iterable
 
@@ -39,6 +40,9 @@ class BaseInputFile:
     """
     Class used for parsing Quantum Espresso pw.x input files and using the info.
 
+    The namelists are parsed when the class is created, the cards and the ``structure``
+    the first time they are accessed (or right away with ``eager=True``).
+
     Members:
 
     * ``namelists``:
@@ -153,7 +157,9 @@ class BaseInputFile:
 
     """
 
-    def __init__(self, content, *, qe_version=None, validate_species_names=True):
+    def __init__(
+        self, content, *, qe_version=None, validate_species_names=True, eager=False
+    ):
         """
         Parse inputs's namelist and cards to create attributes of the info.
 
@@ -174,6 +180,11 @@ class BaseInputFile:
             from the pseudopotential file name.
         :type validate_species_names: bool
 
+        :param eager: A boolean flag (default: False) to parse the cards and the
+            structure right away, and so raise their parsing errors, instead of the
+            first time they are accessed.
+        :type eager: bool
+
         :raises TypeError: if ``content`` is not a string.
 
         :raises qe_tools.utils.exceptions.ParsingError: if there are issues
@@ -194,21 +205,70 @@ class BaseInputFile:
         # Add a newline, as a partial fix to #15
         self.content += "\n"
 
-        # Parse the namelists.
+        # Parse the namelists. The cards are only split from the content and parsed when
+        # they are accessed, unless `eager` is set.
         self.namelists = parse_namelists(self.content)
-        # Parse the ATOMIC_POSITIONS card.
-        self.atomic_positions = parse_atomic_positions(self.content)
-        # Parse the CELL_PARAMETERS card.
-        self.cell_parameters = parse_cell_parameters(self.content)
-        # Parse the ATOMIC_SPECIES card.
-        self.atomic_species = parse_atomic_species(
-            self.content, validate_species_names=validate_species_names
+        self._validate_species_names = validate_species_names
+        if eager:
+            for name in self._card_attributes:
+                getattr(self, name)
+
+    # The attributes parsed from the cards, in the order in which they are parsed by `eager`
+    _card_attributes: tuple[str, ...] = (
+        "_atomic_positions",
+        "cell_parameters",
+        "atomic_species",
+        "structure",
+    )
+
+    @functools.cached_property
+    def _cards(self) -> dict:
+        """The cards of the content, as returned by `split_sections`."""
+        return split_sections(self.content)[1]
+
+    def _card_text(self, name, required=True):
+        """
+        Return the text of the card ``name``. If it is not found, return the whole
+        content for the parser of a ``required`` card to report it, or an empty string.
+        """
+        if name in self._cards:
+            return self._cards[name][1]
+        return self.content if required else ""
+
+    @functools.cached_property
+    def _atomic_positions(self) -> dict:
+        """The ATOMIC_POSITIONS card, with the positions and fixed coordinates as arrays."""
+        return parse_atomic_positions(self._card_text("ATOMIC_POSITIONS"), arrays=True)
+
+    @functools.cached_property
+    def atomic_positions(self) -> dict:
+        """The ATOMIC_POSITIONS card, with the positions and fixed coordinates as lists."""
+        return {
+            **self._atomic_positions,
+            "positions": self._atomic_positions["positions"].tolist(),
+            "fixed_coords": self._atomic_positions["fixed_coords"].tolist(),
+        }
+
+    @functools.cached_property
+    def cell_parameters(self) -> dict | None:
+        """The CELL_PARAMETERS card, or None if it is not present."""
+        return parse_cell_parameters(self._card_text("CELL_PARAMETERS", required=False))
+
+    @functools.cached_property
+    def atomic_species(self) -> dict:
+        """The ATOMIC_SPECIES card."""
+        return parse_atomic_species(
+            self._card_text("ATOMIC_SPECIES"),
+            validate_species_names=self._validate_species_names,
         )
 
-        self.structure = parse_structure(
-            txt=self.content,
+    @functools.cached_property
+    def structure(self) -> dict:
+        """The structure, as returned by `parse_structure`."""
+        # All the parts of the structure are parsed, the content is not needed
+        return parse_structure(
             namelists=self.namelists,
-            atomic_positions=self.atomic_positions,
+            atomic_positions=self._atomic_positions,
             atomic_species=self.atomic_species,
             cell_parameters=self.cell_parameters,
             qe_version=self.qe_version,
@@ -221,10 +281,167 @@ class BaseInputFile:
         }
 
 
+# The cards of the pw.x and cp.x input files.
+CARD_NAMES = (
+    "ADDITIONAL_K_POINTS",
+    "ATOMIC_FORCES",
+    "ATOMIC_POSITIONS",
+    "ATOMIC_SPECIES",
+    "ATOMIC_VELOCITIES",
+    "AUTOPILOT",
+    "CELL_PARAMETERS",
+    "CONSTRAINTS",
+    "HUBBARD",
+    "K_POINTS",
+    "OCCUPATIONS",
+    "PLOT_WANNIER",
+    "REF_CELL_PARAMETERS",
+    "SOLVENTS",
+)
+
+# The lines that start or end a section of an input file, in a text prefixed with a
+# newline: the first line of a namelist, the `/` line that closes it (as in `_NAMELIST_RE`)
+# and the header of a card, with the rest of the line as its options. As for
+# `_NAMELIST_RE`, the search only stops at newlines, and the lookahead skips the lines of
+# numbers of the cards at once.
+_SECTION_RE = re.compile(
+    rf"""
+    \n [ \t]* (?=[&/A-Za-z])
+    (?:
+        (?P<namelist> & \S+ ) [ \t]* (?=\n)
+        |
+        (?P<end> / ) [ \t]* (?=\n)
+        |
+        (?P<card> (?i:{"|".join(CARD_NAMES)}) ) (?P<options> .* )
+    )
+    """,
+    re.X,
+)
+_CARD_OPTIONS_RE = re.compile(r"[\s{}()]*([^\s{}()]+)")
+
+
+def split_sections(txt):
+    """
+    Split txt into its namelists and cards, in a single pass over the text.
+
+    A namelist goes from its ``&name`` line to the first ``/`` line, and a card from its
+    header to the next card or namelist. Only the first occurrence of each card is kept,
+    as the card parsers only read the first one.
+
+    :param txt: A single string containing the QE input text to be split.
+    :type txt: str
+
+    :returns: A tuple with the text of the namelists and a dictionary of the cards. The
+        keys of the dictionary are the upper-case names of the cards, and the values
+        tuples with the options of the card header (e.g. ``'angstrom'`` for
+        ``ATOMIC_POSITIONS {angstrom}``, or None) and the text of the card, header
+        included. The texts can be passed to the parser of the namelists or the card.
+    """
+    # The matches start at the newline before a line, i.e. at the start of the line in
+    # `txt`, and end one character later than in `txt`
+    prefixed = "\n" + txt
+    namelists, cards = [], {}
+    card = None
+    namelist_start = None
+    matches = _SECTION_RE.finditer(prefixed)
+    while True:
+        for match in matches:
+            if namelist_start is not None:
+                # Inside a namelist, only its end matters
+                if match.group("end"):
+                    namelists.append(txt[namelist_start : match.end()])
+                    namelist_start = None
+                continue
+            if match.group("end"):
+                continue
+            if card is not None:
+                cards.setdefault(card[0], (card[1], txt[card[2] : match.start()]))
+                card = None
+            if match.group("namelist"):
+                namelist_start = match.start()
+            else:
+                options = _CARD_OPTIONS_RE.match(match.group("options"))
+                card = (
+                    match.group("card").upper(),
+                    options and options.group(1),
+                    match.start(),
+                )
+        if namelist_start is None:
+            break
+        # A namelist that is never closed is not one: the lines that follow its first
+        # line are split again
+        matches = _SECTION_RE.finditer(prefixed, txt.index("\n", namelist_start) + 1)
+        namelist_start = None
+    if card is not None:
+        cards.setdefault(card[0], (card[1], txt[card[2] :]))
+    return "".join(namelists), cards
+
+
+# Regular expressions of `parse_namelists`, compiled once: parsing many input files is
+# otherwise dominated by their compilation (or the lookup in the cache of `re`).
+#
+# Namelist blocks, in a text prefixed with a newline. The block is matched a line at a
+# time, and the search for the next block only stops at newlines instead of trying every
+# position for a line start. The newline ending the `/` line is left for the next block.
+_NAMELIST_RE = re.compile(
+    r"""
+    \n [ \t]* &(\S+) [ \t]* \n  # match line w/ nmlst tag; save nmlst name
+    (
+     (?:.*\n)*?              # match any line non-greedily
+    )                        # save the group of text between nmlst
+    [ \t]* / [ \t]* (?=\n)    # match line w/ "/" as only non-whitespace char
+    """,
+    re.X,
+)
+
+# The `key = val` pairs in a block of namelist text. The key is the shortest text without
+# whitespace followed by `=`, and the value the shortest one followed by a newline or a
+# comma; both are matched up to the next `=`, comma or whitespace at once, rather than one
+# character at a time.
+_KEY_VALUE_RE = re.compile(
+    r"""
+    (\S[^\s=]*(?:=[^\s=]*)*?) [ \t]*  # match and store key
+    =                               # equals sign separates key and value
+    [ \t]* (\S[^\s,]*) [ \t]*           # match and store value
+    [\n,]                           # return or comma separates "key = value" pairs
+    """,
+    re.X,
+)
+
+# Everything before the first comment of a line, skipping over quoted strings. It stops at
+# the `!` of a comment, at an unclosed quote, or at the end of the line.
+_UNCOMMENTED_RE = re.compile(r"""(?:[^'"!]+|'[^']*'|"[^"]*")*""")
+
+_FLOAT_RE = re.compile(
+    r"""
+    [-+]?                 # optional sign
+    (?:                   # either
+     \d*[\.]\d+            # 10.53 or .53
+     |                    # or
+     \d+[\.]?\d* )          # 10.53 or 10. or 10
+    (?:[dEeE][-+]?[0-9]+)?  # optional exponent
+    """,
+    re.X,
+)
+
+# Regular expressions that `_str2val` tries in turn, with the conversion of a match.
+_VALUE_CONVERSIONS = (
+    (re.compile(r"[.](true|t)[.]", re.I), lambda _: True),
+    (re.compile(r"[.](false|f)[.]", re.I), lambda _: False),
+    (_FLOAT_RE, lambda s: float(s.replace("d", "e").replace("D", "E"))),
+    (re.compile(r"[-+]?\d+$"), int),
+    (re.compile(r"""['"].*['"]"""), lambda s: str(s.strip("'\""))),
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def _str2val(valstr):
     """
     Return a python value by converting valstr according to f90 syntax.
 
+    The same few values (e.g. `.true.` or `'scf'`) occur in most input files, so the
+    conversions are cached.
+
     :param valstr: String representation of the variable to be converted.
                    (e.g. '.true.')
     :type valstr: str
@@ -232,33 +449,12 @@ def _str2val(valstr):
     :rtype: bool or float or int or str
     :raises: ValueError: if a suitable conversion of ``valstr`` cannot be found.
     """
-    # Define regular expression for matching floats.
-    float_re = re.compile(
-        r"""
-        [-+]?                 # optional sign
-        (?:                   # either
-         \d*[\.]\d+            # 10.53 or .53
-         |                    # or
-         \d+[\.]?\d* )          # 10.53 or 10. or 10
-        (?:[dEeE][-+]?[0-9]+)?  # optional exponent
-        """,
-        re.X,
-    )
     # Strip any white space characters before analyzing.
     valstr = valstr.strip()
 
-    # Define a tuple of regular expressions to match and their corresponding
-    # conversion functions.
-    re_fn_tuple = (
-        (re.compile(r"[.](true|t)[.]", re.I), lambda _: True),
-        (re.compile(r"[.](false|f)[.]", re.I), lambda _: False),
-        (float_re, lambda s: float(s.replace("d", "e").replace("D", "E"))),
-        (re.compile(r"[-+]?\d+$"), int),
-        (re.compile(r"""['"].*['"]"""), lambda s: str(s.strip("'\""))),
-    )
     # Convert valstr to a value.
     val = None
-    for regex, conversion_fn in re_fn_tuple:
+    for regex, conversion_fn in _VALUE_CONVERSIONS:
         # If valstr matches the regular expression, convert it with
         # conversion_fn.
         if regex.match(valstr):
@@ -274,6 +470,28 @@ def _str2val(valstr):
     return val
 
 
+def _strip_comment(line):
+    """
+    Return `line` until its first `!` comment (if any), ignoring `!` inside strings.
+
+    Note: it expects a single line, and does not cope with escaping of quotes.
+
+    :raises ValueError: if a string is not closed on the line.
+    """
+    if "!" not in line:
+        # Lines with a single kind of quotes are closed if they have an even number of them
+        if '"' not in line and not line.count("'") % 2:
+            return line
+        if "'" not in line and not line.count('"') % 2:
+            return line
+    end = _UNCOMMENTED_RE.match(line).end()
+    if end < len(line) and line[end] != "!":
+        raise ValueError(
+            f"String >>{line}<< is not closed, it was open with the {line[end]} char"
+        )
+    return line[:end]
+
+
 def parse_namelists(txt):
     """
     Parse txt to extract a dictionary of the namelist info.
@@ -310,52 +528,26 @@ def parse_namelists(txt):
         parsing the input.
     """
     # TODO: Incorporate support for algebraic expressions?
-    # Define the re to match a namelist and extract the info from it.
-    namelist_re = re.compile(
-        r"""
-        ^ [ \t]* &(\S+) [ \t]* $\n  # match line w/ nmlst tag; save nmlst name
-        (
-         [\S\s]*?                # match any line non-greedily
-        )                        # save the group of text between nmlst
-        ^ [ \t]* / [ \t]* $\n    # match line w/ "/" as only non-whitespace char
-        """,
-        re.M | re.X,
-    )
-    # Define the re to match and extract all of the key = val pairs inside
-    # a block of namelist text.
-    key_value_re = re.compile(
-        r"""
-        [ \t]* (\S+?) [ \t]*  # match and store key
-        =               # equals sign separates key and value
-        [ \t]* (\S+?) [ \t]*  # match and store value
-        [\n,]           # return or comma separates "key = value" pairs
-        """,
-        re.M | re.X,
-    )
-    # Scan through the namelists...
     params_dict = {}
-    for nmlst, blockstr in namelist_re.findall(txt):
-        # ...extract the key value pairs, storing them each in nmlst_dict,...
+    for nmlst, blockstr in _NAMELIST_RE.findall("\n" + txt):
+        # Remove the comments of each line. A "key = value" pair never spans two lines, so
+        # the pairs are extracted from the whole block at once.
+        lines = blockstr.splitlines()
+        if "!" in blockstr or "'" in blockstr or '"' in blockstr:
+            lines = [_strip_comment(line) for line in lines]
+        blockstr = "\n".join(lines) + "\n"
+
         nmlst_dict = {}
-        # I split the lines, putting back a \n at the end (I want
-        # to have it otherwise lines not ending with a comma are ignored)
-        blocklines = blockstr.splitlines()
-        # Remove comments on each line, and then put back the \n
-        # Note that strip_comment does not want \n in the string!
-        blocklines = [f"{_strip_comment(line)}\n" for line in blocklines]
-
-        for blockline in blocklines:
-            for key, valstr in key_value_re.findall(blockline):
-                if key.lower() in nmlst_dict:
-                    raise ValueError(
-                        f"Key {key.lower()} found more than once in namelist {nmlst}"
-                    )
-                nmlst_dict[key.lower()] = _str2val(valstr)
+        for key, valstr in _KEY_VALUE_RE.findall(blockstr):
+            key = key.lower()
+            if key in nmlst_dict:
+                raise ValueError(f"Key {key} found more than once in namelist {nmlst}")
+            nmlst_dict[key] = _str2val(valstr)
         # ...and, store nmlst_dict as a value in params_dict with the namelist
         # as the key.
-        if len(nmlst_dict.keys()) > 0:
+        if nmlst_dict:
             params_dict[nmlst.upper()] = nmlst_dict
-    if len(params_dict) == 0:
+    if not params_dict:
         raise ParsingError(
             "No data was found while parsing the namelist in the following text\n" + txt
         )
@@ -363,7 +555,51 @@ def parse_namelists(txt):
     return params_dict
 
 
-def parse_atomic_positions(txt):
+# Regular expressions of the fast path of `parse_atomic_positions`. The numbers are those of
+# `NUMBER_PATTERN` without exponents (with an exponent, the z coordinate can be read as a
+# prefix of the number by `_parse_atomic_positions_re`).
+_ATOMIC_POSITIONS_START_RE = re.compile(r"^\s*ATOMIC_POSITIONS", re.M)
+_ATOMIC_POSITIONS_HEADER_RE = re.compile(
+    r"""
+    \s* ATOMIC_POSITIONS
+    (?: [ \t]* [{(] [ \t]* ([^\s(){}]+) [ \t]* [)}] | [ \t]+ ([^\s(){}]+) )?
+    [ \t]* \n
+    """,
+    re.X,
+)
+# At most 1024 lines of atoms: the engine keeps a backtracking state per repetition, so
+# longer cards are matched in several steps to bound its memory.
+_ATOMIC_POSITIONS_LINES_RE = re.compile(
+    r"""
+    (?:
+        [ \t]* [A-Za-z]+[A-Za-z0-9]{0,2}                      # name
+        (?: [ \t]+ (?:[-+]?\d*\.\d+|\d+\.?\d*) ){3}           # x, y, z
+        (?: [ \t]+ [01] [ \t]+ [01] [ \t]+ [01] )?              # optional if_pos
+        [ \t]* \n
+    ){0,1024}
+    """,
+    re.X,
+)
+
+# A line of the card as read by `_parse_atomic_positions_re`.
+_ATOMIC_POSITIONS_LINE_RE = re.compile(
+    rf"""
+    \s*
+    (
+        [A-Za-z]+[A-Za-z0-9]{{0,2}} (\s+ {NUMBER_PATTERN}){{3}} ((\s+[0-1]){{3}}\s*)? \s*
+        |
+        \#.*
+        |
+        \!.*
+    )?
+    [\n]
+    """,
+    re.X,
+)
+_FIRST_TOKEN_RE = re.compile(r"^[ \t]*(\S+)", re.M)
+
+
+def parse_atomic_positions(txt, *, arrays=False):
     """
     Return a dictionary containing info from the ATOMIC_POSITIONS card block
     in txt.
@@ -372,6 +608,9 @@ def parse_atomic_positions(txt):
 
     :param txt: A single string containing the QE input text to be parsed.
     :type txt: str
+    :param arrays: return the positions as a ``(nat, 3)`` float array and the fixed
+        coordinates as a ``(nat, 3)`` bool array, instead of lists.
+    :type arrays: bool
 
     :returns:
         A dictionary with
@@ -397,6 +636,79 @@ def parse_atomic_positions(txt):
     :raises qe_tools.utils.exceptions.ParsingError: if there are issues
         parsing the input.
     """
+    parsed = _parse_atomic_positions_fast(txt)
+    if parsed is None:
+        parsed = _parse_atomic_positions_re(txt)
+        if arrays:
+            parsed["positions"] = np.array(parsed["positions"], dtype=float).reshape(
+                -1, 3
+            )
+            parsed["fixed_coords"] = np.array(
+                parsed["fixed_coords"], dtype=bool
+            ).reshape(-1, 3)
+    elif not arrays:
+        parsed["positions"] = parsed["positions"].tolist()
+        parsed["fixed_coords"] = parsed["fixed_coords"].tolist()
+    return parsed
+
+
+def _parse_atomic_positions_fast(txt):
+    """
+    Parse the ATOMIC_POSITIONS card of `txt` into arrays, for cards of plain atom lines.
+
+    The lines of the card are validated with a regular expression and the numbers
+    converted at once by NumPy, instead of one regular expression match and conversion
+    per atom. Returns ``None`` for anything else than lines of a name and three decimal
+    numbers, all with or all without the three ``if_pos`` flags (e.g. comments, blank
+    lines or exponents), which are left to `_parse_atomic_positions_re`.
+    """
+    header = _ATOMIC_POSITIONS_START_RE.search(txt)
+    if header is None:
+        return None
+    header = _ATOMIC_POSITIONS_HEADER_RE.match(txt, header.start())
+    if header is None:
+        return None
+    start = end = header.end()
+    while (step := _ATOMIC_POSITIONS_LINES_RE.match(txt, end).end()) > end:
+        end = step
+    # The card must not continue with lines that only `_parse_atomic_positions_re` reads
+    following = txt[end : txt.find("\n", end) + 1 or len(txt)].lstrip(" \t")
+    if (
+        end == start
+        or following[:1].isdigit()
+        or (end < len(txt) and not following.strip())
+        or _ATOMIC_POSITIONS_LINE_RE.match(txt, end)
+    ):
+        return None
+
+    block = txt[start:end]
+    names = _FIRST_TOKEN_RE.findall(block)
+    values = np.fromstring(_FIRST_TOKEN_RE.sub("", block), sep=" ")
+    if values.size == 3 * len(names):
+        positions = values.reshape(-1, 3)
+        fixed_coords = np.zeros(positions.shape, dtype=bool)
+    elif values.size == 6 * len(names):
+        values = values.reshape(-1, 6)
+        positions = values[:, :3].copy()
+        # '0' --> True (fixed); '1' --> False, see `str01_to_bool`
+        fixed_coords = values[:, 3:] == 0
+    else:  # lines with and without `if_pos`
+        return None
+
+    units = header.group(1) or header.group(2)
+    return {
+        "units": None if units is None else units.lower(),
+        "names": names,
+        "positions": positions,
+        "fixed_coords": fixed_coords,
+    }
+
+
+def _parse_atomic_positions_re(txt):
+    """
+    Parse the ATOMIC_POSITIONS card of `txt` one atom at a time, see
+    `parse_atomic_positions`.
+    """
 
     def str01_to_bool(s):
         """
@@ -1360,7 +1672,8 @@ def parse_structure(
     This function can deal with ibrav being set different from 0 and the cell being defined
     with celldm(n) or A,B,C, cosAB etc.
 
-    :param str txt: the string content of the standard QE-input file.
+    :param str txt: the string content of the standard QE-input file, from which the
+        parts that are not passed are parsed (optional if all are passed).
     :param dict namelists: The dictionary of the namelist (optional)
     :param dict atomic_species: The dictionary of the atomic_species (optional)
     :param atomic_positions: The atomic positions as specified in the file (optional)
@@ -1382,14 +1695,30 @@ def parse_structure(
             "atom_names": A list of the kind names as used in the input,
         }
     """
-    if namelists is None:
-        namelists = parse_namelists(txt)
-    if atomic_species is None:
-        atomic_species = parse_atomic_species(txt)
-    if cell_parameters is None:
-        cell_parameters = parse_cell_parameters(txt)
-    if atomic_positions is None:
-        atomic_positions = parse_atomic_positions(txt)
+    if txt is not None and None in (
+        namelists,
+        atomic_species,
+        cell_parameters,
+        atomic_positions,
+    ):
+        # Split the text once, and parse the missing parts from their own sections
+        namelists_txt, cards = split_sections(txt)
+
+        def card_text(name, required=True):
+            if name in cards:
+                return cards[name][1]
+            return txt if required else ""
+
+        if namelists is None:
+            namelists = parse_namelists(namelists_txt or txt)
+        if atomic_species is None:
+            atomic_species = parse_atomic_species(card_text("ATOMIC_SPECIES"))
+        if cell_parameters is None:
+            cell_parameters = parse_cell_parameters(
+                card_text("CELL_PARAMETERS", required=False)
+            )
+        if atomic_positions is None:
+            atomic_positions = parse_atomic_positions(card_text("ATOMIC_POSITIONS"))
 
     # First, I'm trying to figure out whether alat was specified:
     system_dict = namelists["SYSTEM"]
@@ -1450,52 +1779,3 @@ def parse_structure(
         "cell": cell.tolist(),
         "atom_names": atomic_positions["names"],
     }
-
-
-def _strip_comment(string, comment_characters=("!",), quote_characters=('"', "'")):
-    """
-    Return the string only until the first comment (if any), but makes
-    sure to ignore comments if inside a string
-
-    Note: it expects to get a SINGLE line, without newline characters
-
-    Note: it does not cope with escaping of quotes
-
-    :param string: the string to check
-    :param comment_characters: a list or tuple of accepted comment characters
-    :param quote_characters: a list or tuple of accepted valid string characters
-    """
-    new_string: list[str] = []  # Will contain individual charachters of the new string
-
-    in_string = False
-    string_quote = None  # Will contain the specific character used to enter
-    # this string: this avoids that 'aaa" is considered as
-    # the string containing the three characters aaa
-
-    for char in string:
-        if char == "\n":
-            raise ValueError("I still cannot cope with newlines in the string...")
-        # Check if we are entering/existing a string
-        if in_string and char == string_quote:
-            # print("EXIT")
-            in_string = False
-            string_quote = None
-        elif not in_string and char in quote_characters:
-            # print("ENTER")
-            in_string = True
-            string_quote = char
-        # print(char, in_string, string_quote)
-
-        # We found a comment, return until here (without the comment)
-        if not in_string and char in comment_characters:
-            return "".join(new_string)
-
-        new_string.append(char)
-
-    # If we are here, no comments where found
-    if in_string:
-        raise ValueError(
-            f"String >>{string}<< is not closed, it was open with the {string_quote} char"
-        )
-    # I just return the same string, even if this would be equivalent to "".join(new_string)
-    return string
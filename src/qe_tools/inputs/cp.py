@@ -21,6 +21,16 @@ class CpInputFile(BaseInputFile):
         Valid version strings are e.g. '6.5', '6.4.1', '6.4rc2'.
     :type qe_version: Optional[str]
 
+    :param validate_species_names: A boolean flag (default: True) to enable
+        the consistency check between atom names and species names inferred
+        from the pseudopotential file name.
+    :type validate_species_names: bool
+
+    :param eager: A boolean flag (default: False) to parse the cards and the
+        structure right away, and so raise their parsing errors, instead of the
+        first time they are accessed.
+    :type eager: bool
+
     :raises IOError: if ``content`` is a file and there is a problem reading
         the file.
     :raises TypeError: if ``content`` is a list containing any non-string
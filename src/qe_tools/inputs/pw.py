@@ -4,6 +4,7 @@ Tools for parsing QE PW input files
 
 from __future__ import annotations
 
+import functools
 import re
 
 from qe_tools.exceptions import ParsingError
@@ -16,6 +17,9 @@ class PwInputFile(BaseInputFile):
     """
     Class used for parsing Quantum Espresso pw.x input files and using the info.
 
+    The namelists are parsed when the class is created, the cards and the ``structure``
+    the first time they are accessed (or right away with ``eager=True``).
+
     Members:
 
     * ``namelists``:
@@ -130,7 +134,11 @@ class PwInputFile(BaseInputFile):
 
     """
 
-    def __init__(self, content, *, qe_version=None, validate_species_names=True):
+    _card_attributes = (*BaseInputFile._card_attributes, "k_points")
+
+    def __init__(
+        self, content, *, qe_version=None, validate_species_names=True, eager=False
+    ):
         """
         Parse inputs's namelist and cards to create attributes of the info.
 
@@ -151,6 +159,11 @@ class PwInputFile(BaseInputFile):
             from the pseudopotential file name.
         :type validate_species_names: bool
 
+        :param eager: A boolean flag (default: False) to parse the cards and the
+            structure right away, and so raise their parsing errors, instead of the
+            first time they are accessed.
+        :type eager: bool
+
         :raises IOError: if ``content`` is a file and there is a problem reading
             the file.
         :raises TypeError: if ``content`` is a list containing any non-string
@@ -163,10 +176,13 @@ class PwInputFile(BaseInputFile):
             content,
             qe_version=qe_version,
             validate_species_names=validate_species_names,
+            eager=eager,
         )
 
-        # Parse the K_POINTS card.
-        self.k_points = parse_k_points(self.content)
+    @functools.cached_property
+    def k_points(self) -> dict:
+        """The K_POINTS card."""
+        return parse_k_points(self._card_text("K_POINTS"))
 
     def as_dict(self) -> dict:
         """Return parsed data as dictionary."""
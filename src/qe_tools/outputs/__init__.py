@@ -2,10 +2,19 @@ from .pw import PwOutput
 from .dos import DosOutput
 from .bands import BandsOutput
 from .projwfc import ProjwfcOutput
+from ._batch import ParseResult
+from ._discovery import DiscoveredFiles
+from ._cache import CacheConfig
+from ._index import FingerprintIndex, changed_since
 
 __all__ = (
     "PwOutput",
     "DosOutput",
     "BandsOutput",
     "ProjwfcOutput",
+    "ParseResult",
+    "DiscoveredFiles",
+    "CacheConfig",
+    "FingerprintIndex",
+    "changed_since",
 )
@@ -0,0 +1,292 @@
+"""Parse calculations stored in `tar` and `zip` archives, without extracting them.
+
+Finished calculations are often archived as e.g. `runs.tar.gz`, with one directory per
+run. The archive is read in a single sequential pass: each member is matched against the
+`file_patterns` of the output class as `discover` would match the extracted file, and the
+members that are needed are parsed from a streaming handle while the archive is read.
+Nothing is written to disk and `tar` archives are never seeked, so that compressed
+archives are decompressed once.
+
+The members of a run must be stored together, as `tar` and `zip` do when archiving a
+directory tree: the members of a run found after those of another run are not parsed,
+and `iter_archive` yields a second result for the run, with an error.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import inspect
+import io
+import tarfile
+import traceback
+import typing
+import zipfile
+from collections.abc import Iterator
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from typing import TextIO
+
+from qe_tools.outputs._batch import ParseResult
+from qe_tools.outputs._discovery import DEFAULT_MAX_DEPTH, HEADER_SIZE, FilePattern
+from qe_tools.outputs.parsers._compression import (
+    COMPRESSED_SUFFIXES,
+    PrefixedStream,
+    decompressed_stream,
+    strip_compressed_suffix,
+)
+
+__all__ = ("ArchiveMixin",)
+
+
+def _iter_members(path: str | Path) -> Iterator[tuple[str, typing.IO[bytes]]]:
+    """Yield the name and a binary stream of every regular file in the archive, in order."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as stream:
+                        yield info.filename, stream
+        return
+
+    # `r|*` reads the (possibly compressed) archive as a stream, without seeking back
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile():
+                handle = archive.extractfile(member)
+                if handle is not None:
+                    yield member.name, handle
+
+
+def _parts(name: str) -> tuple[str, ...]:
+    return tuple(part for part in PurePosixPath(name).parts if part not in ("/", "."))
+
+
+def _rank(pattern: FilePattern, parts: tuple[str, ...], max_depth: int) -> tuple | None:
+    """Rank of the member at `parts` (relative to its run) for `pattern`, lower is better.
+
+    Follows the precedence of `discover`: shallower files first; within a level, the
+    `save_names` in a `<prefix>.save` directory, then the `names` in order.
+    """
+    *directories, name = parts
+    if any(directory.startswith(".") for directory in directories):
+        return None
+    limit = max_depth if pattern.recursive else 0
+
+    if directories and directories[-1].endswith(".save"):
+        depth = len(directories) - 1
+        if depth > limit or any(d.endswith(".save") for d in directories[:-1]):
+            return None
+        for index, save_name in enumerate(pattern.save_names):
+            for suffix_index, suffix in enumerate(("", *COMPRESSED_SUFFIXES)):
+                if name == save_name + suffix:
+                    return (depth, 0, index, suffix_index, parts)
+        return None
+
+    depth = len(directories)
+    if depth > limit or pattern.excludes(name):
+        return None
+    stripped = strip_compressed_suffix(name)
+    for index, name_pattern in enumerate(pattern.names):
+        if fnmatch(stripped, name_pattern):
+            return (depth, 1, index, 0, parts)
+    return None
+
+
+@dataclasses.dataclass
+class _Run:
+    """Parsed members of one run: role -> `(rank, raw outputs)`, or a list of them."""
+
+    name: str
+    found: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    error: BaseException | None = None
+
+
+class ArchiveMixin:
+    """Mixin adding `from_archive` and `iter_archive` to output classes with `file_patterns`.
+
+    Members are parsed with `from_files`, one role at a time, and the `raw_outputs` of the
+    members of a run are merged (see `_parse_archive_member` and `_merge_raw_outputs`).
+    """
+
+    file_patterns: typing.ClassVar[dict[str, FilePattern]]
+
+    @classmethod
+    def from_archive(
+        cls,
+        path: str | Path,
+        member_prefix: str = "",
+        *,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        **kwargs: typing.Any,
+    ):
+        """Parse the calculation stored under `member_prefix` in the archive at `path`.
+
+        The members under `member_prefix` (e.g. `runs/scf/`) are treated as the extracted
+        calculation directory passed to `from_dir`.
+
+        :param max_depth: number of subdirectory levels searched for `recursive` patterns.
+        :param kwargs: keyword arguments passed on to `from_files`.
+        :raises ValueError: if the archive holds no file under `member_prefix`.
+        """
+        for run in cls._scan_archive(path, member_prefix, 0, max_depth, kwargs):
+            if run.error is not None:
+                raise run.error
+            return cls._build_output(run, kwargs)
+        raise ValueError(f"No file under `{member_prefix}` in the archive `{path}`.")
+
+    @classmethod
+    def iter_archive(
+        cls,
+        path: str | Path,
+        member_prefix: str = "",
+        *,
+        run_depth: int = 1,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        **kwargs: typing.Any,
+    ) -> Iterator[ParseResult]:
+        """Parse every run stored in the archive at `path`.
+
+        Each directory `run_depth` levels below `member_prefix` is a run, e.g. `run_001`
+        in `runs/run_001/pw.out` for `member_prefix="runs"` and `run_depth=1`. Yields a
+        `ParseResult` per run, in the order of the archive, with the run's path in the
+        archive as `directory`. A run that fails to parse yields a result with the
+        `error` instead of stopping the iteration. So does a run whose members are not
+        stored together: the members found after those of another run are not parsed,
+        and yield a second result for the run, with the error.
+
+        :param max_depth: number of subdirectory levels of a run searched for `recursive`
+            patterns.
+        :param kwargs: keyword arguments passed on to `from_files`.
+        """
+        for run in cls._scan_archive(path, member_prefix, run_depth, max_depth, kwargs):
+            error = run.error
+            if error is None:
+                try:
+                    output = cls._build_output(run, kwargs)
+                except Exception as exception:
+                    error = exception
+                else:
+                    yield ParseResult(Path(run.name), output=output)
+                    continue
+            message = "".join(traceback.format_exception(error))
+            yield ParseResult(Path(run.name), error=message)
+
+    @classmethod
+    def _parse_archive_member(
+        cls, role: str, name: str, handle: TextIO, kwargs: dict[str, typing.Any]
+    ) -> dict[str, typing.Any]:
+        """Parse the member `name` of an archive, found for `role`, from `handle`.
+
+        Returns the part of the `raw_outputs` of the run that comes from the member.
+        """
+        return cls.from_files(**{role: handle}, **kwargs).raw_outputs  # type: ignore[attr-defined]
+
+    @classmethod
+    def _merge_raw_outputs(
+        cls, parts: list[dict[str, typing.Any]]
+    ) -> dict[str, typing.Any]:
+        """Merge the `raw_outputs` parsed from the members of a run."""
+        raw_outputs: dict[str, typing.Any] = {}
+        for part in parts:
+            raw_outputs.update(part)
+        return raw_outputs
+
+    @classmethod
+    def _build_output(cls, run: _Run, kwargs: dict[str, typing.Any]):
+        parts: list[dict[str, typing.Any]] = []
+        for found in run.found.values():
+            if isinstance(found, list):
+                parts.extend(raw_outputs for _, raw_outputs in sorted(found))
+            else:
+                parts.append(found[1])
+
+        # As for `from_dirs`, options that are also accepted by the constructor are passed
+        init_parameters = inspect.signature(cls.__init__).parameters
+        init_kwargs = {
+            key: value for key, value in kwargs.items() if key in init_parameters
+        }
+        return cls(raw_outputs=cls._merge_raw_outputs(parts), **init_kwargs)  # type: ignore[call-arg]
+
+    @classmethod
+    def _scan_archive(
+        cls,
+        path: str | Path,
+        member_prefix: str,
+        run_depth: int,
+        max_depth: int,
+        kwargs: dict[str, typing.Any],
+    ) -> Iterator[_Run]:
+        """Read the archive once, yielding each run as soon as all its members are read."""
+        prefix = _parts(member_prefix)
+        finished: set[str] = set()
+        run: _Run | None = None
+
+        for member, stream in _iter_members(path):
+            parts = _parts(member)
+            if parts[: len(prefix)] != prefix or len(parts) <= len(prefix) + run_depth:
+                continue
+            run_name = "/".join(parts[: len(prefix) + run_depth])
+
+            if run is None or run.name != run_name:
+                if run is not None:
+                    finished.add(run.name)
+                    yield run
+                run = _Run(run_name)
+                if run_name in finished:
+                    run.error = ValueError(
+                        f"The members of `{run_name}` are not stored together in the "
+                        f"archive `{path}`."
+                    )
+            if run.error is not None:
+                continue
+
+            try:
+                cls._read_member(
+                    run,
+                    member,
+                    parts[len(prefix) + run_depth :],
+                    stream,
+                    max_depth,
+                    kwargs,
+                )
+            except Exception as exception:
+                run.error = exception
+
+        if run is not None:
+            yield run
+
+    @classmethod
+    def _read_member(
+        cls,
+        run: _Run,
+        member: str,
+        parts: tuple[str, ...],
+        stream: typing.IO[bytes],
+        max_depth: int,
+        kwargs: dict[str, typing.Any],
+    ) -> None:
+        """Parse the member if it is a better match for a role than the ones already read."""
+        candidates = []
+        for role, pattern in cls.file_patterns.items():
+            rank = _rank(pattern, parts, max_depth)
+            if rank is None:
+                continue
+            if pattern.multiple or role not in run.found or rank < run.found[role][0]:
+                candidates.append((role, pattern, rank))
+        if not candidates:
+            return
+
+        binary = decompressed_stream(stream)
+        head = binary.read(HEADER_SIZE)
+        for role, pattern, rank in candidates:
+            if pattern.header is None or pattern.header in head:
+                break
+        else:
+            return
+
+        handle = io.TextIOWrapper(io.BufferedReader(PrefixedStream(head, binary)))
+        raw_outputs = cls._parse_archive_member(role, member, handle, kwargs)
+        if pattern.multiple:
+            run.found.setdefault(role, []).append((rank, raw_outputs))
+        else:
+            run.found[role] = (rank, raw_outputs)
@@ -0,0 +1,87 @@
+"""Parse many calculation directories in parallel."""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import inspect
+import typing
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from qe_tools._parallel import imap_unordered
+
+__all__ = ("BatchOutputMixin", "ParseResult")
+
+OutputT = typing.TypeVar("OutputT")
+
+
+@dataclasses.dataclass(frozen=True)
+class ParseResult(typing.Generic[OutputT]):
+    """Outcome of parsing one directory with `from_dirs`."""
+
+    directory: Path
+    """Directory that was parsed."""
+
+    output: OutputT | None = None
+    """Parsed output, or `None` if parsing failed."""
+
+    error: str | None = None
+    """Formatted traceback of the exception raised while parsing, if any."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the directory was parsed successfully."""
+        return self.error is None
+
+
+def _parse_dir(
+    output_cls: type, kwargs: dict[str, typing.Any], directory: Path
+) -> dict[str, typing.Any]:
+    """Parse `directory` in a worker, returning the (picklable) `raw_outputs`."""
+    return output_cls.from_dir(directory, **kwargs).raw_outputs  # type: ignore[attr-defined]
+
+
+class BatchOutputMixin:
+    """Mixin adding `from_dirs` to `BaseOutput` subclasses that implement `from_dir`."""
+
+    @classmethod
+    def from_dirs(
+        cls,
+        directories: Iterable[str | Path],
+        *,
+        workers: int | None = None,
+        chunksize: int = 1,
+        **kwargs: typing.Any,
+    ) -> Iterator[ParseResult]:
+        """Parse many directories with `from_dir`, spread over a pool of worker processes.
+
+        Yields a `ParseResult` per directory, in the order in which the directories finish
+        parsing (use `ParseResult.directory` to match them). A directory that fails to
+        parse yields a result with the `error` instead of stopping the batch.
+
+        :param directories: directories to parse; may be a lazy iterable.
+        :param workers: number of worker processes, defaults to the number of CPUs. With
+            `workers=1` the directories are parsed in the current process.
+        :param chunksize: number of directories sent to a worker at once; increase it for
+            many small calculations to reduce the inter-process overhead.
+        :param kwargs: keyword arguments passed on to `from_dir`.
+        """
+        # Workers send back the `raw_outputs`, the output objects are rebuilt here. Options
+        # of `from_dir` that are also accepted by the constructor are passed on to it.
+        init_parameters = inspect.signature(cls.__init__).parameters
+        init_kwargs = {
+            key: value for key, value in kwargs.items() if key in init_parameters
+        }
+
+        for directory, raw_outputs, error in imap_unordered(
+            functools.partial(_parse_dir, cls, kwargs),
+            (Path(directory) for directory in directories),
+            workers=workers,
+            chunksize=chunksize,
+        ):
+            if error is not None:
+                yield ParseResult(directory, error=error)
+            else:
+                output = cls(raw_outputs=raw_outputs, **init_kwargs)  # type: ignore[call-arg]
+                yield ParseResult(directory, output=output)
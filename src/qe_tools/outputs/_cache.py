@@ -0,0 +1,346 @@
+"""Persistent cache of the `raw_outputs` parsed from the files of a calculation.
+
+Finished calculations do not change, but pipelines often parse the same runs again in
+every job. With a `CacheConfig`, `from_dir` stores the `raw_outputs` it parsed in a cache
+directory, under a key computed from:
+
+- the digests of the files found by `discover`, with their roles (the digests recorded in
+  a `FingerprintIndex` are reused for the files that did not change);
+- the version of `qe-tools`, the output class and the parsing options.
+
+Parsing the same files again with the same options then only reads one cache file: the
+NumPy arrays of the `raw_outputs` are stored natively in an uncompressed `.npz` file,
+together with a JSON document of the rest. `raw_outputs` that cannot be stored exactly
+(e.g. with keys that are not strings) are not cached.
+
+The cache is bounded by `CacheConfig.max_bytes`: once it is exceeded, the entries that
+were used the longest time ago are removed. The total size of the entries is kept in a
+small file of the cache directory, so that the directory is only scanned when the cache
+may be over its budget, rather than after every new entry. Entries are written
+atomically, so that a cache directory can be shared by concurrent processes (whose
+updates of the total size can be lost, which only delays the eviction until the next
+scan).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import typing
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from qe_tools.__about__ import __version__
+
+from ._discovery import DiscoveredFiles
+from ._index import FingerprintIndex, _as_list, _file_digest, _paths
+
+__all__ = ("CacheConfig", "CacheMixin")
+
+_DOCUMENT = "__document__"
+_ARRAY = "__array__"
+_TUPLE = "__tuple__"
+
+# File of the cache directory with the total size of its entries, as of the last scan and
+# the entries stored since
+_SIZE_FILE = ".size"
+
+# Fraction of `max_bytes` that the entries are evicted down to, so that the directory is
+# not scanned again at the next entry
+_EVICTION_TARGET = 0.9
+
+
+def _normalise_option(name: str, value: typing.Any) -> typing.Any:
+    """Return `value` in a form that does not depend on the order it was given in, for
+    the options that are sets of names."""
+    if isinstance(value, (set, frozenset)) or (name == "fields" and value is not None):
+        return tuple(sorted(set(value)))
+    return value
+
+
+class _Unsupported(TypeError):
+    """Raised for `raw_outputs` that cannot be stored exactly."""
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheConfig:
+    """Where and how much to cache the `raw_outputs` parsed by `from_dir`."""
+
+    directory: str | Path
+    """Directory of the cache files, created if needed."""
+
+    max_bytes: int | None = 1 << 30
+    """Maximum total size of the cache files, or `None` for no limit. The least recently
+    used entries are removed when a new entry makes the cache larger."""
+
+    def key(
+        self,
+        output_cls: type,
+        files: dict[str, typing.Any],
+        options: dict,
+        digests: dict[str, str | None] | None = None,
+    ) -> str:
+        """Return the key of the `raw_outputs` of `output_cls` parsed from `files`.
+
+        The key is computed from the digests of the contents of the files, read from the
+        files unless given in `digests` (absolute path -> digest, see `FingerprintIndex`).
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        header = {
+            "version": __version__,
+            "class": f"{output_cls.__module__}.{output_cls.__qualname__}",
+            "options": {
+                name: repr(_normalise_option(name, value))
+                for name, value in sorted(options.items())
+            },
+            "files": {
+                role: None if paths is None else len(_as_list(paths))
+                for role, paths in sorted(files.items())
+            },
+        }
+        digest.update(json.dumps(header, sort_keys=True).encode())
+
+        digests = digests or {}
+        for path in _paths(files):
+            file_digest = digests.get(os.path.abspath(path)) or _file_digest(path)
+            digest.update(bytes.fromhex(file_digest))
+        return digest.hexdigest()
+
+    def load(self, key: str) -> dict[str, typing.Any] | None:
+        """Return the `raw_outputs` stored under `key`, or `None` if there are none."""
+        path = Path(self.directory, f"{key}.npz")
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+            document = arrays.pop(_DOCUMENT).tobytes()
+            raw_outputs = json.loads(document, object_hook=_decoder(arrays))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # A corrupted entry, e.g. written by an older version: parse again
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark the entry as recently used, for the eviction of `store`
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return raw_outputs
+
+    def store(self, key: str, raw_outputs: dict[str, typing.Any]) -> bool:
+        """Store `raw_outputs` under `key`, returning whether they could be stored."""
+        arrays: dict[str, np.ndarray] = {}
+        try:
+            document = _encode(raw_outputs, arrays)
+        except _Unsupported:
+            return False
+        arrays[_DOCUMENT] = np.frombuffer(json.dumps(document).encode(), dtype=np.uint8)
+
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{key}.npz"
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        handle = tempfile.NamedTemporaryFile(
+            dir=directory, prefix=f".{key}.", suffix=".tmp", delete=False
+        )
+        try:
+            with handle:
+                np.savez(handle, **arrays)  # type: ignore[arg-type]
+            size = os.path.getsize(handle.name)
+            os.replace(handle.name, path)
+        finally:
+            # Only left if the entry could not be written or moved into place
+            Path(handle.name).unlink(missing_ok=True)
+
+        if self.max_bytes is None:
+            # The sizes of the entries are not tracked: scan again with a budget
+            Path(self.directory, _SIZE_FILE).unlink(missing_ok=True)
+        else:
+            self._add_size(size - replaced, self.max_bytes)
+        return True
+
+    def _add_size(self, size: int, max_bytes: int) -> None:
+        """Add `size` to the total size of the cache, evicting entries if it exceeds
+        `max_bytes`.
+
+        The total is read from the size file, and the directory is scanned when it is
+        missing or over the budget.
+        """
+        path = Path(self.directory, _SIZE_FILE)
+        try:
+            total = int(path.read_text()) + size
+        except (OSError, ValueError):
+            total = None
+        if total is None or total > max_bytes:
+            total = self._evict(int(max_bytes * _EVICTION_TARGET))
+
+        handle = tempfile.NamedTemporaryFile(
+            "w",
+            dir=self.directory,
+            prefix=f"{_SIZE_FILE}.",
+            suffix=".tmp",
+            delete=False,
+        )
+        try:
+            with handle:
+                handle.write(str(total))
+            os.replace(handle.name, path)
+        finally:
+            Path(handle.name).unlink(missing_ok=True)
+
+    def _evict(self, max_bytes: int) -> int:
+        """Remove the least recently used entries until the cache fits in `max_bytes`,
+        returning the total size of the remaining entries."""
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(".npz"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:  # removed by another process
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+        return total
+
+
+def _encode(value: typing.Any, arrays: dict[str, np.ndarray]) -> typing.Any:
+    """Return a JSON document of `value`, moving its NumPy arrays (and scalars) to `arrays`.
+
+    The arrays and tuples are replaced by JSON objects with an `_ARRAY` or `_TUPLE` key,
+    see `_decoder`.
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        if value.dtype.hasobject:
+            raise _Unsupported(f"Cannot cache an array of dtype {value.dtype}")
+        name = str(len(arrays))
+        arrays[name] = np.asarray(value)
+        return {_ARRAY: name, "scalar": isinstance(value, np.generic)}
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        if any(not isinstance(key, str) for key in value) or (
+            _ARRAY in value or _TUPLE in value
+        ):
+            raise _Unsupported("Cannot cache a dictionary with these keys")
+        return {key: _encode(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode(item, arrays) for item in value]
+    if isinstance(value, tuple):
+        return {_TUPLE: [_encode(item, arrays) for item in value]}
+    raise _Unsupported(f"Cannot cache a value of type {type(value)}")
+
+
+def _decoder(arrays: dict[str, np.ndarray]) -> typing.Callable[[dict], typing.Any]:
+    """Return the `object_hook` of `json.loads` rebuilding the values encoded by `_encode`.
+
+    The hook is called for every JSON object, innermost first, so that the rest of the
+    document is rebuilt by the C decoder of `json`.
+    """
+
+    def object_hook(document: dict) -> typing.Any:
+        if _ARRAY in document:
+            array = arrays[document[_ARRAY]]
+            return array[()] if document["scalar"] else array
+        if _TUPLE in document:
+            return tuple(document[_TUPLE])
+        return document
+
+    return object_hook
+
+
+class CacheMixin:
+    """Mixin for output classes whose `from_dir` can go through a `CacheConfig`, and
+    record the parsed files in a `FingerprintIndex`."""
+
+    @classmethod
+    def _from_discovered_files(
+        cls,
+        discovered: DiscoveredFiles,
+        cache: CacheConfig | None,
+        index: FingerprintIndex | None = None,
+        **kwargs: typing.Any,
+    ):
+        """Parse the `discovered` files with `from_files`, or load them from the `cache`.
+
+        Options of `from_files` that are also accepted by the constructor (e.g.
+        `as_lists`) are passed to it, and do not change the cache key. With an `index`,
+        the parsed files are recorded in it, and the digests it recorded are reused for
+        the cache key.
+        """
+        files = discovered.files
+        if cache is None and index is None:
+            return cls.from_files(**files, **kwargs)  # type: ignore[attr-defined]
+
+        # Taken before parsing, so that files modified meanwhile are found changed
+        fingerprints = (
+            None
+            if index is None
+            else index.fingerprint(
+                discovered.directory, files, digests=cache is not None
+            )
+        )
+        if cache is None:
+            output = cls.from_files(**files, **kwargs)  # type: ignore[attr-defined]
+        else:
+            output = cls._from_cache(cache, files, fingerprints, kwargs)
+
+        if index is not None and fingerprints is not None:
+            index.record(discovered.directory, cls, fingerprints)
+        return output
+
+    @classmethod
+    def _from_cache(
+        cls,
+        cache: CacheConfig,
+        files: dict[str, typing.Any],
+        fingerprints: dict[str, typing.Any] | None,
+        kwargs: dict[str, typing.Any],
+    ):
+        """Load the `raw_outputs` of `files` from the `cache`, or parse and store them."""
+        # Options that can only be iterated once (e.g. `fields`) are read for the key
+        kwargs = {
+            key: tuple(value) if isinstance(value, Iterator) else value
+            for key, value in kwargs.items()
+        }
+        init_parameters = inspect.signature(cls.__init__).parameters
+        init_kwargs = {
+            key: value for key, value in kwargs.items() if key in init_parameters
+        }
+        options = {
+            key: value for key, value in kwargs.items() if key not in init_parameters
+        }
+
+        digests = None
+        if fingerprints is not None:
+            digests = {
+                path: fingerprint.digest for path, fingerprint in fingerprints.items()
+            }
+        key = cache.key(cls, files, options, digests)
+        raw_outputs = cache.load(key)
+        if raw_outputs is not None:
+            return cls(raw_outputs=raw_outputs, **init_kwargs)  # type: ignore[call-arg]
+
+        output = cls.from_files(**files, **kwargs)  # type: ignore[attr-defined]
+        cache.store(key, output.raw_outputs)
+        return output
@@ -0,0 +1,316 @@
+"""Locate the output files of a calculation in its directory.
+
+Calculation directories can be large (e.g. `<prefix>.save` folders with one wavefunction
+file per k-point) and live on slow, networked filesystems. Discovery therefore:
+
+- looks up the known QE layout (`<prefix>.save/data-file-schema.xml`) with a direct
+  `stat`, without listing the `.save` folder;
+- lists each directory at most once with `os.scandir`, down to a bounded depth;
+- tries candidates in the order of their filename hints, and filters them by name and
+  size before opening any file;
+- reads only the first few kilobytes of a file to recognise it from its header.
+
+Compressed variants of the expected files (e.g. `pw.out.gz`) are found as well: the
+filename patterns are matched against the name without its compression suffix, and the
+header is looked for in the decompressed start of the file.
+
+The result is a `DiscoveredFiles`, which can be stored (see `DiscoveredFiles.to_dict`) to
+skip the discovery when parsing the same directory again.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import lzma
+import os
+import typing
+from collections.abc import Mapping
+from fnmatch import fnmatch
+from pathlib import Path
+
+from qe_tools.outputs.parsers._compression import (
+    COMPRESSED_SUFFIXES,
+    read_head,
+    strip_compressed_suffix,
+)
+
+__all__ = (
+    "DEFAULT_MAX_DEPTH",
+    "DiscoveredFiles",
+    "DiscoveryMixin",
+    "FilePattern",
+    "XML_PATTERN",
+    "discover",
+    "stdout_pattern",
+)
+
+DEFAULT_MAX_DEPTH = 2
+"""Default number of subdirectory levels searched for `recursive` file patterns."""
+
+HEADER_SIZE = 4096
+"""Number of bytes read from a candidate file to look for its `FilePattern.header`."""
+
+NOT_STDOUT = (
+    "*.xml",
+    "*.in",
+    "*.dat",
+    "*.rap",
+    "*.dos",
+    "*.pdos*",
+    "*.wfc*",
+    "*.hub*",
+    "*.mix*",
+    "*.igk*",
+    "*.upf",
+    "*.UPF",
+    "*.cube",
+    "*.json",
+    "*.yml",
+    "*.yaml",
+    "*.py",
+    "*.npy",
+    "*.npz",
+    "*.h5",
+    "*.hdf5",
+    "*.png",
+    "*.pdf",
+)
+"""Filename patterns of files that are never the standard output of a QE code."""
+
+
+@dataclasses.dataclass(frozen=True)
+class FilePattern:
+    """How to recognise one of the output files of a calculation."""
+
+    names: tuple[str, ...]
+    """Filename patterns (`fnmatch` syntax), tried in order of priority. They also match
+    compressed files, with one of the `COMPRESSED_SUFFIXES` appended to the name."""
+
+    exclude: tuple[str, ...] = ()
+    """Filename patterns of files that are skipped without being opened."""
+
+    header: bytes | None = None
+    """Bytes that must occur in the first `HEADER_SIZE` bytes of the file."""
+
+    save_names: tuple[str, ...] = ()
+    """Exact filenames looked up first inside `<prefix>.save` directories."""
+
+    recursive: bool = False
+    """Whether to also search subdirectories, down to the `max_depth` of `discover`."""
+
+    multiple: bool = False
+    """Whether the role takes all the matching files (e.g. the PDOS files of projwfc.x),
+    sorted by path, instead of the first one."""
+
+    def excludes(self, name: str) -> bool:
+        """Whether the file called `name` (possibly compressed) is excluded by its name."""
+        name = strip_compressed_suffix(name)
+        return any(fnmatch(name, pattern) for pattern in self.exclude)
+
+    def matches(self, entry: os.DirEntry) -> bool:
+        """Whether the (regular file) `entry` is the file described by this pattern."""
+        if self.excludes(entry.name):
+            return False
+        if self.header is None:
+            return True
+        try:
+            compressed = strip_compressed_suffix(entry.name) != entry.name
+            if entry.stat().st_size < len(self.header) and not compressed:
+                return False
+            return self.header in read_head(entry.path, HEADER_SIZE)
+        except (OSError, EOFError, lzma.LZMAError):  # e.g. a truncated compressed file
+            return False
+
+
+def stdout_pattern(program: str) -> FilePattern:
+    """Return the pattern of the standard output of the QE code printing `Program <program>`."""
+    return FilePattern(
+        names=("*.out", "*.log", "*stdout*", "*"),
+        exclude=NOT_STDOUT,
+        header=f"Program {program}".encode(),
+    )
+
+
+XML_PATTERN = FilePattern(
+    names=("data-file-schema.xml", "data-file*.xml"),
+    save_names=("data-file-schema.xml", "data-file.xml"),
+    recursive=True,
+)
+"""Pattern of the XML file written by pw.x, usually `<outdir>/<prefix>.save/data-file-schema.xml`."""
+
+
+@dataclasses.dataclass(frozen=True)
+class DiscoveredFiles:
+    """Files found in a calculation directory by `discover`, keyed by their role."""
+
+    directory: Path
+    """Directory that was searched."""
+
+    files: dict[str, typing.Any]
+    """Role (the keyword argument of the `from_files` method of the output class) -> path,
+    or `None` if no such file was found. Roles with a `multiple` pattern have a list of
+    paths."""
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        """Return a JSON-serialisable representation, see `from_dict`."""
+        return {
+            "directory": str(self.directory),
+            "files": {role: _to_str(path) for role, path in self.files.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, typing.Any]) -> DiscoveredFiles:
+        """Recreate the result of a previous discovery from `to_dict` output."""
+        return cls(
+            directory=Path(data["directory"]),
+            files={role: _to_path(path) for role, path in data["files"].items()},
+        )
+
+
+def _to_str(path: Path | list[Path] | None) -> str | list[str] | None:
+    if isinstance(path, list):
+        return [str(item) for item in path]
+    return None if path is None else str(path)
+
+
+def _to_path(path: str | list[str] | None) -> Path | list[Path] | None:
+    if isinstance(path, list):
+        return [Path(item) for item in path]
+    return None if path is None else Path(path)
+
+
+class _Listings:
+    """Lazily lists directories with `os.scandir`, each at most once."""
+
+    def __init__(self, directory: Path, max_depth: int) -> None:
+        self.max_depth = max_depth
+        self._levels: list[list[str]] = [[str(directory)]]
+        self._entries: dict[str, tuple[list[os.DirEntry], list[os.DirEntry]]] = {}
+
+    def entries(self, path: str) -> tuple[list[os.DirEntry], list[os.DirEntry]]:
+        """Return the regular files and the subdirectories of `path`, sorted by name."""
+        if path not in self._entries:
+            files, directories = [], []
+            try:
+                with os.scandir(path) as iterator:
+                    for entry in iterator:
+                        try:
+                            if entry.is_file():
+                                files.append(entry)
+                            elif entry.is_dir() and not entry.name.startswith("."):
+                                directories.append(entry)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            files.sort(key=lambda entry: entry.name)
+            directories.sort(key=lambda entry: entry.name)
+            self._entries[path] = (files, directories)
+        return self._entries[path]
+
+    def level(self, depth: int) -> list[str]:
+        """Return the directories `depth` levels below the root, never entering `.save` ones."""
+        while len(self._levels) <= depth:
+            self._levels.append(
+                [
+                    entry.path
+                    for path in self._levels[-1]
+                    for entry in self.entries(path)[1]
+                    if not entry.name.endswith(".save")
+                ]
+            )
+        return self._levels[depth]
+
+
+def _find(listings: _Listings, pattern: FilePattern) -> Path | None:
+    max_depth = listings.max_depth if pattern.recursive else 0
+    checked: set[str] = set()  # a file matching several `names` is only opened once
+
+    for depth in range(max_depth + 1):
+        directories = listings.level(depth)
+
+        for path in directories:
+            for subdirectory in listings.entries(path)[1]:
+                if not subdirectory.name.endswith(".save"):
+                    continue
+                for name in pattern.save_names:
+                    for suffix in ("", *COMPRESSED_SUFFIXES):
+                        candidate = Path(subdirectory.path, name + suffix)
+                        if candidate.is_file():
+                            return candidate
+
+        for name in pattern.names:
+            for path in directories:
+                for entry in listings.entries(path)[0]:
+                    if entry.path in checked or not fnmatch(
+                        strip_compressed_suffix(entry.name), name
+                    ):
+                        continue
+                    checked.add(entry.path)
+                    if pattern.matches(entry):
+                        return Path(entry.path)
+
+    return None
+
+
+def _find_all(listings: _Listings, pattern: FilePattern) -> list[Path]:
+    max_depth = listings.max_depth if pattern.recursive else 0
+    found = []
+
+    for depth in range(max_depth + 1):
+        for path in listings.level(depth):
+            for entry in listings.entries(path)[0]:
+                name = strip_compressed_suffix(entry.name)
+                if any(fnmatch(name, pattern) for pattern in pattern.names):
+                    if pattern.matches(entry):
+                        found.append(Path(entry.path))
+
+    return sorted(found)
+
+
+def discover(
+    directory: str | Path,
+    patterns: Mapping[str, FilePattern],
+    *,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+) -> DiscoveredFiles:
+    """Find the file matching each of the `patterns` in `directory`.
+
+    Shallower files take precedence over deeper ones; within a directory level, the
+    `save_names` of the pattern come first, then its `names` in order.
+
+    :param max_depth: number of subdirectory levels searched for `recursive` patterns.
+    :raises ValueError: if `directory` is not a directory.
+    """
+    directory = Path(directory)
+
+    if not directory.is_dir():
+        raise ValueError(f"Path `{directory}` is not a valid directory.")
+
+    listings = _Listings(directory, max_depth)
+
+    return DiscoveredFiles(
+        directory=directory,
+        files={
+            role: (_find_all if pattern.multiple else _find)(listings, pattern)
+            for role, pattern in patterns.items()
+        },
+    )
+
+
+class DiscoveryMixin:
+    """Mixin adding `discover` to output classes that declare their `file_patterns`.
+
+    The roles of `file_patterns` are the keyword arguments of `from_files`, so that
+    `cls.from_files(**cls.discover(directory).files)` parses the directory.
+    """
+
+    file_patterns: typing.ClassVar[dict[str, FilePattern]]
+    """Role -> pattern of the output files of the code."""
+
+    @classmethod
+    def discover(
+        cls, directory: str | Path, *, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> DiscoveredFiles:
+        """Locate the output files of the calculation in `directory`, see `discover`."""
+        return discover(directory, cls.file_patterns, max_depth=max_depth)
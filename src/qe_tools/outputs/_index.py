@@ -0,0 +1,241 @@
+"""Index of the files parsed by `from_dir`, to find the calculations that changed since.
+
+Re-ingesting many calculations is dominated by reading their files, although most of
+them did not change since the previous run. With a `FingerprintIndex`, `from_dir`
+records in an SQLite database the fingerprint of the calculation directory and of every
+file it parsed: the inode, size and modification time (`st_mtime_ns`) given by `stat`.
+`changed_since` then compares them with a single `stat` call per file, so that only the
+directories that changed need to be parsed again.
+
+The fingerprints are taken before the files are parsed, so that a file modified while it
+is parsed is reported as changed. A file rewritten with the same size and modification
+time (e.g. restored with its original time stamp) is not detected, and neither are new
+files in subdirectories of the calculation directory: new files at its top level change
+the modification time of the directory.
+
+The index can also record the BLAKE2 digest of the content of the files (see
+`FingerprintIndex.content_hash`): a file whose fingerprint changed but not its content
+(e.g. after `touch`, or a copy) is then not reported as changed, after reading it once.
+The digests are also reused by `CacheConfig`, which does not read the files again to
+compute the key of a calculation whose fingerprints did not change.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+import sqlite3
+import threading
+import typing
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+__all__ = ("FingerprintIndex", "changed_since")
+
+_CHUNK_SIZE = 1 << 20
+
+# One row per file and per output class that parsed it, plus one for the directory
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    directory TEXT NOT NULL,
+    output_class TEXT NOT NULL,
+    path TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (directory, output_class, path)
+);
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+"""
+
+# Connections by process, thread and database, reused by the calls of `from_dir`: closing
+# the last connection to a database checkpoints its write-ahead log, which takes longer
+# than recording a directory
+_CONNECTIONS: dict[tuple[int, int, str], sqlite3.Connection] = {}
+
+
+class _Fingerprint(typing.NamedTuple):
+    inode: int
+    size: int
+    mtime_ns: int
+    digest: str | None = None
+
+    @classmethod
+    def of(cls, path: str) -> _Fingerprint:
+        stat = os.stat(path)
+        return cls(stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+@dataclasses.dataclass(frozen=True)
+class FingerprintIndex:
+    """SQLite database of the files parsed by `from_dir`, queried by `changed_since`."""
+
+    path: str | Path
+    """Path of the database file, created if needed."""
+
+    content_hash: bool = False
+    """Whether to also record the digest of the content of the files, so that files
+    whose fingerprint changed but not their content are not reported as changed. Files
+    parsed with a `CacheConfig` always have their digest recorded."""
+
+    def fingerprint(
+        self,
+        directory: str | Path,
+        files: dict[str, typing.Any],
+        *,
+        digests: bool = False,
+    ) -> dict[str, _Fingerprint]:
+        """Return the fingerprints of `directory` and of the discovered `files`, by path.
+
+        With `digests` or `content_hash`, the digests of the files are included: those
+        recorded for a file with the same fingerprint are reused, the others are computed
+        from the content of the files.
+        """
+        directory = os.path.abspath(directory)
+        paths = [os.path.abspath(path) for path in _paths(files)]
+        fingerprints = {path: _Fingerprint.of(path) for path in [directory, *paths]}
+        if not (digests or self.content_hash):
+            return fingerprints
+
+        connection = self._connect()
+        for path in paths:
+            row = connection.execute(
+                "SELECT digest FROM files WHERE path = ? AND inode = ? AND size = ? "
+                "AND mtime_ns = ? AND digest IS NOT NULL LIMIT 1",
+                (path, *fingerprints[path][:3]),
+            ).fetchone()
+            fingerprints[path] = fingerprints[path]._replace(
+                digest=_file_digest(path) if row is None else row[0]
+            )
+        return fingerprints
+
+    def record(
+        self,
+        directory: str | Path,
+        output_cls: type,
+        fingerprints: dict[str, _Fingerprint],
+    ) -> None:
+        """Record the `fingerprints` of the files of `output_cls` parsed from `directory`.
+
+        The files previously recorded for the same directory and output class are
+        replaced.
+        """
+        directory = os.path.abspath(directory)
+        name = f"{output_cls.__module__}.{output_cls.__qualname__}"
+        connection = self._connect()
+        recorded = connection.execute(
+            "SELECT path, inode, size, mtime_ns, digest FROM files "
+            "WHERE directory = ? AND output_class = ?",
+            (directory, name),
+        ).fetchall()
+        if {path: _Fingerprint(*row) for path, *row in recorded} == fingerprints:
+            return
+
+        with connection:
+            connection.execute(
+                "DELETE FROM files WHERE directory = ? AND output_class = ?",
+                (directory, name),
+            )
+            connection.executemany(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (directory, name, path, *fingerprint)
+                    for path, fingerprint in fingerprints.items()
+                ],
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        key = (os.getpid(), threading.get_ident(), os.path.abspath(self.path))
+        connection = _CONNECTIONS.get(key)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=60)
+            # Readers do not block the writer (e.g. the worker processes of
+            # `from_dirs`), and records are not flushed to disk one by one
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(_SCHEMA)
+            _CONNECTIONS[key] = connection
+        return connection
+
+
+def changed_since(
+    index: FingerprintIndex, directories: Iterable[str | Path] | None = None
+) -> Iterator[Path]:
+    """Yield the directories whose files changed since `from_dir` recorded them in `index`.
+
+    A directory changed if the fingerprint of the directory or of one of the files that
+    were parsed from it changed, or if one of them was removed. With a recorded digest,
+    a file whose fingerprint changed is read to compare its content, and its fingerprint
+    is updated if the content is the same.
+
+    :param index: the index passed to `from_dir`.
+    :param directories: directories to check, also yielded if they were never recorded.
+        Defaults to all the directories recorded in `index`.
+    """
+    connection = index._connect()
+    if directories is None:
+        directories = [
+            Path(directory)
+            for (directory,) in connection.execute(
+                "SELECT DISTINCT directory FROM files ORDER BY directory"
+            )
+        ]
+    for directory in directories:
+        rows = connection.execute(
+            "SELECT DISTINCT path, inode, size, mtime_ns, digest FROM files "
+            "WHERE directory = ?",
+            (os.path.abspath(directory),),
+        ).fetchall()
+        if not rows or _changed(connection, rows):
+            yield Path(directory)
+
+
+def _changed(connection: sqlite3.Connection, rows: list[tuple]) -> bool:
+    """Return whether the files of `rows` of the index changed."""
+    updates = []
+    for path, *recorded in rows:
+        try:
+            current = _Fingerprint.of(path)
+        except OSError:
+            return True
+        if current[:3] == tuple(recorded[:3]):
+            continue
+        digest = recorded[3]
+        if (
+            digest is None
+            or current.size != recorded[1]
+            or _file_digest(path) != digest
+        ):
+            return True
+        updates.append((*current[:3], path, digest))
+
+    if updates:
+        with connection:
+            connection.executemany(
+                "UPDATE files SET inode = ?, size = ?, mtime_ns = ? "
+                "WHERE path = ? AND digest = ?",
+                updates,
+            )
+    return False
+
+
+def _paths(files: dict[str, typing.Any]) -> list:
+    """Return the paths of the discovered `files`, in the order of their roles."""
+    return [path for _, paths in sorted(files.items()) for path in _as_list(paths)]
+
+
+def _as_list(paths: typing.Any) -> list:
+    if paths is None:
+        return []
+    return paths if isinstance(paths, list) else [paths]
+
+
+def _file_digest(path: str | Path) -> str:
+    """Return the hexadecimal BLAKE2 digest of the content of the file at `path`."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,95 @@
+"""Per-instance memoisation of the outputs of a `BaseOutput`."""
+
+from __future__ import annotations
+
+import copy
+import typing
+from collections.abc import Iterable
+
+import numpy as np
+from glom import GlomError
+
+__all__ = ("MemoizedOutputMixin",)
+
+
+def _freeze(value: typing.Any) -> typing.Any:
+    """Return `value` (possibly a dict of arrays) with read-only views of its NumPy arrays.
+
+    The arrays themselves are left writeable: they are often those of `raw_outputs`.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        value = {key: _freeze(item) for key, item in value.items()}
+    return value
+
+
+def _failure(exception: GlomError) -> GlomError:
+    """Return a copy of `exception` to memoise, without the frames of the failed lookup."""
+    for arg in exception.args:
+        if isinstance(arg, BaseException):
+            arg.with_traceback(None)
+    return copy.copy(exception)
+
+
+class MemoizedOutputMixin:
+    """Mixin for `BaseOutput` subclasses that evaluates each output at most once.
+
+    `get_output(name)` stores the value resolved from `raw_outputs` (or a copy of the
+    error raised when it cannot be resolved, raised anew at every call) on the instance,
+    so that later calls only cost a dict lookup. Conversions with `to=` are not memoised,
+    since they typically return mutable objects of other libraries.
+
+    The values are shared between calls: NumPy arrays are returned as read-only views
+    (the arrays of `raw_outputs` are left writeable), and other mutable values (lists,
+    dicts) should be copied before being modified. Assigning `raw_outputs` drops all
+    memoised values; call `clear_cache` after modifying `raw_outputs` in place.
+    """
+
+    _output_cache: dict[str, typing.Any]
+
+    @property
+    def raw_outputs(self) -> dict[str, typing.Any]:
+        return self._raw_outputs
+
+    @raw_outputs.setter
+    def raw_outputs(self, raw_outputs: dict[str, typing.Any]) -> None:
+        self._raw_outputs = raw_outputs
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """Drop all memoised outputs, including the `outputs` namespace."""
+        self._output_cache = {}
+        self.__dict__.pop("outputs", None)
+
+    def get_output(self, name: str, to: str | None = None) -> typing.Any:
+        if to is not None:
+            return super().get_output(name, to=to)  # type: ignore[misc]
+
+        try:
+            value = self._output_cache[name]
+        except KeyError:
+            try:
+                value = _freeze(super().get_output(name))  # type: ignore[misc]
+            except GlomError as exception:
+                value = _failure(exception)
+            self._output_cache[name] = value
+
+        if isinstance(value, GlomError):
+            raise copy.copy(value)
+        return value
+
+    def prefetch(self, names: Iterable[str] | None = None) -> None:
+        """Evaluate and memoise the outputs `names` (all outputs by default).
+
+        Outputs that are not available are skipped.
+        """
+        if names is None:
+            names = self.list_outputs(only_available=False)  # type: ignore[attr-defined]
+
+        for name in names:
+            try:
+                self.get_output(name)
+            except GlomError:
+                continue
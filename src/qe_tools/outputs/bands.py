@@ -10,6 +10,11 @@ from glom import Spec
 from dough import Unit
 from dough.outputs import BaseOutput, output_mapping
 
+from ._archive import ArchiveMixin
+from ._batch import BatchOutputMixin
+from ._cache import CacheConfig, CacheMixin
+from ._discovery import DEFAULT_MAX_DEPTH, DiscoveryMixin, FilePattern, stdout_pattern
+from ._index import FingerprintIndex
 from .parsers.bands import (
     BandsDatParser,
     BandsRapParser,
@@ -78,41 +83,43 @@ class _BandsMapping:
     """
 
 
-class BandsOutput(BaseOutput[_BandsMapping]):
+class BandsOutput(
+    ArchiveMixin,
+    BatchOutputMixin,
+    CacheMixin,
+    DiscoveryMixin,
+    BaseOutput[_BandsMapping],
+):
     """Output of the Quantum ESPRESSO bands.x code."""
 
     converters: typing.ClassVar[dict] = {}
 
+    file_patterns: typing.ClassVar[dict[str, FilePattern]] = {
+        "dat": FilePattern(names=("*.dat",), header=b"&plot"),
+        "rap": FilePattern(names=("*.dat.rap",)),
+        "stdout": stdout_pattern("BANDS"),
+    }
+
     @classmethod
-    def from_dir(cls, directory: str | Path):
-        """Locate filband (`*.dat`, `*.dat.rap`) and bands.x stdout in `directory`."""
-        directory = Path(directory)
-
-        if not directory.is_dir():
-            raise ValueError(f"Path `{directory}` is not a valid directory.")
-
-        rap_file = next(directory.glob("*.dat.rap"), None)
-
-        dat_file = None
-        for candidate in directory.glob("*.dat"):
-            if candidate.name.endswith(".dat.rap"):
-                continue
-            with candidate.open("r") as handle:
-                if "&plot" in handle.readline():
-                    dat_file = candidate
-                    break
-
-        stdout_file = None
-        for file in directory.iterdir():
-            if not file.is_file():
-                continue
-            with file.open("r") as handle:
-                header = "".join(handle.readlines(5))
-            if "Program BANDS" in header:
-                stdout_file = file
-                break
-
-        return cls.from_files(dat=dat_file, rap=rap_file, stdout=stdout_file)
+    def from_dir(
+        cls,
+        directory: str | Path,
+        *,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        cache: CacheConfig | None = None,
+        index: FingerprintIndex | None = None,
+    ):
+        """Locate filband (`*.dat`, `*.dat.rap`) and bands.x stdout in `directory`.
+
+        The files are located with `discover`; `max_depth` is accepted for consistency
+        with the other output classes, since bands.x files are searched at the top level.
+        With a `cache`, the outputs are loaded from the cache if the same files were
+        already parsed (see `CacheConfig`). With an `index`, the parsed files are
+        recorded in it (see `changed_since`).
+        """
+        return cls._from_discovered_files(
+            cls.discover(directory, max_depth=max_depth), cache, index
+        )
 
     @classmethod
     def from_files(
@@ -14,6 +14,17 @@ from qe_tools.converters.aiida import AiiDAConverter
 from qe_tools.converters.ase import ASEConverter
 from qe_tools.converters.pymatgen import PymatgenConverter
 
+from ._archive import ArchiveMixin
+from ._batch import BatchOutputMixin
+from ._cache import CacheConfig, CacheMixin
+from ._discovery import (
+    DEFAULT_MAX_DEPTH,
+    XML_PATTERN,
+    DiscoveryMixin,
+    FilePattern,
+    stdout_pattern,
+)
+from ._index import FingerprintIndex
 from .parsers.stdout import BaseStdoutParser
 from .parsers.dos import DosParser
 from .parsers.pw import PwXMLParser
@@ -58,9 +69,21 @@ class _DosMapping:
     """Spin type: 'non-spin-polarised', 'spin-polarised', 'non-collinear', or 'spin-orbit'."""
 
 
-class DosOutput(BaseOutput[_DosMapping]):
+class DosOutput(
+    ArchiveMixin,
+    BatchOutputMixin,
+    CacheMixin,
+    DiscoveryMixin,
+    BaseOutput[_DosMapping],
+):
     """Output of the Quantum ESPRESSO dos.x code."""
 
+    file_patterns: typing.ClassVar[dict[str, FilePattern]] = {
+        "dos": FilePattern(names=("*.dos",)),
+        "xml": XML_PATTERN,
+        "stdout": stdout_pattern("DOS"),
+    }
+
     converters: typing.ClassVar[dict[str, type[BaseConverter]]] = {
         "ase": ASEConverter,
         "pymatgen": PymatgenConverter,
@@ -68,28 +91,26 @@ class DosOutput(BaseOutput[_DosMapping]):
     }
 
     @classmethod
-    def from_dir(cls, directory: str | Path):
+    def from_dir(
+        cls,
+        directory: str | Path,
+        *,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        cache: CacheConfig | None = None,
+        index: FingerprintIndex | None = None,
+    ):
         """
         From a directory, locates the standard output and XML files and
         parses them.
-        """
-        directory = Path(directory)
 
-        if not directory.is_dir():
-            raise ValueError(f"Path `{directory}` is not a valid directory.")
-
-        stdout_file = None
-        dos_file = next(directory.glob("*.dos"), None)
-        xml_file = next(directory.rglob("data-file*.xml"), None)
-
-        for file in [path for path in directory.iterdir() if path.is_file()]:
-            with file.open("r") as handle:
-                header = "".join(handle.readlines(5))
-
-                if "Program DOS" in header:
-                    stdout_file = file
-
-        return cls.from_files(dos=dos_file, xml=xml_file, stdout=stdout_file)
+        The files are located with `discover`, searching `max_depth` levels of
+        subdirectories for the XML file. With a `cache`, the outputs are loaded from the
+        cache if the same files were already parsed (see `CacheConfig`). With an `index`,
+        the parsed files are recorded in it (see `changed_since`).
+        """
+        return cls._from_discovered_files(
+            cls.discover(directory, max_depth=max_depth), cache, index
+        )
 
     @classmethod
     def from_files(
@@ -0,0 +1,163 @@
+"""Transparent reading of compressed output files.
+
+Completed calculations are often archived with their outputs compressed, e.g. `pw.out.gz`
+or `data-file-schema.xml.xz`. The parsers recognise compressed files from their first
+bytes (not from their name), and read them through a decompressing file object, so the
+content is decoded while it is parsed without writing a decompressed copy.
+
+`gzip`, `bzip2` and `xz` are supported with the standard library; `zstd` needs Python
+3.14 or the `zstandard` package (`pip install qe-tools[zstd]`).
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import typing
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+__all__ = (
+    "COMPRESSED_SUFFIXES",
+    "PrefixedStream",
+    "decompressed_stream",
+    "detect_compression",
+    "open_decompressed",
+    "read_head",
+    "strip_compressed_suffix",
+)
+
+MAGIC_NUMBERS = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+"""Format -> bytes every file compressed in that format starts with."""
+
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+"""Filename suffixes of compressed files, looked for when discovering output files."""
+
+
+def detect_compression(head: bytes | str | Path) -> str | None:
+    """Return the compression format of a file, or `None` if it is not compressed.
+
+    :param head: the first bytes of the file, or its path.
+    """
+    if not isinstance(head, bytes):
+        try:
+            with open(head, "rb") as handle:
+                head = handle.read(6)
+        except OSError:
+            return None
+    for compression, magic in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def strip_compressed_suffix(name: str) -> str:
+    """Return the filename `name` without its compression suffix, e.g. `pw.out` for `pw.out.gz`."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _open_zstd(path: str | Path | BinaryIO, mode: str) -> typing.IO:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+    except ImportError:
+        try:
+            import zstandard as zstd  # type: ignore[import-not-found]
+        except ImportError:
+            raise ModuleNotFoundError(
+                f"Unable to read the zstd-compressed file `{path}`.\n"
+                "Consider (re)installing 'qe-tools` with the 'zstd' extra:\n\n"
+                "  pip install qe-tools[zstd]"
+            ) from None
+    return zstd.open(path, mode)
+
+
+_OPENERS: dict[str, typing.Callable[..., typing.IO]] = {
+    "gzip": gzip.open,
+    "bzip2": bz2.open,
+    "xz": lzma.open,
+    "zstd": _open_zstd,
+}
+
+
+@typing.overload
+def open_decompressed(
+    path: str | Path, mode: typing.Literal["rt"] = "rt"
+) -> TextIO | None: ...
+
+
+@typing.overload
+def open_decompressed(
+    path: str | Path, mode: typing.Literal["rb"]
+) -> BinaryIO | None: ...
+
+
+def open_decompressed(path: str | Path, mode: str = "rt") -> typing.IO | None:
+    """Open a compressed file for reading its decompressed content as text (or bytes,
+    with `mode="rb"`).
+
+    Returns `None` if the file is not compressed, in which case it should be opened as
+    usual. The content is decompressed while it is read.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return None
+    return _OPENERS[compression](path, mode)
+
+
+def read_head(path: str | Path, size: int) -> bytes:
+    """Return the first `size` bytes of the (decompressed) content of a file."""
+    compression = detect_compression(path)
+    if compression is None:
+        with open(path, "rb") as handle:
+            return handle.read(size)
+    with _OPENERS[compression](path, "rb") as handle:
+        return handle.read(size)
+
+
+class PrefixedStream(io.RawIOBase):
+    """Binary stream reading `prefix`, then the rest of `stream`.
+
+    Puts back the bytes read from the start of a stream that cannot seek (e.g. a member
+    of a `tar` archive read sequentially), to look at its magic number or header.
+    """
+
+    def __init__(self, prefix: bytes, stream: typing.IO[bytes]) -> None:
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def decompressed_stream(stream: typing.IO[bytes]) -> BinaryIO:
+    """Return a binary stream with the decompressed content of `stream`, if compressed.
+
+    The compression is detected from the first bytes of `stream`, which only needs to be
+    readable: the content is decompressed while it is read.
+    """
+    head = stream.read(6)
+    prefixed = io.BufferedReader(PrefixedStream(head, stream))
+    compression = detect_compression(head)
+    if compression is None:
+        return typing.cast(BinaryIO, prefixed)
+    return typing.cast(BinaryIO, _OPENERS[compression](prefixed, "rb"))
@@ -0,0 +1,216 @@
+"""Parsing of large output files from a memory map, instead of a decoded `str`.
+
+`BaseOutputFileParser.parse_from_file` reads the whole file into a `str` and parses that:
+for the numerical files of the post-processing codes, the decoded content and the copies
+made to split off the header and to feed `np.loadtxt` take several times the size of the
+file. Parsers deriving from `MappedFileParser` map large files into memory instead, and
+parse the bytes of the map directly: regular expressions run on the map, and the numbers
+are read by `read_numbers` a chunk of lines at a time. Compressed files are read the same
+way from their decompressed stream.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import typing
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TextIO
+
+import numpy as np
+
+from dough.outputs import BaseOutputFileParser
+
+from qe_tools.outputs.parsers._compression import open_decompressed
+
+__all__ = (
+    "MMAP_THRESHOLD",
+    "MappedFileParser",
+    "read_numbers",
+    "read_table",
+    "split_header",
+)
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+"""Size in bytes from which `MappedFileParser.parse_from_file` maps a file into memory."""
+
+TABLE_CHUNK_SIZE = 16 * 1024 * 1024
+"""Number of bytes of a memory map converted to numbers at once by `read_numbers`."""
+
+
+def split_header(buffer: mmap.mmap | bytes) -> tuple[str, int]:
+    """Return the decoded first line of `buffer` and the start of the next one."""
+    start = buffer.find(b"\n") + 1 or len(buffer)
+    return buffer[:start].decode().rstrip("\n"), start
+
+
+def _release(buffer: mmap.mmap | bytes, start: int, end: int) -> None:
+    """Drop the pages of a read-only memory map between `start` and `end` from memory.
+
+    The pages are those of the page cache: they are read again if accessed later, but do
+    not add up in the resident memory of the process while the rest of the file is read.
+    """
+    if isinstance(buffer, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+        start -= start % mmap.PAGESIZE
+        buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def _count_tokens(chunk: bytes) -> int:
+    """Return the number of whitespace-separated tokens in `chunk`."""
+    if not chunk:
+        return 0
+    is_space = np.frombuffer(chunk, dtype=np.uint8) <= ord(" ")
+    # A token starts at the first byte, or after a whitespace byte, if it is not whitespace
+    return int(np.count_nonzero(is_space[:-1] > is_space[1:])) + int(not is_space[0])
+
+
+def _buffer_chunks(
+    buffer: mmap.mmap | bytes, start: int
+) -> Iterator[tuple[int, bytes]]:
+    """Yield the chunks of whole lines of `buffer` from `start` on, with their position.
+
+    The pages of a memory map are released once a chunk has been read.
+    """
+    size = len(buffer)
+    position = start
+    while position < size:
+        end = size
+        if position + TABLE_CHUNK_SIZE < size:
+            end = buffer.rfind(b"\n", position, position + TABLE_CHUNK_SIZE) + 1
+            if end <= position:  # a line longer than the chunk
+                end = buffer.find(b"\n", position + TABLE_CHUNK_SIZE) + 1 or size
+        yield position, buffer[position:end]
+        _release(buffer, position, end)
+        position = end
+
+
+def _stream_chunks(stream: typing.BinaryIO) -> Iterator[tuple[int, bytes]]:
+    """Yield the chunks of whole lines read from `stream`, with their position."""
+    position = 0
+    rest = b""
+    while data := stream.read(TABLE_CHUNK_SIZE):
+        data = rest + data
+        end = data.rfind(b"\n") + 1
+        if end == 0:  # a line longer than the chunk
+            rest = data
+            continue
+        yield position, data[:end]
+        position += end
+        rest = data[end:]
+    if rest:
+        yield position, rest
+
+
+def _read_numbers(
+    source: mmap.mmap | bytes | typing.BinaryIO, start: int
+) -> tuple[np.ndarray, int]:
+    """Return the numbers of `source` from `start` on, and those of its first line."""
+    chunks = (
+        _buffer_chunks(source, start)
+        if isinstance(source, (mmap.mmap, bytes))
+        else _stream_chunks(source)
+    )
+    arrays: list[np.ndarray] = []
+    first_line = 0
+    for position, chunk in chunks:
+        if not arrays:
+            line_end = chunk.find(b"\n")
+            first_line = len(chunk[: None if line_end < 0 else line_end].split())
+        try:
+            numbers = np.fromstring(chunk, sep=" ")
+        except ValueError:  # NumPy >= 2 raises for a token that is not a number...
+            numbers = None
+        # ... while NumPy 1 only warns, and stops reading at that token
+        if numbers is None or numbers.size != _count_tokens(chunk):
+            raise ValueError(
+                f"Could not read the numbers between bytes {position} and "
+                f"{position + len(chunk)}: found a value that is not a number (e.g. "
+                "`***` or `1.0-100`)."
+            )
+        arrays.append(numbers)
+
+    return (np.concatenate(arrays) if arrays else np.empty(0)), first_line
+
+
+def read_numbers(
+    source: mmap.mmap | bytes | typing.BinaryIO, start: int = 0
+) -> np.ndarray:
+    """Read the whitespace-separated numbers in `source` from `start` on, as a flat array.
+
+    `source` is a buffer, or a binary stream read from its current position (`start` is
+    then ignored), e.g. a decompressing file object. The numbers are read a chunk of
+    lines at a time, so that at most about `TABLE_CHUNK_SIZE` bytes are copied at once.
+    Raises a `ValueError` if a token is not a number, e.g. a Fortran overflow `***`.
+    """
+    return _read_numbers(source, start)[0]
+
+
+def read_table(
+    source: mmap.mmap | bytes | typing.BinaryIO, start: int = 0
+) -> np.ndarray:
+    """Read the table of numbers in `source` from `start` on, see `read_numbers`.
+
+    The number of columns is that of the first line.
+    """
+    values, columns = _read_numbers(source, start)
+    if columns == 0 or values.size % columns:
+        raise ValueError(
+            f"Could not read a table of {columns} columns: found {values.size} numbers."
+        )
+    return values.reshape(-1, columns)
+
+
+class MappedFileParser(BaseOutputFileParser):
+    """File parser that maps files of at least `mmap_threshold` bytes into memory.
+
+    Subclasses implement `parse_buffer`, which receives the read-only `mmap.mmap` of the
+    file, and `parse_stream`, which receives the binary stream of a compressed file
+    decompressed while it is read; smaller files and open file handles go through
+    `parse` as before.
+    """
+
+    mmap_threshold: typing.ClassVar[int] = MMAP_THRESHOLD
+
+    @classmethod
+    def parse_buffer(cls, buffer: mmap.mmap) -> dict[str, typing.Any]:
+        """Parse the bytes of a file mapped into memory.
+
+        The default implementation decodes the buffer and passes it to `parse`.
+        """
+        return cls.parse(buffer[:].decode())
+
+    @classmethod
+    def parse_stream(cls, stream: typing.BinaryIO) -> dict[str, typing.Any]:
+        """Parse the content of a binary stream, read from its current position.
+
+        The default implementation decodes the whole content as text and passes it to
+        `parse`.
+        """
+        return cls.parse(io.TextIOWrapper(stream).read())
+
+    @classmethod
+    def parse_from_file(cls, file: str | Path | TextIO) -> dict[str, typing.Any]:
+        """Parse a file from a path or an open file handle.
+
+        Files given by a path of at least `mmap_threshold` bytes are parsed from a memory
+        map with `parse_buffer`. Compressed files (see `open_decompressed`) are parsed
+        with `parse_stream`, decompressed while they are read.
+        """
+        if isinstance(file, (str, Path)):
+            decompressed = open_decompressed(file, "rb")
+            if decompressed is not None:
+                with decompressed:
+                    return cls.parse_stream(decompressed)
+
+        if isinstance(file, (str, Path)) and os.path.getsize(file) >= max(
+            cls.mmap_threshold, 1
+        ):
+            with (
+                Path(file).open("rb") as handle,
+                mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer,
+            ):
+                return cls.parse_buffer(buffer)
+
+        return super().parse_from_file(file)
@@ -0,0 +1,258 @@
+"""Single-pass, line-oriented scanning of QE stdout files.
+
+Parsers register handlers on a `LineScanner`, keyed by the start of the lines they are
+interested in: their first word (e.g. `Program`) or first few words (e.g.
+`total   stress`, as QE prints it). The stdout is read once, in chunks. Within a chunk,
+the lines that start with one of the prefixes are found by a single regular expression,
+in which the prefixes are factored into a trie so that most lines are rejected on their
+first character, and only those lines are passed to Python code. Adding a quantity
+therefore costs no extra pass over the file, and the file never needs to be in memory as
+a whole.
+
+Blocks whose lines do not start with a recognisable prefix (e.g. the atomic positions
+following `ATOMIC_POSITIONS`) are read by a handler asking for the next lines with
+`LineScanner.read_lines`.
+
+Besides storing results in `LineScanner.data`, handlers can `emit` an `Event` as soon as a
+quantity is read, e.g. to monitor a calculation that is still running.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import io
+import re
+import typing
+from collections.abc import Callable, Iterable
+from typing import TextIO
+
+__all__ = ("CHUNK_SIZE", "BlockHandler", "Event", "LineHandler", "LineScanner")
+
+CHUNK_SIZE = 1024 * 1024
+"""Number of characters read from a file handle at once by `LineScanner.scan_file`."""
+
+LineHandler = Callable[[str, "LineScanner"], None]
+"""Called with a line (including its line ending) and the scanner, which holds the
+parsed `data` and allows registering further handlers."""
+
+BlockHandler = Callable[[list[str], "LineScanner"], None]
+"""Called with the lines requested with `LineScanner.read_lines` and the scanner."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Event:
+    """A quantity read from the output, see `LineScanner.emit`."""
+
+    name: str
+    """Name of the quantity, e.g. `scf_accuracy`."""
+
+    value: typing.Any
+    """Value of the quantity in the units of the stdout, e.g. energies in Ry and positions
+    in bohr, without the unit conversions of the corresponding output."""
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Return a regular expression matching any of `words`, with common prefixes factored."""
+    trie: dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for character in word:
+            node = node.setdefault(character, {})
+        node[""] = {}  # end of a word
+
+    def build(node: dict[str, dict]) -> str:
+        branches = [
+            re.escape(character) + build(child)
+            for character, child in sorted(node.items())
+            if character
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{pattern})?"
+        return pattern
+
+    return build(trie)
+
+
+class LineScanner:
+    """Dispatches lines to the handlers registered for their start.
+
+    Text can be passed all at once (`scan_text`, `scan_file`) or piece by piece with
+    `feed_text`, followed by `finish` once the end of the output is reached.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[str, typing.Any] = {}
+        self._handlers: dict[str, list[LineHandler]] = {}
+        self._finalizers: list[Callable[[LineScanner], None]] = []
+        self._block: tuple[int, list[str], BlockHandler] | None = None
+        self._rest = ""  # incomplete last line of the text fed so far
+        self._compiled: _Compiled | None = None
+        self.on_event: Callable[[Event], None] | None = None
+        """Called with the events emitted by the handlers, if set."""
+
+    def add_handler(self, prefix: str, handler: LineHandler) -> None:
+        """Call `handler` for every line that starts with the words in `prefix`.
+
+        Leading whitespace of the line is ignored, and `prefix` must be followed by
+        whitespace or the end of the line: `total` matches `  total energy` but not
+        `totally`.
+
+        Handlers may register further handlers while scanning, e.g. once the name of the
+        code is known; they apply from the next line on.
+        """
+        self._handlers.setdefault(prefix, []).append(handler)
+        self._compiled = None
+
+    def emit(self, name: str, value: typing.Any) -> None:
+        """Report a quantity read by a handler to `on_event`; a no-op if it is not set."""
+        if self.on_event is not None:
+            self.on_event(Event(name, value))
+
+    def add_finalizer(self, finalizer: Callable[[LineScanner], None]) -> None:
+        """Call `finalizer` with the scanner once the end of the output is reached."""
+        self._finalizers.append(finalizer)
+
+    def read_lines(self, count: int, handler: BlockHandler) -> None:
+        """Pass the next `count` lines, however they start, to `handler`.
+
+        Meant to be called by a line handler for the block following its line. The lines
+        are not dispatched to other handlers. If the output ends before, the handler is
+        not called.
+        """
+        if self._block is not None:
+            raise RuntimeError("Only one block of lines can be read at a time.")
+        self._block = (count, [], handler)
+
+    def feed(self, line: str) -> None:
+        """Dispatch a single line."""
+        if self._block is not None:
+            self._block[1].append(line)
+            self._read_block("", 0)
+            return
+
+        compiled = self._compile()
+        match = compiled.first_line.match(line)
+        if match:
+            for handler in compiled.handlers[line[: match.end()].lstrip()]:
+                handler(line, self)
+
+    def feed_text(self, text: str) -> None:
+        """Dispatch the complete lines of `text`, keeping its incomplete last line.
+
+        The incomplete line is completed by the next call, or dispatched by `finish`.
+        """
+        text = self._rest + text
+        cut = text.rfind("\n") + 1
+        self._rest = text[cut:]
+        self._scan(text[:cut])
+
+    def finish(self) -> dict[str, typing.Any]:
+        """Dispatch the incomplete last line, run the finalizers and return the `data`."""
+        rest, self._rest = self._rest, ""
+        self._scan(rest)
+        self._block = None
+
+        finalizers, self._finalizers = self._finalizers, []
+        for finalizer in finalizers:
+            finalizer(self)
+
+        return self.data
+
+    def scan(self, lines: Iterable[str]) -> dict[str, typing.Any]:
+        """Dispatch all `lines` and return the parsed `data`."""
+        for line in lines:
+            self.feed(line)
+        return self.finish()
+
+    def scan_text(self, text: str) -> dict[str, typing.Any]:
+        """Dispatch the lines of `text` and return the parsed `data`."""
+        self.feed_text(text)
+        return self.finish()
+
+    def scan_file(
+        self, handle: TextIO | io.TextIOBase, chunk_size: int = CHUNK_SIZE
+    ) -> dict[str, typing.Any]:
+        """Dispatch the lines of an open text file, read in chunks, and return the `data`."""
+        while chunk := handle.read(chunk_size):
+            self.feed_text(chunk)
+        return self.finish()
+
+    def _read_block(self, text: str, position: int) -> int:
+        """Complete the requested blocks of lines from `text`, return the new `position`."""
+        while self._block is not None:
+            count, lines, handler = self._block
+            while len(lines) < count and position < len(text):
+                end = text.find("\n", position) + 1 or len(text)
+                lines.append(text[position:end])
+                position = end
+            if len(lines) < count:
+                break
+            self._block = None
+            handler(lines, self)
+
+        return position
+
+    def _compile(self) -> _Compiled:
+        if self._compiled is None:
+            self._compiled = _Compiled(self._handlers)
+        return self._compiled
+
+    def _scan(self, text: str) -> None:
+        position = self._read_block(text, 0)  # start of the first line not dispatched
+
+        if position == 0:
+            compiled = self._compile()
+            match = compiled.first_line.match(text)
+            if match:
+                position = self._dispatch(compiled, text, 0, match.end())
+
+        while True:
+            compiled = self._compile()
+            # `position` is the start of a line, so the previous character is a newline
+            for match in compiled.next_line.finditer(text, max(position - 1, 0)):
+                start = match.start() + 1
+                if start < position:  # read by a block handler
+                    continue
+                position = self._dispatch(compiled, text, start, match.end())
+                if self._compiled is not compiled:
+                    break  # handlers were added: search again with the new ones
+            else:
+                break
+
+    def _dispatch(self, compiled: _Compiled, text: str, start: int, end: int) -> int:
+        """Dispatch the line of `text` at `start`, with a prefix ending at `end`.
+
+        Returns the start of the next line that is not read by a block handler.
+        """
+        position = text.find("\n", end) + 1 or len(text)
+        line = text[start:position]
+        for handler in compiled.handlers[text[start:end].lstrip()]:
+            handler(line, self)
+        if self._block is None:
+            return position
+        return self._read_block(text, position)
+
+
+class _Compiled:
+    """Regular expressions finding the lines with handlers, and the handlers per prefix."""
+
+    def __init__(self, handlers: dict[str, list[LineHandler]]) -> None:
+        line = rf"[ \t]*{_trie_pattern(handlers) or '(?!)'}(?=\s|\Z)"
+        self.first_line = re.compile(line)
+        self.next_line = re.compile(rf"\n{line}")
+
+        # The regular expressions match the longest prefix of a line: its handlers come
+        # with those of the shorter prefixes it starts with, e.g. `total` for `total energy`
+        self.handlers: dict[str, tuple[LineHandler, ...]] = {
+            prefix: tuple(
+                handler
+                for other, other_handlers in handlers.items()
+                if prefix == other
+                or (prefix.startswith(other) and prefix[len(other)].isspace())
+                for handler in other_handlers
+            )
+            for prefix in handlers
+        }
@@ -0,0 +1,119 @@
+"""Read the convergence history of the SCF cycles from the stdout of pw.x.
+
+An SCF cycle is a sequence of `iteration #` blocks, a new cycle starting when the
+iteration number does not increase (e.g. at every ionic step of a `relax` run). The last
+iteration of a converged cycle prints its energy on the `!    total energy` line instead
+of the usual `total energy` one.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from qe_tools.outputs.parsers._scanner import LineScanner
+
+__all__ = ("ScfHistoryReader",)
+
+
+def _number_after(line: str, separator: str) -> float:
+    """Return the number after `separator` in `line`, or NaN if it cannot be read (e.g. the
+    `****` printed for numbers too large for their format, or a truncated line)."""
+    try:
+        return float(line.split(separator, 1)[1].split()[0])
+    except (IndexError, ValueError):
+        return math.nan
+
+
+class ScfHistoryReader:
+    """Line handlers that read the history of every SCF cycle of a pw.x run, see `register`.
+
+    The `total_energy` (Ry), `scf_accuracy` (Ry) and `time` (s) of the iterations of all
+    cycles are concatenated, so that the history of a run is a few flat arrays rather than
+    a list per cycle: the iterations of cycle `i` are `offsets[i]:offsets[i + 1]`.
+    The time of an iteration is the increase of the `total cpu time spent up to now` that
+    QE prints during it. Values that are not printed for an iteration, or that cannot be
+    read (e.g. `****`), are `NaN`.
+
+    The handlers also emit the `scf_iteration` number, the `scf_energy` estimate, the
+    `scf_accuracy` and the `cpu_time` to `LineScanner.on_event`, except for the values
+    that cannot be read.
+    """
+
+    def __init__(self) -> None:
+        self.total_energy: list[float] = []
+        self.scf_accuracy: list[float] = []
+        self.time: list[float] = []
+        self.offsets: list[int] = [0]
+        self._iteration = 0  # number of the current iteration in its cycle
+        self._converged = False  # the `!` energy of the current cycle was read
+        self._cpu_time: float | None = None
+        self._start: float | None = None  # CPU time at the start of the iteration
+
+    def register(self, scanner: LineScanner) -> None:
+        """Register the handlers on `scanner`, with a finalizer storing `scf_history`."""
+        scanner.add_handler("iteration", self._parse_iteration)
+        scanner.add_handler("total energy", self._parse_energy)
+        scanner.add_handler("!", self._parse_converged_energy)
+        scanner.add_handler("!!", self._parse_converged_energy)
+        scanner.add_handler("estimated scf accuracy", self._parse_accuracy)
+        scanner.add_handler("total cpu time spent up to now is", self._parse_cpu_time)
+        scanner.add_finalizer(self._store)
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        """Return the history as arrays, with the `offsets` of the cycles."""
+        return {
+            "total_energy": np.array(self.total_energy),
+            "scf_accuracy": np.array(self.scf_accuracy),
+            "time": np.array(self.time),
+            "offsets": np.array([*self.offsets, len(self.total_energy)]),
+        }
+
+    def _store(self, scanner: LineScanner) -> None:
+        if self.total_energy:
+            scanner.data["scf_history"] = self.to_dict()
+
+    def _parse_iteration(self, line: str, scanner: LineScanner) -> None:
+        if "#" not in line:
+            return
+        value = _number_after(line, "#")
+        # An iteration number that cannot be read continues the cycle
+        number = self._iteration + 1 if math.isnan(value) else int(value)
+        if self._iteration and number <= self._iteration:
+            self.offsets.append(len(self.total_energy))
+        self._iteration = number
+        self._converged = False
+        self._start = self._cpu_time
+        for values in (self.total_energy, self.scf_accuracy, self.time):
+            values.append(math.nan)
+        if not math.isnan(value):
+            scanner.emit("scf_iteration", number)
+
+    def _parse_energy(self, line: str, scanner: LineScanner) -> None:
+        energy = _number_after(line, "=")
+        if self._iteration and not self._converged:
+            self.total_energy[-1] = energy
+        if not math.isnan(energy):
+            scanner.emit("scf_energy", energy)
+
+    def _parse_converged_energy(self, line: str, scanner: LineScanner) -> None:
+        if "total energy" in line and self._iteration and not self._converged:
+            self.total_energy[-1] = _number_after(line, "=")
+            self._converged = True
+
+    def _parse_accuracy(self, line: str, scanner: LineScanner) -> None:
+        accuracy = _number_after(line, "<")
+        if self._iteration and math.isnan(self.scf_accuracy[-1]):
+            self.scf_accuracy[-1] = accuracy
+        if not math.isnan(accuracy):
+            scanner.emit("scf_accuracy", accuracy)
+
+    def _parse_cpu_time(self, line: str, scanner: LineScanner) -> None:
+        self._cpu_time = _number_after(line, "up to now is")
+        # Only the first CPU time of an iteration, the next ones follow the SCF cycle
+        if self._start is not None:
+            self.time[-1] = self._cpu_time - self._start
+            self._start = None
+        if not math.isnan(self._cpu_time):
+            scanner.emit("cpu_time", self._cpu_time)
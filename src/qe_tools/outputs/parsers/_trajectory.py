@@ -0,0 +1,230 @@
+"""Read the ionic steps of `relax`, `vc-relax` and `md` runs from the stdout of pw.x.
+
+A step is closed by the next `!    total energy` line (or the end of the output), so that
+the forces and stress printed after the energy belong to it. The structure of a step is
+the one the energy was computed for: the header structure for the first step, then the
+`CELL_PARAMETERS` and `ATOMIC_POSITIONS` blocks printed after each step for the next one.
+"""
+
+from __future__ import annotations
+
+import re
+import typing
+from collections.abc import Callable
+
+import numpy as np
+
+from qe_tools.outputs.parsers._scanner import LineScanner
+
+from qe_tools import CONSTANTS
+
+__all__ = ("StepReader", "TrajectoryBuilder")
+
+_ALAT_RE = re.compile(r"alat\s*=\s*([\d.]+)")
+
+
+def _value(line: str) -> float:
+    """Return the number following the `=` of `line`."""
+    return float(line.split("=", 1)[1].split()[0])
+
+
+def _vector(line: str) -> list[float]:
+    """Return the numbers between the last pair of parentheses of `line`."""
+    return [float(value) for value in line.rsplit("(", 1)[1].split(")")[0].split()]
+
+
+def _unit(line: str) -> str:
+    """Return the unit of a card header, e.g. `crystal` for `ATOMIC_POSITIONS (crystal)`."""
+    for opening, closing in ("()", "{}"):
+        if opening in line:
+            return line.split(opening, 1)[1].split(closing)[0].strip().lower()
+    return "alat"
+
+
+class StepReader:
+    """Line handlers that read the ionic steps of a pw.x run, see `register`.
+
+    Every completed step is passed to `on_step` as a dictionary with the `energy` (Ry),
+    `cell` (bohr, shape `(3, 3)`), `positions` (Cartesian, bohr, shape `(n_atoms, 3)`),
+    `forces` (Ry/bohr, shape `(n_atoms, 3)`) and `stress` (Ry/bohr^3, shape `(3, 3)`); the
+    quantities not printed for a step are left out. Like the other parsers, the values are
+    in the Rydberg atomic units of the stdout, only converted to Cartesian coordinates.
+    """
+
+    def __init__(self, on_step: Callable[[dict[str, typing.Any]], None]) -> None:
+        self.on_step = on_step
+        self.number_of_atoms: int | None = None
+        self.symbols: list[str] | None = None
+        self._alat: float | None = None  # in bohr
+        self._cell: np.ndarray | None = None
+        self._positions: np.ndarray | None = None
+        self._step: dict[str, typing.Any] | None = None
+
+    def register(self, scanner: LineScanner) -> None:
+        """Register the handlers on `scanner`."""
+        scanner.add_handler("number of atoms/cell", self._parse_number_of_atoms)
+        scanner.add_handler("lattice parameter (alat)", self._parse_alat)
+        for index in range(3):
+            scanner.add_handler(f"a({index + 1})", self._parse_crystal_axis)
+        scanner.add_handler("site n.", self._parse_site)
+        scanner.add_handler("CELL_PARAMETERS", self._parse_cell_parameters)
+        scanner.add_handler("ATOMIC_POSITIONS", self._parse_atomic_positions)
+        scanner.add_handler("!", self._parse_energy)
+        scanner.add_handler("!!", self._parse_energy)
+        scanner.add_handler("Forces acting on atoms", self._parse_forces)
+        scanner.add_handler("total   stress", self._parse_stress)
+        scanner.add_finalizer(self._close_step)
+
+    def _close_step(self, scanner: LineScanner) -> None:
+        if self._step is not None:
+            self.on_step(self._step)
+            scanner.emit("step", self._step)
+            self._step = None
+
+    def _parse_number_of_atoms(self, line: str, scanner: LineScanner) -> None:
+        self.number_of_atoms = int(_value(line))
+
+    def _parse_alat(self, line: str, scanner: LineScanner) -> None:
+        self._alat = _value(line)
+
+    def _parse_crystal_axis(self, line: str, scanner: LineScanner) -> None:
+        if self._alat is None:
+            return
+        index = int(line.split("(", 1)[1].split(")", 1)[0]) - 1
+        if index == 0 or self._cell is None:
+            # A new array, the previous one is kept by the steps
+            self._cell = np.zeros((3, 3))
+        self._cell[index] = np.array(_vector(line)) * self._alat
+
+    def _parse_site(self, line: str, scanner: LineScanner) -> None:
+        if "(alat units)" not in line or not self.number_of_atoms or not self._alat:
+            return
+        alat = self._alat
+
+        def parse(lines: list[str], scanner: LineScanner) -> None:
+            self.symbols = [line.split()[1] for line in lines]
+            self._positions = np.array([_vector(line) for line in lines]) * alat
+
+        scanner.read_lines(self.number_of_atoms, parse)
+
+    def _parse_cell_parameters(self, line: str, scanner: LineScanner) -> None:
+        unit = _unit(line)
+        match = _ALAT_RE.search(line)
+        if match:
+            self._alat = float(match.group(1))
+
+        def parse(lines: list[str], scanner: LineScanner) -> None:
+            cell = np.array([line.split()[:3] for line in lines], dtype=float)
+            if unit == "angstrom":
+                cell /= CONSTANTS.bohr_to_ang
+            elif unit.startswith("alat"):
+                if self._alat is None:
+                    return
+                cell *= self._alat
+            self._cell = cell
+
+        scanner.read_lines(3, parse)
+
+    def _parse_atomic_positions(self, line: str, scanner: LineScanner) -> None:
+        if not self.number_of_atoms:
+            return
+        unit = _unit(line)
+
+        def parse(lines: list[str], scanner: LineScanner) -> None:
+            columns = [line.split() for line in lines]
+            positions = np.array([column[1:4] for column in columns], dtype=float)
+            if unit == "angstrom":
+                positions /= CONSTANTS.bohr_to_ang
+            elif unit == "crystal":
+                if self._cell is None:
+                    return
+                positions = positions @ self._cell
+            elif unit == "alat":
+                if self._alat is None:
+                    return
+                positions *= self._alat
+            elif unit != "bohr":
+                return
+            self.symbols = [column[0] for column in columns]
+            self._positions = positions
+
+        scanner.read_lines(self.number_of_atoms, parse)
+
+    def _parse_energy(self, line: str, scanner: LineScanner) -> None:
+        if "total energy" not in line:
+            return
+        self._close_step(scanner)
+        self._step = {"energy": _value(line)}
+        scanner.emit("total_energy", self._step["energy"])
+        if self._cell is not None:
+            self._step["cell"] = self._cell
+        if self._positions is not None:
+            self._step["positions"] = self._positions
+
+    def _parse_forces(self, line: str, scanner: LineScanner) -> None:
+        if self._step is None or self.number_of_atoms is None:
+            return
+        step, number_of_atoms = self._step, self.number_of_atoms
+
+        def parse(lines: list[str], scanner: LineScanner) -> None:
+            # The forces follow an empty line, before the contributions of verbose runs
+            vectors = [
+                line.split("=", 1)[1].split()[:3] for line in lines if "force =" in line
+            ]
+            if len(vectors) >= number_of_atoms:
+                step["forces"] = np.array(vectors[:number_of_atoms], dtype=float)
+
+        scanner.read_lines(number_of_atoms + 1, parse)
+
+    def _parse_stress(self, line: str, scanner: LineScanner) -> None:
+        if self._step is None:
+            return
+        step = self._step
+
+        def parse(lines: list[str], scanner: LineScanner) -> None:
+            step["stress"] = np.array([line.split()[:3] for line in lines], dtype=float)
+
+        scanner.read_lines(3, parse)
+
+
+class TrajectoryBuilder:
+    """Stacks the steps of a `StepReader` into arrays with a leading `n_steps` axis.
+
+    The arrays are allocated ahead and grown by doubling their capacity, so that appending
+    a step does not copy the previous ones. Quantities missing for some of the steps are
+    filled with `NaN`.
+    """
+
+    INITIAL_CAPACITY = 16
+
+    def __init__(self) -> None:
+        self.number_of_steps = 0
+        self._capacity = 0
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def append(self, step: dict[str, typing.Any]) -> None:
+        """Add a step to the trajectory."""
+        if self.number_of_steps == self._capacity:
+            self._capacity = max(2 * self._capacity, self.INITIAL_CAPACITY)
+            for key, array in self._arrays.items():
+                self._arrays[key] = self._allocate(array.shape[1:])
+                self._arrays[key][: self.number_of_steps] = array[
+                    : self.number_of_steps
+                ]
+
+        for key, value in step.items():
+            if key not in self._arrays:
+                self._arrays[key] = self._allocate(np.shape(value))
+            self._arrays[key][self.number_of_steps] = value
+
+        self.number_of_steps += 1
+
+    def _allocate(self, shape: tuple[int, ...]) -> np.ndarray:
+        return np.full((self._capacity, *shape), np.nan)
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        """Return the arrays, trimmed to the number of steps."""
+        return {
+            key: array[: self.number_of_steps].copy()
+            for key, array in self._arrays.items()
+        }
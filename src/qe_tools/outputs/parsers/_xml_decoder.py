@@ -0,0 +1,313 @@
+"""Fast, non-validating decoding of QE XML files driven by a schema-derived type table.
+
+`XMLSchema.to_dict` validates every element against its schema declaration while
+decoding, which dominates the parsing time of large `data-file-schema.xml` files. For
+trusted files written by QE itself, `decode` produces the same dictionary (same keys,
+same nesting, same Python types) by walking the `ElementTree` once and applying the
+conversions recorded in a `TypeTable`. The table is derived from the compiled schema
+once per schema version and cached.
+
+Both decoders can be restricted to a `Selection` of subtrees, so that callers interested
+in a few quantities do not pay for decoding e.g. all `ks_energies` blocks.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import Callable, Iterable
+from typing import Any, Union
+from xml.etree import ElementTree
+
+from xmlschema import XMLSchema
+from xmlschema.validators import XsdAtomicBuiltin, XsdElement
+
+from qe_tools.outputs.parsers.schemas import SCHEMA_REGISTRY
+
+__all__ = (
+    "Selection",
+    "TypeTable",
+    "build_selection",
+    "decode",
+    "decode_validated",
+    "exclude",
+    "get_type_table",
+)
+
+Converter = Callable[[str], Any]
+
+Selection = dict[str, Union["Selection", None]]
+"""Tree of child tags to decode: `None` selects the whole subtree of an element, while a
+(possibly empty) dict decodes the attributes and text of the element, plus the selected
+children only."""
+
+
+def _to_bool(text: str) -> bool:
+    text = text.strip()
+    if text in ("true", "1"):
+        return True
+    if text in ("false", "0"):
+        return False
+    raise ValueError(f"Invalid boolean value {text!r} in XML file.")
+
+
+def _to_str(text: str) -> str:
+    return text
+
+
+def _atomic_converter(xsd_type: Any) -> Converter:
+    """Return the converter for an atomic simple type, based on its builtin ancestor."""
+    while not isinstance(xsd_type, XsdAtomicBuiltin):
+        xsd_type = xsd_type.base_type
+
+    python_type = xsd_type.python_type
+    if python_type is bool:
+        return _to_bool
+    if python_type in (float, int):
+        return python_type
+    if python_type is str:
+        return _to_str
+    return xsd_type.to_python
+
+
+def _list_converter(item_converter: Converter) -> Converter:
+    def convert(text: str) -> list:
+        return list(map(item_converter, text.split()))
+
+    return convert
+
+
+def _simple_converter(simple_type: Any) -> Converter:
+    """Return the converter for the text of an element or attribute of `simple_type`."""
+    if simple_type.is_list():
+        item_type = getattr(simple_type, "item_type", None)
+        if item_type is None:
+            # Restriction of a list type, e.g. `d3vectorType`
+            item_type = simple_type.primitive_type.item_type
+        return _list_converter(_atomic_converter(item_type))
+    return _atomic_converter(simple_type)
+
+
+class TypeTable:
+    """Decoding instructions for one element declaration of the schema.
+
+    - `attributes`: attribute name -> converter
+    - `defaults`: attribute name -> default value, for attributes with a schema default
+    - `children`: child tag -> `(TypeTable, is_single)`; repeated children decode to lists
+    - `text`: converter for the text content, or `None` for element-only content
+    """
+
+    __slots__ = ("attributes", "children", "defaults", "text")
+
+    def __init__(self) -> None:
+        self.attributes: dict[str, Converter] = {}
+        self.defaults: dict[str, Any] = {}
+        self.children: dict[str, tuple[TypeTable, bool]] = {}
+        self.text: Converter | None = None
+
+    @classmethod
+    def from_element(
+        cls, element: XsdElement, _tables: dict[int, TypeTable] | None = None
+    ) -> TypeTable:
+        """Build the table for the `element` declaration and, recursively, its children."""
+        tables = {} if _tables is None else _tables
+        xsd_type: Any = element.type
+
+        # Types are shared by many elements (and may be recursive): build each table once
+        if id(xsd_type) in tables:
+            return tables[id(xsd_type)]
+
+        table = tables[id(xsd_type)] = cls()
+
+        if xsd_type.is_simple():
+            table.text = _simple_converter(xsd_type)
+            return table
+
+        for name, attribute in xsd_type.attributes.items():
+            if name is None:  # attribute wildcard
+                continue
+            converter = _simple_converter(attribute.type)
+            table.attributes[name] = converter
+            if attribute.default is not None:
+                table.defaults[name] = converter(attribute.default)
+
+        if xsd_type.has_simple_content():
+            table.text = _simple_converter(xsd_type.content)
+        elif xsd_type.content is not None:
+            for child in xsd_type.content.iter_elements():
+                if isinstance(child, XsdElement):
+                    table.children[child.local_name] = (
+                        cls.from_element(child, tables),
+                        child.is_single(),
+                    )
+
+        return table
+
+
+@functools.lru_cache(maxsize=None)
+def get_type_table(schema_filename: str) -> TypeTable:
+    """Return the `TypeTable` of the root element of a vendored schema."""
+    schema: XMLSchema = SCHEMA_REGISTRY.get(schema_filename)
+    return TypeTable.from_element(schema.elements["espresso"])
+
+
+def build_selection(paths: Iterable[str]) -> Selection | None:
+    """Build a `Selection` from dot-separated element paths relative to the root.
+
+    A path selects the whole subtree of its last element, e.g. `output.band_structure.nks`.
+    Trailing attribute (`@name`) or text (`$`) segments select only the attributes and
+    text of their parent element, e.g. `output.atomic_structure.@alat`. Returns `None`
+    (select everything) if one of the paths is empty.
+    """
+    selection: Selection = {}
+
+    for path in paths:
+        segments = path.split(".") if path else []
+        shallow = False
+        while segments and segments[-1].startswith(("@", "$")):
+            segments.pop()
+            shallow = True
+
+        if not segments:
+            if shallow:  # the attributes of the root element are always decoded
+                continue
+            return None
+
+        _select(selection, segments, shallow)
+
+    return selection
+
+
+def _select(node: Selection, segments: list[str], shallow: bool) -> None:
+    head, *rest = segments
+
+    if head in node and node[head] is None:  # already selected as a whole
+        return
+
+    if not rest:
+        if shallow:
+            node.setdefault(head, {})
+        else:
+            node[head] = None
+        return
+
+    child = node.get(head) or {}
+    node[head] = child
+    _select(child, rest, shallow)
+
+
+def exclude(
+    selection: Selection | None, table: TypeTable, path: Iterable[str]
+) -> Selection:
+    """Return a copy of `selection` (`None` for everything) without the element at `path`.
+
+    Ancestors of the excluded element that were selected as a whole are expanded into the
+    children declared by `table`, so their other children are still decoded.
+    """
+    head, *rest = path
+    result: Selection = (
+        dict.fromkeys(table.children) if selection is None else dict(selection)
+    )
+
+    if head not in result:
+        return result
+    if not rest:
+        del result[head]
+        return result
+
+    result[head] = exclude(result[head], table.children[head][0], rest)
+    return result
+
+
+def _decode_attributes(element: ElementTree.Element, table: TypeTable) -> dict:
+    result: dict[str, Any] = {}
+
+    for name, raw in element.attrib.items():
+        converter = table.attributes.get(name)
+        result[f"@{name}"] = raw if converter is None else converter(raw)
+    for name, default in table.defaults.items():
+        result.setdefault(f"@{name}", default)
+
+    return result
+
+
+def decode(
+    element: ElementTree.Element,
+    table: TypeTable,
+    selection: Selection | None = None,
+) -> Any:
+    """Decode `element` into the dictionary `XMLSchema.to_dict` would produce, without validation.
+
+    Attributes become `@name` keys, repeated children become lists and simple content is
+    stored under `$` when the element also has attributes. Empty elements without
+    attributes decode to `None`. With a `selection`, only the selected children are decoded.
+    """
+    result = _decode_attributes(element, table)
+
+    if table.text is not None or (not table.children and len(element) == 0):
+        text_converter = table.text or _to_str
+        text = element.text
+        value = text_converter(text) if text is not None and text.strip() else None
+        if not result:
+            return value
+        if value is not None:
+            result["$"] = value
+        return result
+
+    for child in element:
+        tag = child.tag
+        if selection is not None and tag not in selection:
+            continue
+        # Elements missing from the schema are decoded as nested strings
+        child_table, is_single = table.children.get(tag, (_UNKNOWN, True))
+        value = decode(
+            child, child_table, None if selection is None else selection[tag]
+        )
+        if is_single:
+            result[tag] = value
+        else:
+            result.setdefault(tag, []).append(value)
+
+    return result or None
+
+
+def decode_validated(
+    element: ElementTree.Element,
+    xsd_element: XsdElement,
+    table: TypeTable,
+    selection: Selection | None = None,
+) -> Any:
+    """Decode the selected subtrees of `element`, validating each against its declaration.
+
+    The selected subtrees are decoded with `XsdElement.decode`, so they are validated and
+    converted exactly as `XMLSchema.to_dict` would. The attributes of their ancestors are
+    converted with `table`, without validation.
+    """
+    if selection is None:
+        return xsd_element.decode(element)
+
+    xsd_type: Any = xsd_element.type
+    if xsd_type.is_simple() or xsd_type.has_simple_content():
+        return xsd_element.decode(element)
+
+    xsd_children = {
+        child.local_name: child for child in xsd_type.content.iter_elements()
+    }
+    result = _decode_attributes(element, table)
+
+    for child in element:
+        tag = child.tag
+        if tag not in selection:
+            continue
+        if tag not in xsd_children:
+            raise ValueError(f"Element `{tag}` is not allowed by the XML schema.")
+        child_table, is_single = table.children[tag]
+        value = decode_validated(child, xsd_children[tag], child_table, selection[tag])
+        if is_single:
+            result[tag] = value
+        else:
+            result.setdefault(tag, []).append(value)
+
+    return result or None
+
+
+_UNKNOWN = TypeTable()
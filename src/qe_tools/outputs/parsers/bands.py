@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+import io
+import mmap
 import re
+import typing
 
 import numpy as np
 
-from dough.outputs import BaseOutputFileParser
+from qe_tools.outputs.parsers._compression import PrefixedStream
+from qe_tools.outputs.parsers._mapped import MappedFileParser, read_numbers
 
 
 _DAT_HEADER_RE = re.compile(
     r"&plot\s+nbnd\s*=\s*(?P<nbnd>\d+)\s*,\s*nks\s*=\s*(?P<nks>\d+)\s*/"
 )
+_DAT_HEADER_BYTES_RE = re.compile(_DAT_HEADER_RE.pattern.encode())
 _RAP_HEADER_RE = re.compile(
     r"&plot_rap\s+nbnd_rap\s*=\s*(?P<nbnd>\d+)\s*,\s*nks_rap\s*=\s*(?P<nks>\d+)\s*/"
 )
@@ -23,56 +28,78 @@ _HIGH_SYM_RE = re.compile(
 
 
 def _parse_plot_header(
-    content: str, header_re: re.Pattern, label: str
-) -> tuple[int, int, str]:
+    content: str | bytes | mmap.mmap, header_re: re.Pattern, label: str
+) -> tuple[int, int, int]:
     """Parse a `&plot[_rap] nbnd[_rap]=..., nks[_rap]=... /` header.
 
-    Returns `(nbnd, nks, body)` where `body` is the remaining content after the header.
+    Returns `(nbnd, nks, start)` where `start` is the position in `content` after the
+    header. `content` can also be a memory map, searched with a `bytes` `header_re`.
     """
     match = header_re.search(content)
     if match is None:
         raise ValueError(f"Could not parse `{label}` header from filband file.")
-    return int(match.group("nbnd")), int(match.group("nks")), content[match.end() :]
+    return int(match.group("nbnd")), int(match.group("nks")), match.end()
 
 
-class BandsDatParser(BaseOutputFileParser):
+class BandsDatParser(MappedFileParser):
     """Parse the ``filband`` (e.g. ``MgO-bands.dat``) output of bands.x."""
 
     @staticmethod
     def parse(content: str) -> dict:
-        nbnd, nks, body = _parse_plot_header(
+        nbnd, nks, start = _parse_plot_header(
             content, _DAT_HEADER_RE, "&plot nbnd=..., nks=... /"
         )
 
-        tokens = np.fromstring(body, sep=" ")
+        return _bands_dat_data(nbnd, nks, read_numbers(content[start:].encode()))
 
-        per_kpoint = 3 + nbnd
-        expected = nks * per_kpoint
-        if tokens.size != expected:
-            raise ValueError(
-                f"filband payload has {tokens.size} numbers; expected "
-                f"{expected} for nks={nks}, nbnd={nbnd}."
-            )
-        block = tokens.reshape(nks, per_kpoint)
+    @classmethod
+    def parse_buffer(cls, buffer: mmap.mmap) -> dict:
+        nbnd, nks, start = _parse_plot_header(
+            buffer, _DAT_HEADER_BYTES_RE, "&plot nbnd=..., nks=... /"
+        )
 
-        return {
-            "nbnd": nbnd,
-            "nks": nks,
-            "k_points": block[:, :3],
-            "eigenvalues": block[:, 3:],
-        }
+        return _bands_dat_data(nbnd, nks, read_numbers(buffer, start))
+
+    @classmethod
+    def parse_stream(cls, stream: typing.BinaryIO) -> dict:
+        head = stream.readline()
+        nbnd, nks, start = _parse_plot_header(
+            head, _DAT_HEADER_BYTES_RE, "&plot nbnd=..., nks=... /"
+        )
+        rest = io.BufferedReader(PrefixedStream(head[start:], stream))
+
+        return _bands_dat_data(nbnd, nks, read_numbers(rest))
+
+
+def _bands_dat_data(nbnd: int, nks: int, tokens: np.ndarray) -> dict:
+    """Split the numbers following the header of a ``filband`` file per k-point."""
+    per_kpoint = 3 + nbnd
+    expected = nks * per_kpoint
+    if tokens.size != expected:
+        raise ValueError(
+            f"filband payload has {tokens.size} numbers; expected "
+            f"{expected} for nks={nks}, nbnd={nbnd}."
+        )
+    block = tokens.reshape(nks, per_kpoint)
+
+    return {
+        "nbnd": nbnd,
+        "nks": nks,
+        "k_points": block[:, :3],
+        "eigenvalues": block[:, 3:],
+    }
 
 
-class BandsRapParser(BaseOutputFileParser):
+class BandsRapParser(MappedFileParser):
     """Parse the symmetry-representation ``filband.rap`` output of bands.x."""
 
     @staticmethod
     def parse(content: str) -> dict:
-        nbnd, nks, body = _parse_plot_header(
+        nbnd, nks, start = _parse_plot_header(
             content, _RAP_HEADER_RE, "&plot_rap nbnd_rap=..., nks_rap=... /"
         )
 
-        lines = body.strip().splitlines()
+        lines = content[start:].strip().splitlines()
         if len(lines) != 2 * nks:
             raise ValueError(
                 f"filband.rap has {len(lines)} body lines; expected {2 * nks} "
@@ -97,7 +124,7 @@ class BandsRapParser(BaseOutputFileParser):
         }
 
 
-class BandsStdoutParser(BaseOutputFileParser):
+class BandsStdoutParser(MappedFileParser):
     """Parse the stdout of bands.x for high-symmetry point markers."""
 
     @staticmethod
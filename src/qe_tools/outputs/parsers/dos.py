@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from dough.outputs import BaseOutputFileParser
+import mmap
 import numpy as np
 from io import StringIO
 import re
+import typing
 
+from qe_tools.outputs.parsers._mapped import MappedFileParser, read_table, split_header
 
-class DosParser(BaseOutputFileParser):
+
+class DosParser(MappedFileParser):
     """
     Class for parsing the XML output of pw.x.
     """
@@ -16,29 +19,48 @@ class DosParser(BaseOutputFileParser):
         """Parse an output `.dos` file of Quantum ESPRESSO dos.x."""
 
         header, _, body = content.partition("\n")
+        fermi_energy = _parse_fermi_energy(header)
+
+        return _dos_data(header, fermi_energy, np.loadtxt(StringIO(body)))
+
+    @classmethod
+    def parse_buffer(cls, buffer: mmap.mmap) -> dict:
+        """Parse an output `.dos` file of dos.x mapped into memory."""
+        header, start = split_header(buffer)
+        fermi_energy = _parse_fermi_energy(header)
+
+        return _dos_data(header, fermi_energy, read_table(buffer, start))
+
+    @classmethod
+    def parse_stream(cls, stream: typing.BinaryIO) -> dict:
+        """Parse an output `.dos` file of dos.x from a binary stream."""
+        header = stream.readline().decode().rstrip("\n")
+        fermi_energy = _parse_fermi_energy(header)
+
+        return _dos_data(header, fermi_energy, read_table(stream))
+
 
-        match = re.search(r"EFermi\s=\s+([\d\.]+)\seV", header)
+def _parse_fermi_energy(header: str) -> float:
+    match = re.search(r"EFermi\s=\s+([\d\.]+)\seV", header)
 
-        if match is None:
-            raise ValueError(
-                f"Could not parse Fermi energy from DOS header: {header!r}"
-            )
+    if match is None:
+        raise ValueError(f"Could not parse Fermi energy from DOS header: {header!r}")
 
-        fermi_energy = float(match.group(1))
+    return float(match.group(1))
 
-        body_array = np.loadtxt(StringIO(body))
 
-        parsed_data = {
-            "fermi_energy": fermi_energy,
-            "energy": body_array[:, 0],
-            "integrated_dos": body_array[:, -1],
-        }
-        # Spin-polarised case
-        if "dosup" in header:
-            parsed_data["dos_up"] = body_array[:, 1].tolist()
-            parsed_data["dos_down"] = body_array[:, 2].tolist()
-        # Non-spin-polarised/non-collinear case
-        else:
-            parsed_data["dos"] = body_array[:, 1].tolist()
+def _dos_data(header: str, fermi_energy: float, body_array: np.ndarray) -> dict:
+    parsed_data = {
+        "fermi_energy": fermi_energy,
+        "energy": body_array[:, 0],
+        "integrated_dos": body_array[:, -1],
+    }
+    # Spin-polarised case
+    if "dosup" in header:
+        parsed_data["dos_up"] = body_array[:, 1].tolist()
+        parsed_data["dos_down"] = body_array[:, 2].tolist()
+    # Non-spin-polarised/non-collinear case
+    else:
+        parsed_data["dos"] = body_array[:, 1].tolist()
 
-        return parsed_data
+    return parsed_data
@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import mmap
 import re
+import typing
 from io import StringIO
 from pathlib import Path
 
 import numpy as np
 
-from dough.outputs import BaseOutputFileParser
+from qe_tools.outputs.parsers._compression import strip_compressed_suffix
+from qe_tools.outputs.parsers._mapped import MappedFileParser, read_table, split_header
 
 
 _L_FROM_LETTER = {"s": 0, "p": 1, "d": 2, "f": 3, "g": 4}
@@ -20,16 +23,30 @@ _PDOS_ATM_RE = re.compile(
 )
 
 
-def _split_columns(content: str) -> tuple[list[str], np.ndarray]:
-    header, _, body = content.partition("\n")
+def _header_columns(header: str) -> list[str]:
     if not header.startswith("#"):
         raise ValueError(f"Unexpected PDOS file header: {header!r}")
-    columns = header.lstrip("#").split()
+    return header.lstrip("#").split()
+
+
+def _split_columns(content: str) -> tuple[list[str], np.ndarray]:
+    header, _, body = content.partition("\n")
+    columns = _header_columns(header)
     array = np.loadtxt(StringIO(body), ndmin=2)
     return columns, array
 
 
-class PdosAtmWfcParser(BaseOutputFileParser):
+def _split_columns_buffer(buffer: mmap.mmap) -> tuple[list[str], np.ndarray]:
+    header, start = split_header(buffer)
+    return _header_columns(header), read_table(buffer, start)
+
+
+def _split_columns_stream(stream: typing.BinaryIO) -> tuple[list[str], np.ndarray]:
+    header = stream.readline().decode().rstrip("\n")
+    return _header_columns(header), read_table(stream)
+
+
+class PdosAtmWfcParser(MappedFileParser):
     """Parse a single ``<filpdos>.pdos_atm#N(El)_wfc#M(L)[_j#J]`` file.
 
     Returned dict shape:
@@ -43,7 +60,18 @@ class PdosAtmWfcParser(BaseOutputFileParser):
 
     @staticmethod
     def parse(content: str) -> dict:
-        columns, data = _split_columns(content)
+        return PdosAtmWfcParser._parse_columns(*_split_columns(content))
+
+    @classmethod
+    def parse_buffer(cls, buffer: mmap.mmap) -> dict:
+        return cls._parse_columns(*_split_columns_buffer(buffer))
+
+    @classmethod
+    def parse_stream(cls, stream: typing.BinaryIO) -> dict:
+        return cls._parse_columns(*_split_columns_stream(stream))
+
+    @staticmethod
+    def _parse_columns(columns: list[str], data: np.ndarray) -> dict:
         energies = data[:, 0]
         # Number of `ldos` columns tells us spin / non-collinear shape: 1 -> nospin,
         # 2 -> collinear LSDA (ldos_up, ldos_dw).
@@ -69,7 +97,7 @@ class PdosAtmWfcParser(BaseOutputFileParser):
         }
 
 
-class PdosTotParser(BaseOutputFileParser):
+class PdosTotParser(MappedFileParser):
     """Parse a ``<filpdos>.pdos_tot`` file.
 
     Returned dict:
@@ -81,7 +109,18 @@ class PdosTotParser(BaseOutputFileParser):
 
     @staticmethod
     def parse(content: str) -> dict:
-        columns, data = _split_columns(content)
+        return PdosTotParser._parse_columns(*_split_columns(content))
+
+    @classmethod
+    def parse_buffer(cls, buffer: mmap.mmap) -> dict:
+        return cls._parse_columns(*_split_columns_buffer(buffer))
+
+    @classmethod
+    def parse_stream(cls, stream: typing.BinaryIO) -> dict:
+        return cls._parse_columns(*_split_columns_stream(stream))
+
+    @staticmethod
+    def _parse_columns(columns: list[str], data: np.ndarray) -> dict:
         energies = data[:, 0]
         rest = columns[1:]
         n_dos = sum(1 for col in rest if col.startswith("dos"))
@@ -119,10 +158,15 @@ def parse_pdos_filename(name: str) -> dict | None:
     return info
 
 
+def pdos_record_key(record: dict) -> tuple:
+    """Key sorting the PDOS records by `(atom, wfc, j)`."""
+    return record["atom"], record["wfc"], record.get("j", 0.0)
+
+
 def collect_pdos_files(
     directory: Path,
 ) -> tuple[list[dict], dict | None, set[Path]]:
-    """Discover and parse all PDOS files in `directory`.
+    """Discover and parse all PDOS files in `directory`, including compressed ones.
 
     Returns:
     - list of records, one per `pdos_atm#N(El)_wfc#M(L)[_j#J]` file. Each record carries
@@ -138,15 +182,16 @@ def collect_pdos_files(
     for path in directory.iterdir():
         if not path.is_file():
             continue
-        if path.name.endswith(".pdos_tot"):
+        name = strip_compressed_suffix(path.name)
+        if name.endswith(".pdos_tot"):
             total = PdosTotParser.parse_from_file(path)
             consumed.add(path)
             continue
-        info = parse_pdos_filename(path.name)
+        info = parse_pdos_filename(name)
         if info is None:
             continue
         info.update(PdosAtmWfcParser.parse_from_file(path))
         records.append(info)
         consumed.add(path)
-    records.sort(key=lambda r: (r["atom"], r["wfc"], r.get("j", 0.0)))
+    records.sort(key=pdos_record_key)
     return records, total, consumed
@@ -1,56 +1,356 @@
 from __future__ import annotations
 
 import re
-from importlib.resources import files
+from collections import deque
+from collections.abc import Iterable, Iterator
+from io import BytesIO, StringIO, TextIOBase
+from pathlib import Path
+from typing import IO, Any, Literal, TextIO
 from xml.etree import ElementTree
 
-from xmlschema import XMLSchema
-
+import numpy as np
 from dough.outputs import BaseOutputFileParser
 
-from qe_tools.outputs.parsers import schemas
+from qe_tools.outputs.parsers._compression import open_decompressed
+from qe_tools.outputs.parsers._scanner import CHUNK_SIZE, LineScanner
+from qe_tools.outputs.parsers._scf_history import ScfHistoryReader
+from qe_tools.outputs.parsers._trajectory import StepReader, TrajectoryBuilder
+from qe_tools.outputs.parsers._xml_decoder import (
+    Selection,
+    build_selection,
+    decode,
+    decode_validated,
+    exclude,
+    get_type_table,
+)
+from qe_tools.outputs.parsers.schemas import SCHEMA_REGISTRY
 from qe_tools.outputs.parsers.stdout import BaseStdoutParser
 
 
+def get_schema_filename(element_root: ElementTree.Element) -> str:
+    """Return the filename of the vendored schema that `element_root` should be decoded with."""
+    str_filename = element_root.get(
+        "{http://www.w3.org/2001/XMLSchema-instance}schemaLocation"
+    )
+    if str_filename is None:
+        raise ValueError(
+            "There was an error while reading the version of QE in the provided xml file."
+        )
+
+    schema_filename = str_filename.split()[1].split("/")[-1]
+
+    # Fix issue for QE v7.0: The scheme file name was not updated to `qes_211101.xsd` in the `xsi.schemaLocation`
+    # element, see https://github.com/aiidateam/aiida-quantumespresso/pull/774
+    creator = element_root.find("general_info/creator")
+    if creator is not None and creator.get("VERSION") == "7.0":
+        schema_filename = "qes_211101.xsd"
+
+    return schema_filename
+
+
+XMLMode = Literal["validate", "fast", "stream"]
+"""How `PwXMLParser` decodes the XML tree.
+
+- `"validate"`: decode with `XMLSchema.to_dict`, validating every element against the schema.
+- `"fast"`: skip validation and decode with a type table derived from the schema. Produces
+  the same dictionary for valid files, but does not detect invalid ones. Intended for
+  trusted files written by pw.x.
+- `"stream"`: like `"fast"`, but read the file incrementally and store the `ks_energies`
+  blocks in NumPy arrays as they are read, discarding their elements. The peak memory
+  then scales with the band-structure arrays instead of the full tree. See
+  `PwXMLParser.parse_from_file` for the layout of `ks_energies` in this mode.
+"""
+
+_KS_ENERGIES_PATH = ("output", "band_structure", "ks_energies")
+
+_PARSE_ERROR_MESSAGE = (
+    "Unable to parse the XML file!\n"
+    "Double-check that the file is the correct one, and is not incomplete/corrupted."
+)
+
+
 class PwXMLParser(BaseOutputFileParser):
     """
     Class for parsing the XML output of pw.x.
+
+    All parsing methods accept the decoding `mode` (see `XMLMode`) and an optional
+    `select`: an iterable of dot-separated element paths relative to the root (e.g.
+    `output.total_energy` or `output.atomic_structure.@alat`). When given, only the
+    selected subtrees are decoded; the rest of the tree is left out of the dictionary.
     """
 
     @staticmethod
-    def parse(content):
+    def parse(
+        content,
+        *,
+        mode: XMLMode = "validate",
+        select: Iterable[str] | None = None,
+        band_arrays: bool = False,
+    ):
         """Parse the XML output of Quantum ESPRESSO pw.x."""
+        if mode == "stream":
+            source = StringIO(content) if isinstance(content, str) else BytesIO(content)
+            return _stream_decode(source, select)
 
         try:
             element_root = ElementTree.fromstring(content)
         except ElementTree.ParseError:
-            raise ValueError(
-                "Unable to parse the XML file!\n"
-                "Double-check that the file is the correct one, and is not incomplete/corrupted."
-            ) from None
+            raise ValueError(_PARSE_ERROR_MESSAGE) from None
+
+        return PwXMLParser.decode(
+            element_root, mode=mode, select=select, band_arrays=band_arrays
+        )
+
+    @classmethod
+    def parse_from_file(
+        cls,
+        file: str | Path | TextIO,
+        *,
+        mode: XMLMode = "validate",
+        select: Iterable[str] | None = None,
+        band_arrays: bool = False,
+    ) -> dict[str, Any]:
+        """Parse the XML output of pw.x from a path or an open file handle.
+
+        With `band_arrays` (always the case in `"stream"` mode),
+        `output.band_structure.ks_energies` is a single dictionary of contiguous arrays
+        stacked over the k-points, instead of a list with one dictionary per k-point:
 
-        str_filename = element_root.get(
-            "{http://www.w3.org/2001/XMLSchema-instance}schemaLocation"
+        - `k_point`: `{"$": (nks, 3) array, "@weight": (nks,) array}`
+        - `npw`: `(nks,)` integer array
+        - `eigenvalues`, `occupations`: `{"$": (nks, size) array, "@size": size}`
+
+        Compressed files (see `open_decompressed`) are decompressed while they are read.
+        """
+        if not isinstance(file, (str, Path, TextIOBase)):
+            raise TypeError(f"Unsupported type: {type(file)}")
+
+        if isinstance(file, (str, Path)):
+            decompressed = open_decompressed(file)
+            if decompressed is not None:
+                with decompressed:
+                    return cls.parse_from_file(
+                        decompressed, mode=mode, select=select, band_arrays=band_arrays
+                    )
+
+        if mode == "stream":
+            return _stream_decode(file, select)
+
+        try:
+            element_root = ElementTree.parse(file).getroot()
+        except ElementTree.ParseError:
+            raise ValueError(_PARSE_ERROR_MESSAGE) from None
+
+        return cls.decode(
+            element_root, mode=mode, select=select, band_arrays=band_arrays
         )
-        if str_filename is None:
+
+    @staticmethod
+    def decode(
+        element_root: ElementTree.Element,
+        *,
+        mode: XMLMode = "validate",
+        select: Iterable[str] | None = None,
+        band_arrays: bool = False,
+    ) -> dict[str, Any]:
+        """Decode the root element of a pw.x XML file into a dictionary.
+
+        The `"stream"` mode decodes the file while reading it, so it is not supported here.
+        In `"fast"` mode, `band_arrays` reads the `ks_energies` text straight into the
+        arrays; in `"validate"` mode, the validated values are stacked afterwards.
+        """
+        if mode == "stream":
             raise ValueError(
-                "There was an error while reading the version of QE in the provided xml file."
+                "The `stream` mode decodes the file while reading it; "
+                "use `parse` or `parse_from_file` instead."
+            )
+        if mode not in ("validate", "fast"):
+            raise ValueError(
+                f"Unknown XML decoding mode `{mode}`; use `validate`, `fast` or `stream`."
             )
 
-        schema_filename = str_filename.split()[1].split("/")[-1]
+        schema_filename = get_schema_filename(element_root)
+        selection = None if select is None else build_selection(select)
+        band_arrays = band_arrays and _is_selected(selection, _KS_ENERGIES_PATH)
 
-        # Fix issue for QE v7.0: The scheme file name was not updated to `qes_211101.xsd` in the `xsi.schemaLocation`
-        # element, see https://github.com/aiidateam/aiida-quantumespresso/pull/774
-        try:
-            if (
-                element_root.find("general_info").find("creator").get("VERSION")
-                == "7.0"
-            ):
-                schema_filename = "qes_211101.xsd"
-        except AttributeError:
-            pass
+        if mode == "fast":
+            table = get_type_table(schema_filename)
+            if not band_arrays:
+                return decode(element_root, table, selection)
+
+            result = decode(
+                element_root, table, exclude(selection, table, _KS_ENERGIES_PATH)
+            )
+            elements = element_root.findall("/".join(_KS_ENERGIES_PATH))
+            if elements:
+                arrays = _KsEnergiesArrays.from_elements(elements)
+                result["output"]["band_structure"]["ks_energies"] = arrays.to_dict()
+            return result
+
+        schema = SCHEMA_REGISTRY.get(schema_filename)
+        if selection is None:
+            result = schema.to_dict(element_root)
+        else:
+            result = decode_validated(
+                element_root,
+                schema.elements["espresso"],
+                get_type_table(schema_filename),
+                selection,
+            )
+
+        band_structure = result.get("output", {}).get("band_structure", {})
+        if band_arrays and "ks_energies" in band_structure:
+            band_structure["ks_energies"] = _stack_ks_energies(
+                band_structure["ks_energies"]
+            )
 
-        return XMLSchema(str(files(schemas) / schema_filename)).to_dict(element_root)
+        return result
+
+
+def _is_selected(selection: Selection | None, path: Iterable[str]) -> bool:
+    """Whether the element at `path` (relative to the root) is fully decoded with `selection`."""
+    node = selection
+    for tag in path:
+        if node is None:
+            return True
+        if tag not in node:
+            return False
+        node = node[tag]
+    return node is None
+
+
+class _KsEnergiesArrays:
+    """Pre-sized arrays the `ks_energies` blocks are read into, one row per k-point."""
+
+    def __init__(self, nks: int, nbnd: int) -> None:
+        self.k_points = np.empty((nks, 3))
+        self.weights = np.full(nks, np.nan)
+        self.npw = np.zeros(nks, dtype=int)
+        self.eigenvalues = np.empty((nks, nbnd))
+        self.occupations = np.empty((nks, nbnd))
+        self.count = 0
+
+    @classmethod
+    def from_elements(cls, elements: list[ElementTree.Element]) -> _KsEnergiesArrays:
+        """Read all `elements` (the `ks_energies` of a parsed tree) into new arrays."""
+        arrays = cls(len(elements), _number_of_values(elements[0]))
+        for element in elements:
+            arrays.read(element)
+        return arrays
+
+    def read(self, element: ElementTree.Element) -> None:
+        """Fill the next row from a `ks_energies` element."""
+        index = self.count
+        if index == len(self.k_points):
+            raise ValueError("The XML file contains more `ks_energies` than `nks`.")
+
+        for child in element:
+            if child.tag == "k_point":
+                self.k_points[index] = np.fromstring(child.text or "", sep=" ")
+                weight = child.get("weight")
+                if weight is not None:
+                    self.weights[index] = float(weight)
+            elif child.tag == "npw":
+                self.npw[index] = int(child.text or 0)
+            elif child.tag == "eigenvalues":
+                self.eigenvalues[index] = np.fromstring(child.text or "", sep=" ")
+            elif child.tag == "occupations":
+                self.occupations[index] = np.fromstring(child.text or "", sep=" ")
+
+        self.count += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the arrays in the `band_arrays` layout of `PwXMLParser`."""
+        nks, nbnd = self.count, self.eigenvalues.shape[1]
+        return {
+            "k_point": {"$": self.k_points[:nks], "@weight": self.weights[:nks]},
+            "npw": self.npw[:nks],
+            "eigenvalues": {"$": self.eigenvalues[:nks], "@size": nbnd},
+            "occupations": {"$": self.occupations[:nks], "@size": nbnd},
+        }
+
+
+def _number_of_values(ks_energies: ElementTree.Element) -> int:
+    """Return the `size` of the `eigenvalues` of a `ks_energies` element."""
+    eigenvalues = ks_energies.find("eigenvalues")
+    return 0 if eigenvalues is None else int(eigenvalues.get("size", 0))
+
+
+def _stack_ks_energies(ks_energies: list[dict[str, Any]]) -> dict[str, Any]:
+    """Stack decoded `ks_energies` dictionaries into the layout of `_KsEnergiesArrays`."""
+    return {
+        "k_point": {
+            "$": np.array([ks["k_point"]["$"] for ks in ks_energies], dtype=float),
+            "@weight": np.array(
+                [ks["k_point"].get("@weight", np.nan) for ks in ks_energies],
+                dtype=float,
+            ),
+        },
+        "npw": np.array([ks["npw"] for ks in ks_energies], dtype=int),
+        **{
+            key: {
+                "$": np.array([ks[key]["$"] for ks in ks_energies], dtype=float),
+                "@size": ks_energies[0][key]["@size"],
+            }
+            for key in ("eigenvalues", "occupations")
+        },
+    }
+
+
+def _stream_decode(
+    source: str | Path | IO, select: Iterable[str] | None
+) -> dict[str, Any]:
+    """Decode a pw.x XML file while reading it, see the `stream` mode of `XMLMode`.
+
+    The `ks_energies` elements are read into `_KsEnergiesArrays` as soon as they are
+    complete and then removed from the tree, so the tree kept in memory is small. It is decoded with the
+    fast decoder once the whole file has been read.
+    """
+    selection = None if select is None else build_selection(select)
+    read_ks_energies = _is_selected(selection, _KS_ENERGIES_PATH)
+
+    root: ElementTree.Element | None = None
+    band_structure: ElementTree.Element | None = None
+    arrays: _KsEnergiesArrays | None = None
+    nks = 0
+    path: list[str] = []
+
+    try:
+        for event, element in ElementTree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                else:
+                    path.append(element.tag)
+                    if tuple(path) == _KS_ENERGIES_PATH[:2]:
+                        band_structure = element
+                continue
+
+            if tuple(path) == _KS_ENERGIES_PATH:
+                if read_ks_energies:
+                    if arrays is None:
+                        arrays = _KsEnergiesArrays(nks, _number_of_values(element))
+                    arrays.read(element)
+                element.clear()
+                if band_structure is not None:
+                    band_structure.remove(element)
+            elif tuple(path) == (*_KS_ENERGIES_PATH[:2], "nks"):
+                nks = int(element.text or 0)
+
+            if path:
+                path.pop()
+    except ElementTree.ParseError:
+        raise ValueError(_PARSE_ERROR_MESSAGE) from None
+
+    if root is None:
+        raise ValueError(_PARSE_ERROR_MESSAGE)
+
+    result = decode(root, get_type_table(get_schema_filename(root)), selection)
+
+    if arrays is not None and "band_structure" in result.get("output", {}):
+        result["output"]["band_structure"]["ks_energies"] = arrays.to_dict()
+
+    return result
 
 
 _HOMO_LUMO_RE = re.compile(
@@ -60,22 +360,73 @@ _HOMO_LUMO_RE = re.compile(
 _HOMO_RE = re.compile(r"highest occupied level\s*\(ev\):\s*([\-\d.E+]+)")
 
 
+def _parse_highest_occupied(line: str, scanner: LineScanner) -> None:
+    """Parse the HOMO (and LUMO) levels; the first line with both values takes precedence."""
+    data = scanner.data
+    if "lowest_unoccupied_level" in data:
+        return
+
+    match = _HOMO_LUMO_RE.search(line)
+    if match:
+        data["highest_occupied_level"] = float(match.group(1))
+        data["lowest_unoccupied_level"] = float(match.group(2))
+        return
+
+    match = _HOMO_RE.search(line)
+    if match and "highest_occupied_level" not in data:
+        data["highest_occupied_level"] = float(match.group(1))
+
+
 class PwStdoutParser(BaseStdoutParser):
     """
     Class for parsing the standard output of pw.x.
     """
 
-    @staticmethod
-    def parse(content: str) -> dict:
-        parsed_data = BaseStdoutParser.parse(content)
+    reads_body = True
 
-        match = _HOMO_LUMO_RE.search(content)
-        if match:
-            parsed_data["highest_occupied_level"] = float(match.group(1))
-            parsed_data["lowest_unoccupied_level"] = float(match.group(2))
-        else:
-            match = _HOMO_RE.search(content)
-            if match:
-                parsed_data["highest_occupied_level"] = float(match.group(1))
+    @classmethod
+    def register_handlers(cls, scanner: LineScanner) -> None:
+        super().register_handlers(scanner)
+        scanner.add_handler("highest", _parse_highest_occupied)
+        ScfHistoryReader().register(scanner)
+
+        trajectory = TrajectoryBuilder()
+        reader = StepReader(trajectory.append)
+        reader.register(scanner)
+
+        def store_trajectory(scanner: LineScanner) -> None:
+            if trajectory.number_of_steps:
+                scanner.data["trajectory"] = trajectory.to_dict()
+                if reader.symbols is not None:
+                    scanner.data["trajectory"]["symbols"] = reader.symbols
+
+        scanner.add_finalizer(store_trajectory)
+
+    @classmethod
+    def iter_steps(
+        cls, file: str | Path | TextIO, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the ionic steps of a `relax`, `vc-relax` or `md` run one at a time.
+
+        Each step is a dictionary of NumPy arrays, see `StepReader`. The stdout is read in
+        chunks of `chunk_size` characters and the steps are yielded as soon as they are
+        complete, so that only a few of them are in memory at once, however long the run.
+
+        :param file: path of the stdout file, or a file handle opened in text mode.
+        """
+        if isinstance(file, (str, Path)):
+            with Path(file).open() as handle:
+                yield from cls.iter_steps(handle, chunk_size)
+            return
+
+        steps: deque[dict[str, Any]] = deque()
+        scanner = LineScanner()
+        StepReader(steps.append).register(scanner)
+
+        while chunk := file.read(chunk_size):
+            scanner.feed_text(chunk)
+            while steps:
+                yield steps.popleft()
 
-        return parsed_data
+        scanner.finish()
+        yield from steps
@@ -0,0 +1,196 @@
+"""Vendored Quantum ESPRESSO XML schemas and a process-wide registry of their compiled form.
+
+Compiling one of the `qes_*.xsd` schemas with `xmlschema` is much more expensive than
+decoding a typical `data-file-schema.xml` against it, so every XML-consuming parser
+should obtain its schema through `SCHEMA_REGISTRY` instead of building a new
+`XMLSchema` itself.
+
+With the `QE_TOOLS_SCHEMA_CACHE` environment variable set, compiled schemas are also
+pickled to an on-disk cache (see `qe_tools.utils.get_cache_dir`), so that short-lived
+processes can load them instead of compiling them again. Run
+`python -m qe_tools.outputs.parsers.schemas` to populate that cache ahead of time.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections.abc import Iterable
+from importlib.resources import files
+from pathlib import Path
+
+import xmlschema
+from xmlschema import XMLSchema
+
+from qe_tools.__about__ import __version__
+from qe_tools.utils import get_cache_dir
+
+__all__ = ("SCHEMA_REGISTRY", "SchemaRegistry")
+
+
+class SchemaRegistry:
+    """Thread-safe cache of compiled `XMLSchema` objects, keyed by `.xsd` filename.
+
+    Schemas are compiled lazily on first request and shared by all callers afterwards.
+    Each filename is compiled at most once, even when several threads request it at the
+    same time; requests for different filenames do not block each other.
+
+    :param cache_dir: directory in which compiled schemas are pickled for reuse by other
+        processes, or `None` to keep them in memory only. Artifacts are keyed by a hash of
+        the `.xsd` content and of the `xmlschema`, `qe_tools` and Python versions, so stale
+        ones are never loaded; they are replaced the next time the schema is compiled.
+        Artifacts that are not owned by the current user, or that other users can write
+        to, are not loaded either.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None) -> None:
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self._schemas: dict[str, XMLSchema] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> list[str]:
+        """Return the filenames of all vendored schemas, sorted."""
+        return sorted(
+            resource.name
+            for resource in files(__name__).iterdir()
+            if resource.name.endswith(".xsd")
+        )
+
+    def get(self, filename: str) -> XMLSchema:
+        """Return the compiled schema for `filename`, compiling it on first use.
+
+        :raises ValueError: if `filename` is not one of the vendored schemas.
+        """
+        schema = self._schemas.get(filename)
+        if schema is not None:
+            return schema
+
+        with self._lock:
+            lock = self._locks.setdefault(filename, threading.Lock())
+
+        with lock:
+            schema = self._schemas.get(filename)
+            if schema is None:
+                schema = self._load(filename)
+                self._schemas[filename] = schema
+
+        return schema
+
+    def preload(self, filenames: Iterable[str] | None = None) -> None:
+        """Compile `filenames` (all vendored schemas by default) ahead of time.
+
+        With a `cache_dir`, this also writes the on-disk artifacts of the schemas.
+        """
+        for filename in self.available() if filenames is None else filenames:
+            self.get(filename)
+
+    def clear(self) -> None:
+        """Drop all compiled schemas from memory; they are reloaded on next use.
+
+        The on-disk artifacts are kept.
+        """
+        with self._lock:
+            self._schemas.clear()
+            self._locks.clear()
+
+    def __contains__(self, filename: object) -> bool:
+        """Whether `filename` has already been loaded in memory."""
+        return filename in self._schemas
+
+    def artifact_path(self, filename: str) -> Path | None:
+        """Return the path of the on-disk artifact for `filename`, or `None` without a `cache_dir`."""
+        if self.cache_dir is None:
+            return None
+
+        digest = hashlib.sha256(self._resource(filename).read_bytes())
+        for version in (xmlschema.__version__, __version__, sys.version):
+            digest.update(version.encode())
+
+        return self.cache_dir / f"{filename[:-4]}-{digest.hexdigest()[:16]}.pickle"
+
+    def _resource(self, filename: str):
+        resource = files(__name__) / filename
+        if not filename.endswith(".xsd") or not resource.is_file():
+            raise ValueError(
+                f"XML schema `{filename}` is not available. "
+                f"Vendored schemas: {self.available()}"
+            )
+        return resource
+
+    def _load(self, filename: str) -> XMLSchema:
+        """Load the schema from its on-disk artifact, or compile (and store) it."""
+        artifact = self.artifact_path(filename)
+
+        if artifact is not None and artifact.is_file():
+            try:
+                with artifact.open("rb") as handle:
+                    if _is_trusted(os.fstat(handle.fileno())):
+                        schema = pickle.load(handle)  # noqa: S301
+                    else:
+                        schema = None
+            except Exception:  # noqa: BLE001 - a corrupt artifact is simply rebuilt
+                pass
+            else:
+                if isinstance(schema, XMLSchema):
+                    return schema
+
+        schema = XMLSchema(str(self._resource(filename)))
+
+        if artifact is not None:
+            self._store(schema, artifact)
+
+        return schema
+
+    @staticmethod
+    def _store(schema: XMLSchema, artifact: Path) -> None:
+        """Atomically write `artifact`, removing stale artifacts of the same schema.
+
+        Failures (e.g. a read-only cache directory) are ignored: the cache is an optimisation.
+        """
+        stem = artifact.name.rsplit("-", 1)[0]
+        try:
+            artifact.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=artifact.parent, suffix=".tmp")
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(schema, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, artifact)
+        except (OSError, pickle.PicklingError):
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            return
+
+        for stale in artifact.parent.glob(f"{stem}-*.pickle"):
+            if stale != artifact:
+                with contextlib.suppress(OSError):
+                    stale.unlink()
+
+
+def _is_trusted(stat: os.stat_result) -> bool:
+    """Whether an artifact with `stat` can be unpickled: it is owned by the current user,
+    and other users cannot write to it."""
+    if not hasattr(os, "getuid"):  # e.g. on Windows, where the modes are not meaningful
+        return True
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+SCHEMA_REGISTRY = SchemaRegistry(
+    cache_dir=get_cache_dir() / "schemas"
+    if os.environ.get("QE_TOOLS_SCHEMA_CACHE")
+    else None
+)
+"""Process-wide registry shared by all XML parsers in `qe_tools`.
+
+Compiled schemas are kept in memory only, unless the `QE_TOOLS_SCHEMA_CACHE` environment
+variable is set: they are then also pickled under `get_cache_dir() / "schemas"`.
+"""
@@ -0,0 +1,18 @@
+"""Compile all vendored XML schemas and store them in the on-disk schema cache.
+
+Usage:
+
+    python -m qe_tools.outputs.parsers.schemas
+"""
+
+from qe_tools.outputs.parsers.schemas import SCHEMA_REGISTRY
+
+if SCHEMA_REGISTRY.cache_dir is None:
+    raise SystemExit(
+        "The on-disk schema cache is disabled: set `QE_TOOLS_SCHEMA_CACHE=1` to enable it."
+    )
+
+SCHEMA_REGISTRY.preload()
+
+for filename in SCHEMA_REGISTRY.available():
+    print(SCHEMA_REGISTRY.artifact_path(filename))  # noqa: T201
@@ -2,42 +2,219 @@
 
 from __future__ import annotations
 
+import codecs
+import io
+import os
 import re
+import typing
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TextIO
 
 from dough.outputs import BaseOutputFileParser
 
+from qe_tools.outputs.parsers._compression import open_decompressed
+from qe_tools.outputs.parsers._scanner import CHUNK_SIZE, Event, LineScanner
 from qe_tools.utils import convert_qe_time_to_sec
 
+HEAD_SIZE = 8 * 1024
+"""Number of bytes read from the start of a stdout file to find the program header."""
+
+TAIL_SIZE = 16 * 1024
+"""Number of bytes read from the end of a stdout file to find the final timing summary."""
+
+_CODE_RE = re.compile(
+    r"Program\s(?P<code_name>[A-Za-z\_\d]+)\sv\.(?P<code_version>[\d\.a-zA-Z]+)\s"
+)
+_WALL_TIME_RE = re.compile(r"CPU\s+(?P<wall_time>[\s.\dsmdh]+)\sWALL")
+
+
+def _parse_program(line: str, scanner: LineScanner) -> None:
+    """Parse the version from the `Program <CODE> v.<version>` header (first one only)."""
+    if "code_version" in scanner.data:
+        return
+
+    match = _CODE_RE.search(line)
+    if match:
+        scanner.data["code_version"] = match["code_version"]
+        scanner.add_handler(match["code_name"], _parse_wall_time)
+
+
+def _parse_wall_time(line: str, scanner: LineScanner) -> None:
+    """Parse the `<CODE> : ... CPU ... WALL` timing line; the last one is the total."""
+    match = _WALL_TIME_RE.search(line)
+    if match and ":" in line.split("CPU", 1)[0]:
+        scanner.data["wall_time_seconds"] = convert_qe_time_to_sec(match["wall_time"])
+        scanner.emit("wall_time_seconds", scanner.data["wall_time_seconds"])
+
 
 class BaseStdoutParser(BaseOutputFileParser):
-    """Abstract class for the parsing of stdout files of Quantum ESPRESSO."""
+    """Abstract class for the parsing of stdout files of Quantum ESPRESSO.
+
+    The stdout is read line by line with a `LineScanner`, in a single pass. Subclasses
+    parse more quantities by extending `register_handlers`.
+    """
 
-    @staticmethod
-    def parse(content):
-        """Parse the basic ``stdout`` content of a Quantum ESPRESSO calculation.
+    reads_body: typing.ClassVar[bool] = False
+    """Whether the handlers need the full content. If not, `parse_from_file` only reads the
+    start and the end of large files; subclasses that parse the body must set this, and
+    can still be restricted to the start and the end with `body=False`."""
 
-        This function only checks for basic content like the code name and version,
-        as well as the wall time of the calculation.
+    @classmethod
+    def register_handlers(cls, scanner: LineScanner) -> None:
+        """Register the line handlers of this parser on `scanner`.
+
+        The base parser only parses the code version and the wall time of the calculation.
+        """
+        scanner.add_handler("Program", _parse_program)
+
+    @classmethod
+    def scanner(cls) -> LineScanner:
+        """Return a new `LineScanner` with the handlers of this parser registered."""
+        scanner = LineScanner()
+        cls.register_handlers(scanner)
+        return scanner
+
+    @classmethod
+    def follow(cls, path: str | Path) -> StdoutFollower:
+        """Return a `StdoutFollower` parsing the stdout at `path` while it is written."""
+        return StdoutFollower(path, cls)
+
+    @classmethod
+    def parse_lines(cls, lines: Iterable[str]) -> dict[str, typing.Any]:
+        """Parse the stdout from an iterable of lines."""
+        return cls.scanner().scan(lines)
+
+    @classmethod
+    def parse(cls, content):
+        """Parse the ``stdout`` content of a Quantum ESPRESSO calculation.
 
         :returns: dictionary of the parsed data.
         """
-        parsed_data = {}
-
-        code_match = re.search(
-            r"Program\s(?P<code_name>[A-Za-z\_\d]+)\sv\.(?P<code_version>[\d\.a-zA-Z]+)\s",
-            content,
-        )
-        if code_match:
-            code_name = code_match.groupdict()["code_name"]
-            parsed_data["code_version"] = code_match.groupdict()["code_version"]
-
-            wall_match = re.search(
-                rf"{code_name}\s+:[\s\S]+CPU\s+(?P<wall_time>[\s.\dsmdh]+)\sWALL",
-                content,
-            )
-            if wall_match:
-                parsed_data["wall_time_seconds"] = convert_qe_time_to_sec(
-                    wall_match.groupdict()["wall_time"]
-                )
-
-        return parsed_data
+        return cls.scanner().scan_text(content)
+
+    @classmethod
+    def parse_from_file(
+        cls, file: str | Path | TextIO, *, body: bool | None = None
+    ) -> dict[str, typing.Any]:
+        """Parse a stdout file from a path or an open file handle, streaming its lines.
+
+        Unless the body is parsed, only the first `HEAD_SIZE` and the last `TAIL_SIZE`
+        bytes of a large file given by path are read, seeking to the end of the file. The
+        rest is only read if the program header or the timing summary are not found there.
+        Compressed files (see `open_decompressed`) are decompressed while they are read.
+
+        :param body: whether to parse the body of the file, `reads_body` by default. With
+            `body=False`, a parser that `reads_body` only parses the quantities of
+            `BaseStdoutParser` (the code version and the wall time).
+        """
+        if body is None:
+            body = cls.reads_body
+        parser = cls if body or not cls.reads_body else BaseStdoutParser
+
+        if isinstance(file, io.TextIOBase):
+            return parser.scanner().scan_file(file)
+        if not isinstance(file, (str, Path)):
+            raise TypeError(f"Unsupported type: {type(file)}")
+
+        decompressed = open_decompressed(file)
+        if decompressed is not None:
+            with decompressed:
+                return parser.scanner().scan_file(decompressed)
+
+        if not body:
+            with Path(file).open("rb") as handle:
+                head = handle.read(HEAD_SIZE)
+                size = handle.seek(0, os.SEEK_END)
+                if size > HEAD_SIZE + TAIL_SIZE:
+                    handle.seek(size - TAIL_SIZE)
+                    tail = handle.read()
+
+                    # Drop the lines cut by the head and tail windows
+                    head_text = head.decode(errors="replace").rpartition("\n")[0]
+                    tail_text = tail.decode(errors="replace").partition("\n")[2]
+                    parsed_data = parser.parse(f"{head_text}\n{tail_text}")
+                    if "wall_time_seconds" in parsed_data:
+                        return parsed_data
+
+        with Path(file).open("r") as handle:
+            return parser.scanner().scan_file(handle)
+
+
+class StdoutFollower:
+    """Incrementally parses a stdout file that is still being written.
+
+    Each `poll` only reads the bytes appended since the previous one, so that monitoring a
+    running calculation costs time proportional to its new output rather than to the size
+    of the file. The follower keeps the byte offset reached in the file, and the scanner
+    of the parser keeps the incomplete last line until the rest of it is written.
+
+    If the file is truncated or replaced (e.g. the calculation is restarted), it is
+    parsed again from the start.
+
+    `poll` returns the `Event`s emitted by the handlers of the parser. With
+    `PwStdoutParser`, these are the `scf_iteration` number, the `scf_energy` estimate and
+    the `scf_accuracy` (Ry) of every SCF iteration, the `cpu_time` (s) so far, the
+    `total_energy` (Ry) of converged SCF cycles, each completed ionic `step` and the
+    final `wall_time_seconds`. Like the parsed data, the values are those printed by QE,
+    without unit conversion.
+    """
+
+    def __init__(
+        self, path: str | Path, parser: type[BaseStdoutParser] = BaseStdoutParser
+    ) -> None:
+        self.path = Path(path)
+        self.parser = parser
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0  # number of bytes of the file read so far
+        self._inode: int | None = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._events: list[Event] = []
+        self._scanner = self.parser.scanner()
+        self._scanner.on_event = self._events.append
+
+    @property
+    def data(self) -> dict[str, typing.Any]:
+        """Data parsed from the lines read so far."""
+        return self._scanner.data
+
+    def poll(self) -> list[Event]:
+        """Read what was appended to the file and return the events of its new lines.
+
+        Returns an empty list if the file does not exist (yet).
+        """
+        try:
+            handle = self.path.open("rb")
+        except FileNotFoundError:
+            return []
+
+        with handle:
+            stat = os.fstat(handle.fileno())
+            if stat.st_size < self.offset or self._inode not in (None, stat.st_ino):
+                self._reset()
+            self._inode = stat.st_ino
+
+            handle.seek(self.offset)
+            while chunk := handle.read(CHUNK_SIZE):
+                self.offset += len(chunk)
+                self._scanner.feed_text(self._decoder.decode(chunk))
+
+        events = self._events.copy()
+        self._events.clear()
+        return events
+
+    def finish(self) -> list[Event]:
+        """Read the end of the file of a calculation that has ended, and return its events.
+
+        Unlike `poll`, this also parses the last line if it is incomplete and completes the
+        `data`, e.g. with the last ionic step. The follower should not be polled afterwards.
+        """
+        events = self.poll()
+        self._scanner.feed_text(self._decoder.decode(b"", final=True))
+        self._scanner.finish()
+
+        events.extend(self._events)
+        self._events.clear()
+        return events
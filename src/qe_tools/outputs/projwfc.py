@@ -8,11 +8,17 @@ from glom import Spec
 
 from dough.outputs import BaseOutput, output_mapping
 
+from ._archive import ArchiveMixin
+from ._batch import BatchOutputMixin
+from ._cache import CacheConfig, CacheMixin
+from ._discovery import DEFAULT_MAX_DEPTH, DiscoveryMixin, FilePattern, stdout_pattern
+from ._index import FingerprintIndex
+from .parsers._compression import strip_compressed_suffix
 from .parsers.projwfc import (
     PdosAtmWfcParser,
     PdosTotParser,
-    collect_pdos_files,
     parse_pdos_filename,
+    pdos_record_key,
 )
 from .parsers.stdout import BaseStdoutParser
 
@@ -58,36 +64,42 @@ class _ProjwfcMapping:
     """
 
 
-class ProjwfcOutput(BaseOutput[_ProjwfcMapping]):
+class ProjwfcOutput(
+    ArchiveMixin,
+    BatchOutputMixin,
+    CacheMixin,
+    DiscoveryMixin,
+    BaseOutput[_ProjwfcMapping],
+):
     """Output of the Quantum ESPRESSO projwfc.x code."""
 
     converters: typing.ClassVar[dict] = {}
 
-    @classmethod
-    def from_dir(cls, directory: str | Path):
-        """Locate and parse all `<filpdos>.pdos_*` files plus `projwfc.x` stdout in `directory`."""
-        directory = Path(directory)
-
-        if not directory.is_dir():
-            raise ValueError(f"Path `{directory}` is not a valid directory.")
-
-        records, total, consumed = collect_pdos_files(directory)
-
-        stdout_file = None
-        for file in directory.iterdir():
-            if not file.is_file() or file in consumed:
-                continue
-            with file.open("r") as handle:
-                header = "".join(handle.readlines(5))
-            if "Program PROJWFC" in header:
-                stdout_file = file
-                break
+    file_patterns: typing.ClassVar[dict[str, FilePattern]] = {
+        "pdos_files": FilePattern(names=("*.pdos_atm#*",), multiple=True),
+        "pdos_tot": FilePattern(names=("*.pdos_tot",)),
+        "stdout": stdout_pattern("PROJWFC"),
+    }
 
-        raw_outputs: dict = {"pdos_records": records, "pdos_total": total}
-        if stdout_file is not None:
-            raw_outputs["stdout"] = BaseStdoutParser.parse_from_file(stdout_file)
+    @classmethod
+    def from_dir(
+        cls,
+        directory: str | Path,
+        *,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        cache: CacheConfig | None = None,
+        index: FingerprintIndex | None = None,
+    ):
+        """Locate and parse all `<filpdos>.pdos_*` files plus `projwfc.x` stdout in `directory`.
 
-        return cls(raw_outputs=raw_outputs)
+        The files are located with `discover`, searching `max_depth` levels of
+        subdirectories. With a `cache`, the outputs are loaded from the cache if the same
+        files were already parsed (see `CacheConfig`). With an `index`, the parsed files
+        are recorded in it (see `changed_since`).
+        """
+        return cls._from_discovered_files(
+            cls.discover(directory, max_depth=max_depth), cache, index
+        )
 
     @classmethod
     def from_files(
@@ -106,7 +118,7 @@ class ProjwfcOutput(BaseOutput[_ProjwfcMapping]):
         records: list[dict] = []
         for path in pdos_files:
             path = Path(path)
-            info = parse_pdos_filename(path.name)
+            info = parse_pdos_filename(strip_compressed_suffix(path.name))
             if info is None:
                 raise ValueError(
                     f"`{path.name}` does not match the projwfc PDOS naming scheme."
@@ -115,7 +127,7 @@ class ProjwfcOutput(BaseOutput[_ProjwfcMapping]):
             records.append(info)
 
         raw_outputs: dict = {
-            "pdos_records": records,
+            "pdos_records": sorted(records, key=pdos_record_key),
             "pdos_total": PdosTotParser.parse_from_file(pdos_tot)
             if pdos_tot is not None
             else None,
@@ -123,3 +135,26 @@ class ProjwfcOutput(BaseOutput[_ProjwfcMapping]):
         if stdout is not None:
             raw_outputs["stdout"] = BaseStdoutParser.parse_from_file(stdout)
         return cls(raw_outputs=raw_outputs)
+
+    @classmethod
+    def _parse_archive_member(
+        cls, role: str, name: str, handle: TextIO, kwargs: dict[str, typing.Any]
+    ) -> dict[str, typing.Any]:
+        if role != "pdos_files":
+            raw_outputs = cls.from_files(**{role: handle}).raw_outputs
+            return {key: value for key, value in raw_outputs.items() if value}
+
+        info = parse_pdos_filename(strip_compressed_suffix(Path(name).name))
+        if info is None:
+            return {}
+        info.update(PdosAtmWfcParser.parse_from_file(handle))
+        return {"pdos_records": [info]}
+
+    @classmethod
+    def _merge_raw_outputs(
+        cls, parts: list[dict[str, typing.Any]]
+    ) -> dict[str, typing.Any]:
+        records = [record for part in parts for record in part.pop("pdos_records", [])]
+        raw_outputs = super()._merge_raw_outputs(parts)
+        raw_outputs.setdefault("pdos_total", None)
+        return {"pdos_records": sorted(records, key=pdos_record_key), **raw_outputs}
@@ -2,6 +2,7 @@
 
 import math
 import typing
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Annotated, TextIO
 
@@ -15,7 +16,19 @@ from dough.outputs import BaseOutput, output_mapping
 from qe_tools.converters.aiida import AiiDAConverter
 from qe_tools.converters.ase import ASEConverter
 from qe_tools.converters.pymatgen import PymatgenConverter
-from qe_tools.outputs.parsers.pw import PwStdoutParser, PwXMLParser
+from qe_tools.outputs._archive import ArchiveMixin
+from qe_tools.outputs._batch import BatchOutputMixin
+from qe_tools.outputs._cache import CacheConfig, CacheMixin
+from qe_tools.outputs._discovery import (
+    DEFAULT_MAX_DEPTH,
+    XML_PATTERN,
+    DiscoveryMixin,
+    FilePattern,
+    stdout_pattern,
+)
+from qe_tools.outputs._index import FingerprintIndex
+from qe_tools.outputs._memo import MemoizedOutputMixin
+from qe_tools.outputs.parsers.pw import PwStdoutParser, PwXMLParser, XMLMode
 
 from qe_tools import CONSTANTS
 
@@ -29,15 +42,40 @@ def _stack_per_kpoint(band_structure: dict, key: str) -> np.ndarray:
     """
     lsda = band_structure["lsda"]
     nspin = 2 if lsda else 1
-    arr = np.array(
-        [ks[key]["$"] for ks in band_structure["ks_energies"]],
-        dtype=float,
-    )
+    ks_energies = band_structure["ks_energies"]
+    if isinstance(ks_energies, dict):  # `band_arrays` layout, see `PwXMLParser`
+        arr = np.asarray(ks_energies[key]["$"], dtype=float)
+    else:
+        arr = np.array([ks[key]["$"] for ks in ks_energies], dtype=float)
     nks, total = arr.shape
     nbnd = total // nspin
     return arr.reshape(nks, nspin, nbnd)
 
 
+def _k_point_values(ks_energies: list | dict, key: str) -> np.ndarray:
+    """Return the `key` (`$` or `@weight`) of every `k_point` in `ks_energies` as an array."""
+    if isinstance(ks_energies, dict):  # `band_arrays` layout, see `PwXMLParser`
+        return np.asarray(ks_energies["k_point"][key], dtype=float)
+    return np.array([ks["k_point"][key] for ks in ks_energies], dtype=float)
+
+
+_TRAJECTORY_UNITS = {
+    "energy": CONSTANTS.ry_to_ev,
+    "cell": CONSTANTS.bohr_to_ang,
+    "positions": CONSTANTS.bohr_to_ang,
+    "forces": CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang,
+    "stress": CONSTANTS.au_gpa / 2,  # Ry/bohr^3 -> GPa
+}
+
+
+def _convert_trajectory(trajectory: dict) -> dict:
+    """Convert the arrays of the stdout `trajectory` from Rydberg atomic units."""
+    return {
+        key: value * _TRAJECTORY_UNITS[key] if key in _TRAJECTORY_UNITS else value
+        for key, value in trajectory.items()
+    }
+
+
 @output_mapping
 class _PwParametersMapping:
     """Parameters the pw.x calculation ran with.
@@ -171,11 +209,10 @@ class _PwMapping:
                 ),
                 "cell": (
                     "xml.output.atomic_structure.cell",
-                    lambda cell: [
-                        [coord * CONSTANTS.bohr_to_ang for coord in cell["a1"]],
-                        [coord * CONSTANTS.bohr_to_ang for coord in cell["a2"]],
-                        [coord * CONSTANTS.bohr_to_ang for coord in cell["a3"]],
-                    ],
+                    lambda cell: (
+                        np.array([cell["a1"], cell["a2"], cell["a3"]], dtype=float)
+                        * CONSTANTS.bohr_to_ang
+                    ),
                 ),
                 "symbols": (
                     "xml.output.atomic_structure.atomic_positions.atom",
@@ -183,52 +220,46 @@ class _PwMapping:
                 ),
                 "positions": (
                     "xml.output.atomic_structure.atomic_positions.atom",
-                    [
-                        lambda atom: [
-                            CONSTANTS.bohr_to_ang * position for position in atom["$"]
-                        ]
-                    ],
+                    lambda atoms: (
+                        CONSTANTS.bohr_to_ang
+                        * np.array([atom["$"] for atom in atoms], dtype=float)
+                    ),
                 ),
             }
         ),
     ]
-    """Crystal structure: cell vectors (Å), element symbols, and Cartesian positions (Å)."""
+    """Crystal structure: cell vectors (Å, shape `(3, 3)`), element symbols, and Cartesian positions (Å, shape `(n_atoms, 3)`)."""
 
     forces: Annotated[
-        list,
+        np.ndarray,
         Spec(
             (
                 "xml.output.forces",
-                lambda forces: [
-                    [
-                        value * CONSTANTS.hartree_to_ev / CONSTANTS.bohr_to_ang
-                        for value in forces["$"][atom_index * 3 : (atom_index + 1) * 3]
-                    ]
-                    for atom_index in range(forces["@dims"][1])
-                ],
+                lambda forces: (
+                    np.asarray(forces["$"], dtype=float).reshape(forces["@dims"][1], 3)
+                    * CONSTANTS.hartree_to_ev
+                    / CONSTANTS.bohr_to_ang
+                ),
             )
         ),
         Unit("eV/angstrom"),
     ]
-    """Forces on atoms in eV/Å, shape [n_atoms][3]."""
+    """Forces on atoms in eV/Å, shape `(n_atoms, 3)`."""
 
     stress: Annotated[
-        list,
+        np.ndarray,
         Spec(
             (
                 "xml.output.stress",
-                lambda stress: [
-                    [
-                        value * CONSTANTS.au_gpa
-                        for value in stress["$"][row_number * 3 : (row_number + 1) * 3]
-                    ]
-                    for row_number in range(3)
-                ],
+                lambda stress: (
+                    np.asarray(stress["$"], dtype=float).reshape(3, 3)
+                    * CONSTANTS.au_gpa
+                ),
             )
         ),
         Unit("GPa"),
     ]
-    """Stress tensor in GPa, shape [3][3]."""
+    """Stress tensor in GPa, shape `(3, 3)`."""
 
     fermi_energy: Annotated[
         float,
@@ -280,7 +311,7 @@ class _PwMapping:
         Spec(
             (
                 "xml.output.band_structure.ks_energies",
-                [lambda ks: ks["k_point"]["@weight"]],
+                lambda ks_energies: _k_point_values(ks_energies, "@weight").tolist(),
             )
         ),
     ]
@@ -293,17 +324,16 @@ class _PwMapping:
         list,
         Spec(
             (
-                "xml.output",
-                lambda output: [
-                    [
-                        kp
-                        * 2
-                        * math.pi
-                        / (output["atomic_structure"]["@alat"] * CONSTANTS.bohr_to_ang)
-                        for kp in ks["k_point"]["$"]
-                    ]
-                    for ks in output["band_structure"]["ks_energies"]
-                ],
+                {
+                    "alat": "xml.output.atomic_structure.@alat",
+                    "ks_energies": "xml.output.band_structure.ks_energies",
+                },
+                lambda data: (
+                    _k_point_values(data["ks_energies"], "$")
+                    * 2
+                    * math.pi
+                    / (data["alat"] * CONSTANTS.bohr_to_ang)
+                ).tolist(),
             )
         ),
         Unit("1/angstrom"),
@@ -445,9 +475,175 @@ class _PwMapping:
     number of occupied bands).
     """
 
+    trajectory: Annotated[dict, Spec(("stdout.trajectory", _convert_trajectory))]
+    """Ionic steps of the run, parsed from the stdout: one step per SCF cycle.
+
+    Dictionary of NumPy arrays with the steps along axis 0:
+
+    - `energy`: total energy in eV, shape `(n_steps,)`
+    - `cell`: cell vectors in Å, shape `(n_steps, 3, 3)`
+    - `positions`: Cartesian positions in Å, shape `(n_steps, n_atoms, 3)`
+    - `forces`: forces on atoms in eV/Å, shape `(n_steps, n_atoms, 3)`
+    - `stress`: stress tensor in GPa, shape `(n_steps, 3, 3)`
+
+    and the element `symbols`. Quantities that are not printed (e.g. `stress` without
+    `tstress`) are left out, or `NaN` for the steps they are missing from. Use
+    `PwStdoutParser.iter_steps` to go through the steps of very long runs one at a time.
+    """
+
+    scf_accuracies: Annotated[
+        np.ndarray,
+        Spec(
+            (
+                "stdout.scf_history.scf_accuracy",
+                lambda accuracy: accuracy * CONSTANTS.ry_to_ev,
+            )
+        ),
+        Unit("eV"),
+    ]
+    """Estimated SCF accuracy of every SCF iteration in eV, shape `(n_iterations,)`.
 
-class PwOutput(BaseOutput[_PwMapping]):
-    """Output of the Quantum ESPRESSO pw.x code."""
+    The iterations of all the SCF cycles of the run are concatenated, see
+    `scf_cycle_offsets`.
+    """
+
+    scf_total_energies: Annotated[
+        np.ndarray,
+        Spec(
+            (
+                "stdout.scf_history.total_energy",
+                lambda energy: energy * CONSTANTS.ry_to_ev,
+            )
+        ),
+        Unit("eV"),
+    ]
+    """Total energy estimate of every SCF iteration in eV, shape `(n_iterations,)`.
+
+    The last iteration of a converged cycle has the converged (`!`) total energy.
+    """
+
+    scf_iteration_times: Annotated[
+        np.ndarray, Spec("stdout.scf_history.time"), Unit("second")
+    ]
+    """Time of every SCF iteration in seconds, shape `(n_iterations,)`.
+
+    The increase of the `total cpu time spent up to now` printed during the iteration, with
+    the resolution of the stdout (0.1 s). `NaN` where QE does not print it.
+    """
+
+    scf_cycle_offsets: Annotated[np.ndarray, Spec("stdout.scf_history.offsets")]
+    """Start of every SCF cycle in the `scf_*` arrays, shape `(n_cycles + 1,)`.
+
+    The iterations of cycle `i` (e.g. of ionic step `i` of a `relax` run) are
+    `scf_cycle_offsets[i]:scf_cycle_offsets[i + 1]`, so that e.g.
+    `np.split(scf_accuracies, scf_cycle_offsets[1:-1])` gives the accuracies per cycle.
+    """
+
+
+def _raw_paths(spec: typing.Any, source: str) -> set[str]:
+    """Return the paths inside `raw_outputs[source]` that a glom `spec` reads from.
+
+    Only the first step of a tuple spec reads from `raw_outputs`; later steps transform
+    its result. The empty path means the whole dictionary of the `source` is needed.
+    """
+    if isinstance(spec, Spec):
+        return _raw_paths(spec.spec, source)
+    if isinstance(spec, str):
+        if spec == source or spec.startswith(f"{source}."):
+            return {spec[len(source) + 1 :]}
+        return set()
+    if isinstance(spec, tuple):
+        return _raw_paths(spec[0], source) if spec else set()
+    if isinstance(spec, dict):
+        return set().union(*(_raw_paths(value, source) for value in spec.values()))
+    if isinstance(spec, Coalesce):
+        return set().union(*(_raw_paths(subspec, source) for subspec in spec.subspecs))
+    return set()
+
+
+def _field_specs(mapping_cls: type) -> dict[str, typing.Any]:
+    """Map the fields of an `@output_mapping` class to their `Spec`, nesting sub-mappings."""
+    specs: dict[str, typing.Any] = {}
+
+    for name, hint in typing.get_type_hints(mapping_cls, include_extras=True).items():
+        if getattr(hint, "_is_output_mapping", False):
+            specs[name] = _field_specs(hint)
+            continue
+        for arg in typing.get_args(hint)[1:]:
+            if isinstance(arg, Spec):
+                specs[name] = arg
+
+    return specs
+
+
+def _raw_paths_for_fields(fields: Iterable[str], source: str = "xml") -> set[str]:
+    """Return the paths inside `raw_outputs[source]` needed to resolve the `_PwMapping`
+    outputs named in `fields`.
+
+    A field of a sub-namespace is named with a dot (e.g. `parameters.ecutwfc`); naming the
+    sub-namespace itself (e.g. `parameters`) selects all of its fields.
+    """
+    specs = _field_specs(_PwMapping)
+    paths: set[str] = set()
+
+    for field in fields:
+        spec: typing.Any = specs
+        for part in field.split("."):
+            if not isinstance(spec, dict) or part not in spec:
+                raise ValueError(
+                    f"`{field}` is not an output of `PwOutput`. "
+                    f"Available: {sorted(specs)}"
+                )
+            spec = spec[part]
+
+        if isinstance(spec, dict):
+            for sub_spec in spec.values():
+                paths |= _raw_paths(sub_spec, source)
+        else:
+            paths |= _raw_paths(spec, source)
+
+    return paths
+
+
+def _to_lists(value: typing.Any) -> typing.Any:
+    """Convert the NumPy arrays in `value` (possibly a dict of arrays) to nested lists."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {key: _to_lists(item) for key, item in value.items()}
+    return value
+
+
+_ARRAY_OUTPUTS = (
+    "structure",
+    "forces",
+    "stress",
+    "trajectory",
+    "scf_accuracies",
+    "scf_total_energies",
+    "scf_iteration_times",
+    "scf_cycle_offsets",
+)
+"""Outputs returned as nested lists when `PwOutput` is created with `as_lists=True`."""
+
+
+class PwOutput(
+    ArchiveMixin,
+    BatchOutputMixin,
+    CacheMixin,
+    DiscoveryMixin,
+    MemoizedOutputMixin,
+    BaseOutput[_PwMapping],
+):
+    """Output of the Quantum ESPRESSO pw.x code.
+
+    The `structure` cell and positions, `forces`, `stress`, `trajectory` and SCF history
+    (`scf_*`) outputs are NumPy arrays. Pass `as_lists=True` to get them as nested lists
+    instead.
+
+    Outputs are evaluated once and memoised on the instance (see `MemoizedOutputMixin`);
+    use `prefetch` to evaluate them ahead of e.g. a hot loop.
+    """
 
     converters: typing.ClassVar[dict[str, type[BaseConverter]]] = {
         "ase": ASEConverter,
@@ -455,28 +651,57 @@ class PwOutput(BaseOutput[_PwMapping]):
         "aiida": AiiDAConverter,
     }
 
-    @classmethod
-    def from_dir(cls, directory: str | Path):
-        """
-        From a directory, locates the standard output and XML files and
-        parses them.
-        """
-        directory = Path(directory)
+    file_patterns: typing.ClassVar[dict[str, FilePattern]] = {
+        "xml": XML_PATTERN,
+        "stdout": stdout_pattern("PWSCF"),
+    }
 
-        if not directory.is_dir():
-            raise ValueError(f"Path `{directory}` is not a valid directory.")
+    def __init__(
+        self, raw_outputs: dict[str, typing.Any], *, as_lists: bool = False
+    ) -> None:
+        super().__init__(raw_outputs)
+        self.as_lists = as_lists
 
-        stdout_file = None
-        xml_file = next(directory.rglob("data-file*.xml"), None)
+    def get_output(self, name: str, to: str | None = None) -> typing.Any:
+        value = super().get_output(name, to=to)
 
-        for file in [path for path in directory.iterdir() if path.is_file()]:
-            with file.open("r") as handle:
-                header = "".join(handle.readlines(5))
+        if self.as_lists and to is None and name in _ARRAY_OUTPUTS:
+            return _to_lists(value)
 
-                if "Program PWSCF" in header:
-                    stdout_file = file
+        return value
+
+    @classmethod
+    def from_dir(
+        cls,
+        directory: str | Path,
+        *,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        xml_mode: XMLMode = "validate",
+        fields: Iterable[str] | None = None,
+        band_arrays: bool = False,
+        as_lists: bool = False,
+        cache: CacheConfig | None = None,
+        index: FingerprintIndex | None = None,
+    ):
+        """
+        From a directory, locates the standard output and XML files and
+        parses them.
 
-        return cls.from_files(xml=xml_file, stdout=stdout_file)
+        The files are located with `discover`, searching `max_depth` levels of
+        subdirectories for the XML file. With a `cache`, the outputs are loaded from the
+        cache if the same files were already parsed with the same options (see
+        `CacheConfig`). With an `index`, the parsed files are recorded in it (see
+        `changed_since`). See `from_files` for the other keyword arguments.
+        """
+        return cls._from_discovered_files(
+            cls.discover(directory, max_depth=max_depth),
+            cache,
+            index,
+            xml_mode=xml_mode,
+            fields=fields,
+            band_arrays=band_arrays,
+            as_lists=as_lists,
+        )
 
     @classmethod
     def from_files(
@@ -484,14 +709,55 @@ class PwOutput(BaseOutput[_PwMapping]):
         *,
         xml: None | str | Path | TextIO = None,
         stdout: None | str | Path | TextIO = None,
+        xml_mode: XMLMode = "validate",
+        fields: Iterable[str] | None = None,
+        band_arrays: bool = False,
+        as_lists: bool = False,
     ):
-        """Parse the outputs directly from the provided files."""
+        """Parse the outputs directly from the provided files.
+
+        Files compressed with gzip, bzip2, xz or zstd are decompressed while they are read.
+
+        `xml_mode="fast"` skips the schema validation of the XML file, which dominates
+        its parsing time, and decodes it into the same `raw_outputs["xml"]` dictionary.
+        Only use it for XML files written by pw.x that you trust to be valid.
+        `xml_mode="stream"` does the same while reading the file incrementally, storing the
+        `ks_energies` blocks in NumPy arrays instead of a list of dictionaries (see
+        `PwXMLParser.parse_from_file`). Use it for runs with very many k-points, to keep
+        the memory usage proportional to the band-structure arrays.
+
+        `fields` restricts the decoding of the XML file to the parts needed by the named
+        outputs (e.g. `["total_energy", "forces", "parameters.ecutwfc"]`); the other
+        outputs that depend on the XML will not be available. Unless `fields` includes an
+        output of the stdout (e.g. `highest_occupied_level`), only the program header and
+        the timing summary of the stdout are parsed, reading only the start and the end of
+        the file. For runs with many k-points, leaving out `eigenvalues`,
+        `occupations_kpoint` and the `k_points_*` outputs skips the decoding of all
+        `ks_energies` blocks.
+
+        `band_arrays` stores the `ks_energies` blocks as contiguous NumPy arrays stacked over
+        the k-points (always the case with `xml_mode="stream"`), which makes the
+        band-structure outputs much cheaper to evaluate for runs with many k-points.
+
+        `as_lists` returns the array outputs (`structure`, `forces`, `stress`, `trajectory`
+        and the SCF history) as nested lists instead of NumPy arrays.
+        """
         raw_outputs = {}
 
         if stdout is not None:
-            raw_outputs["stdout"] = PwStdoutParser.parse_from_file(stdout)
+            # Without a stdout output in `fields`, only the start and the end of the file
+            # are read, for the program header and the timing summary
+            raw_outputs["stdout"] = PwStdoutParser.parse_from_file(
+                stdout,
+                body=fields is None or bool(_raw_paths_for_fields(fields, "stdout")),
+            )
 
         if xml is not None:
-            raw_outputs["xml"] = PwXMLParser.parse_from_file(xml)
+            raw_outputs["xml"] = PwXMLParser.parse_from_file(
+                xml,
+                mode=xml_mode,
+                select=None if fields is None else _raw_paths_for_fields(fields),
+                band_arrays=band_arrays,
+            )
 
-        return cls(raw_outputs=raw_outputs)
+        return cls(raw_outputs=raw_outputs, as_lists=as_lists)
@@ -4,7 +4,9 @@ Helper module for managing the QuantumESPRESSO version.
 
 from __future__ import annotations
 
+import os
 from functools import total_ordering
+from pathlib import Path
 
 from packaging.version import Version
 
@@ -100,3 +102,16 @@ def convert_qe_time_to_sec(timestr):
         + float(hours) * 3600.0
         + float(days) * 86400.0
     )
+
+
+def get_cache_dir() -> Path:
+    """Return the directory `qe_tools` uses for on-disk caches.
+
+    This is `$QE_TOOLS_CACHE_DIR` if set, otherwise `qe-tools` inside
+    `$XDG_CACHE_HOME` (falling back to `~/.cache`). The directory is not created.
+    """
+    if "QE_TOOLS_CACHE_DIR" in os.environ:
+        return Path(os.environ["QE_TOOLS_CACHE_DIR"])
+
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "qe-tools"
@@ -4,4 +4,19 @@ Load the `dough.testing` plugin explicitly so `json_serializer` and
 `robust_data_regression_check` are available to the test suite.
 """
 
+import pytest
+
+from qe_tools.outputs.parsers.schemas import SCHEMA_REGISTRY
+
 pytest_plugins = ["dough.testing.plugin"]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the on-disk caches of `qe_tools` in a temporary directory, out of `$HOME`."""
+    monkeypatch.setenv("QE_TOOLS_CACHE_DIR", str(tmp_path / "cache"))
+    if SCHEMA_REGISTRY.cache_dir is not None:
+        monkeypatch.setattr(
+            SCHEMA_REGISTRY, "cache_dir", tmp_path / "cache" / "schemas"
+        )
+    return tmp_path / "cache"
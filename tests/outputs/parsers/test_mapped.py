@@ -0,0 +1,88 @@
+"""Tests for parsing large files from a memory map."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import lzma
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs.parsers import _mapped
+from qe_tools.outputs.parsers.bands import BandsDatParser
+from qe_tools.outputs.parsers.dos import DosParser
+from qe_tools.outputs.parsers.projwfc import PdosAtmWfcParser, PdosTotParser
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+
+
+@pytest.mark.parametrize(
+    ("parser", "path"),
+    [
+        (DosParser, "dos/nospin/prefix.dos"),
+        (DosParser, "dos/collinear/prefix.dos"),
+        (BandsDatParser, "bands/mgo/MgO-bands.dat"),
+        (PdosTotParser, "projwfc/mgo/MgO-pdos.dat.pdos_tot"),
+        (PdosAtmWfcParser, "projwfc/mgo/MgO-pdos.dat.pdos_atm#2(O)_wfc#2(p)"),
+    ],
+)
+def test_mapped_matches_text(monkeypatch, parser, path):
+    """Parsing the memory map of a file gives the same result as parsing its content."""
+    path = FIXTURES / path
+    parsed = parser.parse(path.read_text())
+
+    monkeypatch.setattr(parser, "mmap_threshold", 1)
+    monkeypatch.setattr(_mapped, "TABLE_CHUNK_SIZE", 100)
+    monkeypatch.setattr(parser, "parse", None)  # the text path must not be taken
+
+    np.testing.assert_equal(parser.parse_from_file(path), parsed)
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, lzma.compress])
+@pytest.mark.parametrize(
+    ("parser", "path"),
+    [
+        (DosParser, "dos/collinear/prefix.dos"),
+        (BandsDatParser, "bands/mgo/MgO-bands.dat"),
+        (PdosTotParser, "projwfc/mgo/MgO-pdos.dat.pdos_tot"),
+        (PdosAtmWfcParser, "projwfc/mgo/MgO-pdos.dat.pdos_atm#2(O)_wfc#2(p)"),
+    ],
+)
+def test_compressed_matches_mapped(tmp_path, monkeypatch, compress, parser, path):
+    """Compressed files are read from their decompressed stream a chunk at a time."""
+    path = FIXTURES / path
+    compressed = tmp_path / "compressed"
+    compressed.write_bytes(compress(path.read_bytes()))
+
+    monkeypatch.setattr(parser, "mmap_threshold", 1)
+    monkeypatch.setattr(_mapped, "TABLE_CHUNK_SIZE", 100)
+    monkeypatch.setattr(parser, "parse", None)  # the text path must not be taken
+
+    np.testing.assert_equal(
+        parser.parse_from_file(compressed), parser.parse_from_file(path)
+    )
+
+
+def test_read_table_columns():
+    """Tables with a number of values that does not match the columns are rejected."""
+    np.testing.assert_equal(
+        _mapped.read_table(b"head\n1 2\n3 4\n", 5), [[1.0, 2.0], [3.0, 4.0]]
+    )
+
+    with pytest.raises(ValueError, match="2 columns"):
+        _mapped.read_table(b"1 2\n3\n")
+
+
+@pytest.mark.parametrize("token", [b"***", b"0.5-100", b"1.0d0"])
+def test_read_numbers_invalid(monkeypatch, token):
+    """A token that is not a number is rejected, even when the table keeps its shape."""
+    monkeypatch.setattr(_mapped, "TABLE_CHUNK_SIZE", 8)
+    buffer = b"1 2\n3 4\n5 " + token + b"\n7 8\n9 10\n11 12\n"
+
+    with pytest.raises(ValueError, match="not a number"):
+        _mapped.read_table(buffer)
+    np.testing.assert_equal(_mapped.read_numbers(b" 1\t2\n\n3 \n"), [1.0, 2.0, 3.0])
+    with pytest.raises(ValueError, match="not a number"):
+        _mapped.read_table(io.BytesIO(buffer))
@@ -0,0 +1,134 @@
+"""Tests for the pw.x XML parser."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs.parsers.pw import PwXMLParser
+
+PW_FIXTURES = Path(__file__).parent.parent / "fixtures" / "pw"
+XML_FILES = sorted(PW_FIXTURES.glob("*/data-file-schema.xml"))
+
+
+def _assert_identical(reference, decoded, path="xml"):
+    """Assert equality, also checking that the Python types match (`1 == 1.0 == True`)."""
+    assert type(reference) is type(decoded), path
+
+    if isinstance(reference, dict):
+        assert reference.keys() == decoded.keys(), path
+        for key, value in reference.items():
+            _assert_identical(value, decoded[key], f"{path}.{key}")
+    elif isinstance(reference, list):
+        assert len(reference) == len(decoded), path
+        for index, (ref_item, item) in enumerate(zip(reference, decoded)):
+            _assert_identical(ref_item, item, f"{path}[{index}]")
+    else:
+        assert reference == decoded, path
+
+
+@pytest.mark.parametrize("xml_file", XML_FILES, ids=lambda path: path.parent.name)
+def test_fast_mode_matches_validation(xml_file):
+    """The non-validating decoder must produce exactly the validating decoder's dict."""
+    _assert_identical(
+        PwXMLParser.parse_from_file(xml_file, mode="validate"),
+        PwXMLParser.parse_from_file(xml_file, mode="fast"),
+    )
+
+
+@pytest.mark.parametrize("xml_file", XML_FILES, ids=lambda path: path.parent.name)
+def test_stream_mode(xml_file):
+    """The streaming decoder stacks the `ks_energies` blocks into arrays; the rest is unchanged."""
+    reference = PwXMLParser.parse_from_file(xml_file, mode="fast")
+    streamed = PwXMLParser.parse_from_file(xml_file, mode="stream")
+
+    ks_list = reference["output"]["band_structure"].pop("ks_energies")
+    ks_arrays = streamed["output"]["band_structure"].pop("ks_energies")
+    _assert_identical(reference, streamed)
+
+    assert ks_arrays["npw"].tolist() == [ks["npw"] for ks in ks_list]
+    assert ks_arrays["k_point"]["$"].tolist() == [ks["k_point"]["$"] for ks in ks_list]
+    assert ks_arrays["k_point"]["@weight"].tolist() == [
+        ks["k_point"]["@weight"] for ks in ks_list
+    ]
+    for key in ("eigenvalues", "occupations"):
+        assert ks_arrays[key]["@size"] == ks_list[0][key]["@size"]
+        assert ks_arrays[key]["$"].tolist() == [ks[key]["$"] for ks in ks_list]
+
+
+@pytest.mark.parametrize("mode", ["validate", "fast"])
+@pytest.mark.parametrize("xml_file", XML_FILES, ids=lambda path: path.parent.name)
+def test_band_arrays(xml_file, mode):
+    """`band_arrays` gives the same layout (and values) as the streaming decoder."""
+    streamed = PwXMLParser.parse_from_file(xml_file, mode="stream")
+    decoded = PwXMLParser.parse_from_file(xml_file, mode=mode, band_arrays=True)
+
+    np.testing.assert_equal(decoded, streamed)
+    eigenvalues = decoded["output"]["band_structure"]["ks_energies"]["eigenvalues"]
+    assert eigenvalues["$"].dtype == np.float64
+    assert eigenvalues["$"].flags.c_contiguous
+
+
+def test_stream_mode_skips_unselected_ks_energies():
+    xml_file = PW_FIXTURES / "collinear" / "data-file-schema.xml"
+
+    selected = PwXMLParser.parse_from_file(
+        xml_file, mode="stream", select=["output.band_structure.nks"]
+    )
+
+    assert selected["output"] == {"band_structure": {"nks": 2}}
+
+
+def test_parse_content_and_handle():
+    xml_file = PW_FIXTURES / "nospin" / "data-file-schema.xml"
+    reference = PwXMLParser.parse_from_file(xml_file)
+
+    assert PwXMLParser.parse(xml_file.read_text(), mode="fast") == reference
+    with xml_file.open() as handle:
+        assert PwXMLParser.parse_from_file(handle, mode="fast") == reference
+
+    streamed = PwXMLParser.parse(xml_file.read_text(), mode="stream")
+    with xml_file.open() as handle:
+        streamed_handle = PwXMLParser.parse_from_file(handle, mode="stream")
+    np.testing.assert_equal(streamed_handle, streamed)
+
+
+def test_invalid_mode():
+    xml_file = PW_FIXTURES / "nospin" / "data-file-schema.xml"
+
+    with pytest.raises(ValueError, match="Unknown XML decoding mode"):
+        PwXMLParser.parse_from_file(xml_file, mode="lazy")
+
+
+@pytest.mark.parametrize("mode", ["validate", "stream"])
+def test_corrupted_file(tmp_path, mode):
+    xml_file = tmp_path / "data-file-schema.xml"
+    xml_file.write_text("<qes:espresso>")
+
+    with pytest.raises(ValueError, match="Unable to parse the XML file"):
+        PwXMLParser.parse_from_file(xml_file, mode=mode)
+
+
+@pytest.mark.parametrize("mode", ["validate", "fast"])
+def test_select_subtrees(mode):
+    """Selected subtrees are decoded exactly as in the full dict; the rest is left out."""
+    xml_file = PW_FIXTURES / "collinear" / "data-file-schema.xml"
+    full = PwXMLParser.parse_from_file(xml_file, mode=mode)
+
+    selected = PwXMLParser.parse_from_file(
+        xml_file,
+        mode=mode,
+        select=["output.band_structure.fermi_energy", "output.atomic_structure.@alat"],
+    )
+
+    assert set(selected["output"]) == {"band_structure", "atomic_structure"}
+    assert selected["output"]["band_structure"] == {
+        "fermi_energy": full["output"]["band_structure"]["fermi_energy"]
+    }
+    assert selected["output"]["atomic_structure"] == {
+        key: value
+        for key, value in full["output"]["atomic_structure"].items()
+        if key.startswith("@")
+    }
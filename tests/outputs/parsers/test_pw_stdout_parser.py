@@ -0,0 +1,198 @@
+"""Tests for the pw.x stdout parser."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs import PwOutput
+from qe_tools.outputs.parsers._scanner import Event
+from qe_tools.outputs.parsers.pw import PwStdoutParser
+
+from qe_tools import CONSTANTS
+
+VC_RELAX = Path(__file__).parent.parent / "fixtures" / "pw" / "default_xml_240411"
+
+MD_HEADER = """\
+     Program PWSCF v.7.2 starts on  1Jan2024 at  0: 0: 0
+
+     lattice parameter (alat)  =      10.0000  a.u.
+     number of atoms/cell      =            2
+
+     crystal axes: (cart. coord. in units of alat)
+               a(1) = (   1.000000   0.000000   0.000000 )
+               a(2) = (   0.000000   1.000000   0.000000 )
+               a(3) = (   0.000000   0.000000   1.000000 )
+
+     site n.     atom                  positions (alat units)
+         1           H   tau(   1) = (   0.0000000   0.0000000   0.0000000  )
+         2           H   tau(   2) = (   0.1000000   0.0000000   0.0000000  )
+"""
+
+MD_STEP = """\
+     total energy              =     -2.20000000 Ry
+!    total energy              =     {energy:.8f} Ry
+
+     Forces acting on atoms (cartesian axes, Ry/au):
+
+     atom    1 type  1   force =     {force:.8f}    0.00000000    0.00000000
+     atom    2 type  1   force =    -{force:.8f}    0.00000000    0.00000000
+
+     Total force =     0.100000     Total SCF correction =     0.000000
+
+     Entering Dynamics:    iteration =     1
+
+ATOMIC_POSITIONS (bohr)
+H             0.0000000000        0.0000000000        0.0000000000
+H             {distance:.10f}        0.0000000000        0.0000000000
+
+"""
+
+
+def _md_stdout(number_of_steps: int) -> str:
+    steps = (
+        MD_STEP.format(energy=-2.3 - step, force=0.01 * step, distance=1.0 + step)
+        for step in range(number_of_steps)
+    )
+    return MD_HEADER + "".join(steps)
+
+
+def test_vc_relax_trajectory():
+    """Every ionic step of a `vc-relax`, the last one being the final SCF."""
+    output = PwOutput.from_dir(VC_RELAX)
+    trajectory = output.get_output("trajectory")
+
+    assert trajectory["symbols"] == ["Si", "Si"]
+    assert trajectory["energy"].shape == (4,)
+    assert trajectory["cell"].shape == trajectory["stress"].shape == (4, 3, 3)
+    assert trajectory["positions"].shape == trajectory["forces"].shape == (4, 2, 3)
+
+    # The structure of the second step is the first `CELL_PARAMETERS` block
+    np.testing.assert_allclose(trajectory["cell"][1, 0], [3.859236539, 0.0, 0.0])
+
+    # The last step is the final SCF, also written to the XML
+    assert trajectory["energy"][-1] == pytest.approx(
+        output.get_output("total_energy"), abs=1e-6
+    )
+    np.testing.assert_allclose(
+        trajectory["forces"][-1], output.get_output("forces"), atol=1e-6
+    )
+    np.testing.assert_allclose(
+        trajectory["stress"][-1], output.get_output("stress"), atol=1e-3
+    )
+    structure = output.get_output("structure")
+    np.testing.assert_allclose(trajectory["cell"][-1], structure["cell"], atol=1e-4)
+    np.testing.assert_allclose(
+        trajectory["positions"][-1], structure["positions"], atol=1e-4
+    )
+
+    # The parser keeps the Rydberg atomic units of the stdout
+    raw = PwStdoutParser.parse_from_file(VC_RELAX / "pw.out")["trajectory"]
+    np.testing.assert_allclose(raw["cell"] * CONSTANTS.bohr_to_ang, trajectory["cell"])
+    np.testing.assert_allclose(raw["energy"] * CONSTANTS.ry_to_ev, trajectory["energy"])
+
+
+@pytest.mark.parametrize("chunk_size", [64, 4096])
+def test_iter_steps(chunk_size):
+    """The steps yielded one at a time are those of the assembled trajectory."""
+    trajectory = PwStdoutParser.parse_from_file(VC_RELAX / "pw.out")["trajectory"]
+
+    steps = list(PwStdoutParser.iter_steps(VC_RELAX / "pw.out", chunk_size=chunk_size))
+
+    assert len(steps) == 4
+    for key in ("energy", "cell", "positions", "forces", "stress"):
+        np.testing.assert_equal(
+            np.array([step[key] for step in steps]), trajectory[key]
+        )
+
+
+def test_md_trajectory():
+    """Positions printed after each MD step are those of the next step."""
+    content = _md_stdout(40)
+
+    trajectory = PwStdoutParser.parse(content)["trajectory"]
+
+    assert trajectory["positions"].shape == (40, 2, 3)
+    assert "stress" not in trajectory
+    np.testing.assert_allclose(trajectory["positions"][0, 1], [1.0, 0.0, 0.0])
+    np.testing.assert_allclose(trajectory["positions"][1:, 1, 0], 1.0 + np.arange(39))
+    np.testing.assert_allclose(trajectory["energy"], -2.3 - np.arange(40))
+    np.testing.assert_allclose(trajectory["forces"][:, 0, 0], 0.01 * np.arange(40))
+
+
+def test_iter_steps_is_lazy():
+    """Steps are yielded before the rest of a long run is read."""
+    handle = io.StringIO(_md_stdout(10_000))
+
+    steps = PwStdoutParser.iter_steps(handle, chunk_size=4096)
+    first = next(steps)
+
+    assert first["energy"] == pytest.approx(-2.3)
+    assert handle.tell() < 2 * 4096
+    assert sum(1 for _ in steps) == 9_999
+
+
+def test_no_trajectory():
+    """Runs without a converged SCF cycle have no steps."""
+    parsed = PwStdoutParser.parse_from_file(
+        VC_RELAX.parent / "failed_no_xml" / "pw.out"
+    )
+
+    assert "trajectory" not in parsed
+
+
+def test_scf_history():
+    """The iterations of every SCF cycle, the last one with the converged energy."""
+    parsed = PwStdoutParser.parse_from_file(VC_RELAX / "pw.out")
+    history = parsed["scf_history"]
+
+    np.testing.assert_equal(history["offsets"], [0, 7, 12, 19, 28])
+    assert history["scf_accuracy"][:2] == pytest.approx([0.05850370, 0.01627960])
+    np.testing.assert_allclose(history["time"][:3], [0.1, 0.0, 0.1], atol=1e-9)
+    np.testing.assert_equal(
+        history["total_energy"][history["offsets"][1:] - 1],
+        parsed["trajectory"]["energy"],
+    )
+
+    output = PwOutput.from_dir(VC_RELAX)
+    np.testing.assert_allclose(
+        output.get_output("scf_total_energies"),
+        history["total_energy"] * CONSTANTS.ry_to_ev,
+    )
+    np.testing.assert_allclose(
+        output.get_output("scf_accuracies"),
+        history["scf_accuracy"] * CONSTANTS.ry_to_ev,
+    )
+
+
+def test_scf_history_unreadable_values():
+    """Overflowed (`****`) and truncated values are NaN, without events."""
+    content = (
+        "     iteration #  1     ecut=    30.00 Ry     beta= 0.70\n"
+        "     total cpu time spent up to now is        0.5 secs\n"
+        "     total energy              =   **************** Ry\n"
+        "     estimated scf accuracy    <\n"
+        "     iteration #***     ecut=    30.00 Ry     beta= 0.70\n"
+        "     total cpu time spent up to now is       **** secs\n"
+        "     total energy              =     -93.40000000 Ry\n"
+        "     estimated scf accuracy    <       0.00100000 Ry\n"
+    )
+    events: list[Event] = []
+    scanner = PwStdoutParser.scanner()
+    scanner.on_event = events.append
+
+    history = scanner.scan_text(content)["scf_history"]
+
+    np.testing.assert_equal(history["offsets"], [0, 2])
+    np.testing.assert_equal(history["total_energy"], [np.nan, -93.4])
+    np.testing.assert_equal(history["scf_accuracy"], [np.nan, 0.001])
+    np.testing.assert_equal(history["time"], [np.nan, np.nan])
+    assert events == [
+        Event("scf_iteration", 1),
+        Event("cpu_time", 0.5),
+        Event("scf_energy", -93.4),
+        Event("scf_accuracy", 0.001),
+    ]
@@ -0,0 +1,130 @@
+"""Tests for the line-dispatch scanner of QE stdout files."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs.parsers._scanner import LineScanner
+from qe_tools.outputs.parsers.pw import PwStdoutParser
+
+FIXTURES = Path(__file__).parent.parent / "fixtures" / "pw"
+
+TEXT = """\
+Program PWSCF v.7.2 starts
+  total energy = 1.0
+the total energy is not a first token
+  total   energy = 2.0
+totally unrelated
+\ttotal energy = 3.0
+total"""
+
+
+def _collect(line: str, scanner: LineScanner) -> None:
+    scanner.data.setdefault("lines", []).append(line)
+
+
+def test_dispatch_first_token():
+    scanner = LineScanner()
+    scanner.add_handler("total", _collect)
+
+    assert scanner.scan_text(TEXT)["lines"] == [
+        "  total energy = 1.0\n",
+        "  total   energy = 2.0\n",
+        "\ttotal energy = 3.0\n",
+        "total",
+    ]
+
+
+def test_scan_text_matches_scan():
+    """Finding the tokens in the text dispatches the same lines as feeding every line."""
+    scanned, fed = LineScanner(), LineScanner()
+    for scanner in (scanned, fed):
+        for token in ("total", "Program", "energy"):
+            scanner.add_handler(token, _collect)
+
+    assert scanned.scan_text(TEXT) == fed.scan(TEXT.splitlines(keepends=True))
+
+
+def test_register_while_scanning():
+    """Handlers registered by a handler apply from the next line on."""
+
+    def register(line: str, scanner: LineScanner) -> None:
+        scanner.add_handler("total", _collect)
+
+    scanner = LineScanner()
+    scanner.add_handler("the", register)
+
+    assert scanner.scan_text(TEXT)["lines"] == [
+        "  total   energy = 2.0\n",
+        "\ttotal energy = 3.0\n",
+        "total",
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024])
+def test_scan_file_chunks(chunk_size):
+    """Lines split over chunk boundaries are dispatched whole."""
+    chunked, whole = LineScanner(), LineScanner()
+    for scanner in (chunked, whole):
+        scanner.add_handler("total", _collect)
+
+    parsed = chunked.scan_file(io.StringIO(TEXT), chunk_size=chunk_size)
+
+    assert parsed == whole.scan_text(TEXT)
+
+
+@pytest.mark.parametrize(
+    "fixture", sorted(path.parent.name for path in FIXTURES.glob("*/pw.out"))
+)
+def test_pw_stdout_sources(fixture):
+    """Parsing content, a path and an open file handle give the same result."""
+    path = FIXTURES / fixture / "pw.out"
+    parsed = PwStdoutParser.parse(path.read_text())
+
+    np.testing.assert_equal(PwStdoutParser.parse_from_file(path), parsed)
+    with path.open() as handle:
+        np.testing.assert_equal(PwStdoutParser.parse_from_file(handle), parsed)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_read_lines(chunk_size):
+    """Blocks requested by a handler are read whole, and not dispatched."""
+
+    def read_block(line: str, scanner: LineScanner) -> None:
+        scanner.read_lines(2, lambda lines, scanner: _collect("".join(lines), scanner))
+
+    scanner = LineScanner()
+    scanner.add_handler("Program", read_block)
+    scanner.add_handler("total", _collect)
+
+    parsed = scanner.scan_file(io.StringIO(TEXT), chunk_size=chunk_size)
+
+    assert parsed["lines"] == [
+        "  total energy = 1.0\nthe total energy is not a first token\n",
+        "  total   energy = 2.0\n",
+        "\ttotal energy = 3.0\n",
+        "total",
+    ]
+
+
+def test_nested_prefixes():
+    """A line is passed to the handlers of all the prefixes it starts with."""
+    calls = []
+    scanner = LineScanner()
+    scanner.add_handler("total", lambda line, _: calls.append(("total", line)))
+    scanner.add_handler(
+        "total   stress", lambda line, _: calls.append(("stress", line))
+    )
+
+    scanner.scan_text("total   stress (Ry)\ntotal   energy\ntotal   stressed\n")
+
+    assert calls == [
+        ("total", "total   stress (Ry)\n"),
+        ("stress", "total   stress (Ry)\n"),
+        ("total", "total   energy\n"),
+        ("total", "total   stressed\n"),
+    ]
@@ -0,0 +1,122 @@
+"""Tests for the process-wide registry of compiled QE XML schemas."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import pytest
+
+from qe_tools.outputs import DosOutput, PwOutput
+from qe_tools.outputs.parsers.schemas import SCHEMA_REGISTRY, SchemaRegistry
+
+
+def test_available_lists_vendored_schemas():
+    available = SchemaRegistry.available()
+
+    assert "qes_211101.xsd" in available
+    assert "qes_250521.xsd" in available
+    assert all(name.endswith(".xsd") for name in available)
+
+
+def test_get_is_cached_and_clear_resets():
+    registry = SchemaRegistry()
+
+    schema = registry.get("qes_240411.xsd")
+
+    assert "qes_240411.xsd" in registry
+    assert registry.get("qes_240411.xsd") is schema
+
+    registry.clear()
+
+    assert "qes_240411.xsd" not in registry
+    assert registry.get("qes_240411.xsd") is not schema
+
+
+def test_concurrent_get_compiles_once():
+    registry = SchemaRegistry()
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("qes_230310.xsd")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(schema) for schema in results}) == 1
+
+
+def test_preload():
+    registry = SchemaRegistry()
+
+    registry.preload(["qes_220603.xsd"])
+
+    assert "qes_220603.xsd" in registry
+
+
+def test_unknown_schema():
+    with pytest.raises(ValueError, match="not available"):
+        SchemaRegistry().get("qes_999999.xsd")
+
+
+def test_parsers_share_the_global_registry():
+    fixtures = Path(__file__).parent.parent / "fixtures"
+    xml = fixtures / "pw" / "nospin" / "data-file-schema.xml"
+
+    SCHEMA_REGISTRY.clear()
+    PwOutput.from_files(xml=xml)
+    schema = SCHEMA_REGISTRY.get("qes_230310.xsd")
+    DosOutput.from_files(xml=xml)
+
+    assert SCHEMA_REGISTRY.get("qes_230310.xsd") is schema
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    writer = SchemaRegistry(cache_dir=tmp_path)
+    writer.preload(["qes_240411.xsd"])
+    artifact = writer.artifact_path("qes_240411.xsd")
+
+    assert artifact.is_file()
+
+    reader = SchemaRegistry(cache_dir=tmp_path)
+    schema = reader.get("qes_240411.xsd")
+
+    assert schema.url == writer.get("qes_240411.xsd").url
+
+
+def test_disk_cache_replaces_stale_and_corrupt_artifacts(tmp_path):
+    registry = SchemaRegistry(cache_dir=tmp_path)
+    artifact = registry.artifact_path("qes_240411.xsd")
+    stale = tmp_path / "qes_240411-0000000000000000.pickle"
+    stale.write_bytes(b"stale")
+    artifact.write_bytes(b"corrupt")
+
+    registry.get("qes_240411.xsd")
+
+    assert not stale.exists()
+    assert SchemaRegistry(cache_dir=tmp_path).get("qes_240411.xsd") is not None
+    assert artifact.read_bytes() != b"corrupt"
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX file modes")
+def test_disk_cache_skips_untrusted_artifacts(tmp_path, monkeypatch):
+    """Artifacts that other users can write to are compiled again, not unpickled."""
+    SchemaRegistry(cache_dir=tmp_path).preload(["qes_240411.xsd"])
+    registry = SchemaRegistry(cache_dir=tmp_path)
+    artifact = registry.artifact_path("qes_240411.xsd")
+    artifact.chmod(0o666)
+
+    loaded = []
+    monkeypatch.setattr(pickle, "load", loaded.append)
+    assert registry.get("qes_240411.xsd") is not None
+    assert loaded == []
+
+    # The artifact written instead can be loaded
+    assert artifact.stat().st_mode & 0o022 == 0
+    SchemaRegistry(cache_dir=tmp_path).get("qes_240411.xsd")
+    assert len(loaded) == 1
@@ -0,0 +1,152 @@
+"""Tests for the base parser of QE stdout files."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs.parsers._scanner import Event, LineScanner
+from qe_tools.outputs.parsers.pw import PwStdoutParser
+from qe_tools.outputs.parsers.stdout import TAIL_SIZE, BaseStdoutParser
+from qe_tools.utils import convert_qe_time_to_sec
+
+PW_STDOUT = Path(__file__).parent.parent / "fixtures" / "pw" / "nospin" / "pw.out"
+
+MD_STEP = (
+    "     total cpu time spent up to now is        1.2 secs\n"
+    "     Ekin + Etot (const)   =     -93.45310000 Ry\n"
+)
+
+
+def _reference_wall_time(content: str) -> float:
+    """The wall time as found by the original (backtracking) regular expression."""
+    match = re.search(
+        r"PWSCF\s+:[\s\S]+CPU\s+(?P<wall_time>[\s.\dsmdh]+)\sWALL", content
+    )
+    return convert_qe_time_to_sec(match["wall_time"])
+
+
+@pytest.fixture
+def large_stdout(tmp_path):
+    """A pw.x stdout padded with many MD steps, larger than the head and tail windows."""
+    head, summary = PW_STDOUT.read_text().split("     init_run     :", 1)
+    content = head + MD_STEP * 2000 + "     init_run     :" + summary
+
+    path = tmp_path / "pw.out"
+    path.write_text(content)
+    return path
+
+
+def test_wall_time_from_tail(large_stdout):
+    content = large_stdout.read_text()
+
+    parsed = BaseStdoutParser.parse_from_file(large_stdout)
+
+    assert parsed == BaseStdoutParser.parse(content)
+    assert parsed == {
+        "code_version": "7.2",
+        "wall_time_seconds": _reference_wall_time(content),
+    }
+
+
+def test_wall_time_fallback(large_stdout):
+    """The whole file is scanned when the timing summary is not at its end."""
+    content = large_stdout.read_text() + " trailing output\n" * TAIL_SIZE
+    large_stdout.write_text(content)
+
+    parsed = BaseStdoutParser.parse_from_file(large_stdout)
+
+    assert parsed == BaseStdoutParser.parse(content)
+    assert parsed["wall_time_seconds"] == _reference_wall_time(content)
+
+
+def test_no_wall_time(large_stdout):
+    """Interrupted runs have no timing summary."""
+    content = large_stdout.read_text().split("     init_run     :")[0]
+    large_stdout.write_text(content)
+
+    assert BaseStdoutParser.parse_from_file(large_stdout) == {"code_version": "7.2"}
+
+
+def test_pw_without_body(large_stdout, monkeypatch):
+    """With `body=False`, pw.x stdout files are only read at their start and end."""
+    full = PwStdoutParser.parse_from_file(large_stdout)
+
+    scans = []
+    monkeypatch.setattr(LineScanner, "scan_file", lambda *args: scans.append(args))
+    parsed = PwStdoutParser.parse_from_file(large_stdout, body=False)
+
+    assert scans == []
+    assert parsed == BaseStdoutParser.parse_from_file(large_stdout)
+    assert parsed == {key: full[key] for key in ("code_version", "wall_time_seconds")}
+
+
+def _events(content: str) -> list[Event]:
+    events: list[Event] = []
+    scanner = PwStdoutParser.scanner()
+    scanner.on_event = events.append
+    scanner.scan_text(content)
+    return events
+
+
+def test_follow(tmp_path):
+    """Polling a growing file gives the events and data of parsing it at once."""
+    content = PW_STDOUT.parent.parent / "default_xml_240411" / "pw.out"
+    data = content.read_bytes()
+    path = tmp_path / "pw.out"
+    path.write_bytes(b"")
+
+    follower = PwStdoutParser.follow(path)
+    events = []
+    for start in range(0, len(data), 997):  # cuts through lines
+        with path.open("ab") as handle:
+            handle.write(data[start : start + 997])
+        events.extend(follower.poll())
+        assert follower.offset == path.stat().st_size
+    events.extend(follower.finish())
+
+    reference = _events(data.decode())
+    assert [event.name for event in events] == [event.name for event in reference]
+    assert {event.name for event in events} >= {
+        "scf_iteration",
+        "scf_energy",
+        "scf_accuracy",
+        "cpu_time",
+        "total_energy",
+        "step",
+        "wall_time_seconds",
+    }
+    np.testing.assert_equal(follower.data, PwStdoutParser.parse_from_file(content))
+
+
+def test_follow_reads_new_bytes_only(tmp_path):
+    path = tmp_path / "pw.out"
+    follower = BaseStdoutParser.follow(path)
+
+    assert follower.poll() == []  # not written yet
+
+    path.write_text("     Program PWSCF v.7.2 starts on\n     PWSCF        :")
+    assert follower.poll() == []
+    assert follower.data == {"code_version": "7.2"}
+    assert follower.poll() == []
+    assert follower.offset == path.stat().st_size
+
+    with path.open("a") as handle:
+        handle.write("      1.23s CPU      1.50s WALL\n")
+    assert follower.poll() == [Event("wall_time_seconds", 1.5)]
+
+
+def test_follow_restarted(tmp_path):
+    """A truncated file is parsed again from the start."""
+    path = tmp_path / "pw.out"
+    path.write_text("     Program PWSCF v.7.2 starts on\n" + " padding\n" * 10)
+    follower = BaseStdoutParser.follow(path)
+    follower.poll()
+
+    path.write_text("     Program PWSCF v.7.3 starts on\n")
+    follower.poll()
+
+    assert follower.data == {"code_version": "7.3"}
@@ -0,0 +1,126 @@
+"""Tests for parsing calculations straight from `tar` and `zip` archives."""
+
+import gzip
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs import BandsOutput, DosOutput, ProjwfcOutput, PwOutput
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def make_archive(path: Path, runs: dict[str, Path]) -> Path:
+    """Archive the directory of each run under `runs/<name>`, in a `tar.gz` or `zip`."""
+    members = [
+        (f"runs/{name}/{file.relative_to(directory).as_posix()}", file)
+        for name, directory in runs.items()
+        for file in sorted(directory.rglob("*"))
+        if file.is_file()
+    ]
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, file in members:
+                archive.write(file, name)
+    else:
+        with tarfile.open(path, "w:gz") as archive:
+            for name, file in members:
+                archive.add(file, name)
+    return path
+
+
+@pytest.mark.parametrize("archive_name", ["runs.tar.gz", "runs.zip"])
+@pytest.mark.parametrize(
+    ("output_cls", "directory"),
+    [
+        (PwOutput, "pw/nospin"),
+        (DosOutput, "dos/collinear"),
+        (BandsOutput, "bands/mgo"),
+        (ProjwfcOutput, "projwfc/mgo"),
+    ],
+)
+def test_from_archive(tmp_path, archive_name, output_cls, directory):
+    """Parsing a run from an archive gives the same result as parsing its directory."""
+    archive = make_archive(tmp_path / archive_name, {"a": FIXTURES / directory})
+
+    output = output_cls.from_archive(archive, "runs/a")
+
+    np.testing.assert_equal(
+        output.raw_outputs, output_cls.from_dir(FIXTURES / directory).raw_outputs
+    )
+
+
+def test_iter_archive(tmp_path):
+    """Every run of an archive is parsed in one pass, with failures reported per run."""
+    runs = {path.name: path for path in sorted(FIXTURES.glob("pw/default_xml_*"))}
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / "pw.out").write_text("Program PWSCF\n     lattice parameter (alat) =")
+    archive = make_archive(tmp_path / "runs.tar.gz", {**runs, "broken": broken})
+
+    results = list(PwOutput.iter_archive(archive, "runs", xml_mode="fast"))
+
+    assert [result.directory for result in results] == [
+        Path("runs", name) for name in [*runs, "broken"]
+    ]
+    for result in results[:-1]:
+        assert result.ok
+        reference = PwOutput.from_dir(runs[result.directory.name], xml_mode="fast")
+        np.testing.assert_equal(
+            result.output.get_output("eigenvalues"), reference.get_output("eigenvalues")
+        )
+    assert not results[-1].ok
+    assert results[-1].output is None
+
+
+def test_iter_archive_split_run(tmp_path):
+    """A run whose members are not stored together yields a second result, with an
+    error, and the other runs are still parsed."""
+    runs = {"a": FIXTURES / "dos" / "collinear", "b": FIXTURES / "dos" / "nospin"}
+    archive = tmp_path / "runs.tar.gz"
+    with tarfile.open(archive, "w:gz") as handle:
+        for name in ["a", "b"]:
+            for file in sorted(runs[name].iterdir()):
+                handle.add(file, f"runs/{name}/{file.name}")
+        handle.add(runs["a"] / "dos.out", "runs/a/extra/dos.out")
+        handle.add(runs["a"] / "dos.out", "runs/c/dos.out")
+
+    results = list(DosOutput.iter_archive(archive, "runs"))
+
+    assert [result.directory for result in results] == [
+        Path("runs", name) for name in ["a", "b", "a", "c"]
+    ]
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert "are not stored together" in results[2].error
+
+
+def test_from_archive_layout(tmp_path):
+    """The XML file is found in a compressed `<prefix>.save` folder, as by `discover`."""
+    run = tmp_path / "run"
+    (run / "out" / "aiida.save").mkdir(parents=True)
+    shutil.copy(FIXTURES / "pw" / "nospin" / "pw.out", run / "aiida.out")
+    with (
+        (FIXTURES / "pw" / "nospin" / "data-file-schema.xml").open("rb") as source,
+        gzip.open(
+            run / "out" / "aiida.save" / "data-file-schema.xml.gz", "wb"
+        ) as target,
+    ):
+        shutil.copyfileobj(source, target)
+    archive = make_archive(tmp_path / "run.zip", {"run": run})
+
+    output = PwOutput.from_archive(archive, "runs/run/")
+
+    np.testing.assert_equal(
+        output.raw_outputs, PwOutput.from_dir(FIXTURES / "pw" / "nospin").raw_outputs
+    )
+
+
+def test_from_archive_missing_prefix(tmp_path):
+    archive = make_archive(tmp_path / "runs.tar.gz", {"a": FIXTURES / "dos/nospin"})
+
+    with pytest.raises(ValueError, match="No file under"):
+        DosOutput.from_archive(archive, "runs/b")
@@ -0,0 +1,89 @@
+"""Tests for parsing many directories with `from_dirs`."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools._parallel import imap_unordered
+from qe_tools.outputs import BandsOutput, DosOutput, PwOutput
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pw_from_dirs(workers):
+    directories = sorted(FIXTURES.glob("pw/default_xml_*"))
+
+    results = list(PwOutput.from_dirs(directories, workers=workers, chunksize=2))
+
+    assert sorted(result.directory for result in results) == directories
+    for result in results:
+        assert result.ok
+        reference = PwOutput.from_dir(result.directory)
+        np.testing.assert_equal(
+            result.output.get_output("eigenvalues"), reference.get_output("eigenvalues")
+        )
+
+
+def test_from_dirs_reports_failures(tmp_path):
+    directories = [FIXTURES / "pw" / "nospin", tmp_path / "missing"]
+
+    results = {
+        result.directory: result
+        for result in PwOutput.from_dirs(directories, workers=2)
+    }
+
+    assert results[directories[0]].ok
+    failed = results[directories[1]]
+    assert not failed.ok
+    assert failed.output is None
+    assert "is not a valid directory" in failed.error
+
+
+def test_from_dirs_passes_options():
+    directory = FIXTURES / "pw" / "nospin"
+
+    (result,) = PwOutput.from_dirs(
+        [directory], workers=2, xml_mode="fast", as_lists=True
+    )
+
+    assert isinstance(result.output.get_output("structure")["positions"], list)
+
+
+@pytest.mark.parametrize(
+    ("output_cls", "directory"),
+    [(DosOutput, "dos/nospin"), (BandsOutput, "bands/mgo")],
+)
+def test_other_outputs(output_cls, directory):
+    (result,) = output_cls.from_dirs([FIXTURES / directory], workers=2)
+
+    assert result.ok
+    assert result.output.list_outputs() == (
+        output_cls.from_dir(FIXTURES / directory).list_outputs()
+    )
+
+
+def _exit_on_seven(item):
+    if item == 7:
+        os._exit(1)
+    return item * 2
+
+
+def test_worker_process_dies():
+    """A worker process that dies fails the chunks in flight, not the whole batch."""
+    results = {
+        item: (result, error)
+        for item, result, error in imap_unordered(_exit_on_seven, range(40), workers=2)
+    }
+
+    assert sorted(results) == list(range(40))
+    assert results[7][0] is None
+    assert "BrokenProcessPool" in results[7][1]
+    failed = [item for item, (_, error) in results.items() if error is not None]
+    # At most the `2 * workers` chunks in flight when the worker died
+    assert len(failed) <= 4
+    assert all(
+        results[item] == (item * 2, None) for item in results if item not in failed
+    )
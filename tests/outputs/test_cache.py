@@ -0,0 +1,149 @@
+"""Tests for the persistent cache of the parsed `raw_outputs`."""
+
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs import (
+    BandsOutput,
+    CacheConfig,
+    DosOutput,
+    ProjwfcOutput,
+    PwOutput,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.mark.parametrize(
+    ("output_cls", "directory", "kwargs"),
+    [
+        (PwOutput, "pw/nospin", {}),
+        (PwOutput, "pw/default_xml_250521", {"xml_mode": "stream"}),
+        (DosOutput, "dos/collinear", {}),
+        (BandsOutput, "bands/mgo", {}),
+        (ProjwfcOutput, "projwfc/mgo", {}),
+    ],
+)
+def test_cache_hit(tmp_path, output_cls, directory, kwargs):
+    """Loading from the cache gives the same `raw_outputs`, with the same types."""
+    cache = CacheConfig(tmp_path / "cache")
+    reference = output_cls.from_dir(FIXTURES / directory, **kwargs)
+
+    output_cls.from_dir(FIXTURES / directory, cache=cache, **kwargs)
+    (entry,) = (tmp_path / "cache").glob("*.npz")
+    cached = output_cls.from_dir(FIXTURES / directory, cache=cache, **kwargs)
+
+    np.testing.assert_equal(cached.raw_outputs, reference.raw_outputs)
+    assert repr(cached.raw_outputs) == repr(reference.raw_outputs)
+    assert list((tmp_path / "cache").glob("*.npz")) == [entry]
+
+
+def test_cache_key(tmp_path):
+    """The key changes with the options that change the `raw_outputs` and the files."""
+    run = tmp_path / "run"
+    shutil.copytree(FIXTURES / "pw" / "nospin", run)
+    cache = CacheConfig(tmp_path / "cache")
+    files = PwOutput.discover(run).files
+
+    key = cache.key(PwOutput, files, {"xml_mode": "fast"})
+    assert cache.key(PwOutput, files, {"xml_mode": "fast"}) == key
+    assert cache.key(PwOutput, files, {"xml_mode": "stream"}) != key
+    assert cache.key(DosOutput, files, {"xml_mode": "fast"}) != key
+
+    # The order of the `fields` does not matter
+    fields = cache.key(PwOutput, files, {"fields": ["fermi_energy", "structure"]})
+    assert (
+        cache.key(PwOutput, files, {"fields": ("structure", "fermi_energy")}) == fields
+    )
+    assert (
+        cache.key(PwOutput, files, {"fields": {"structure", "fermi_energy"}}) == fields
+    )
+    assert cache.key(PwOutput, files, {"fields": ["structure"]}) != fields
+
+    with (run / "pw.out").open("a") as handle:
+        handle.write("\n")
+    assert cache.key(PwOutput, files, {"xml_mode": "fast"}) != key
+
+    # `as_lists` is applied when the output is created, and shares the cache entry
+    as_lists = PwOutput.from_dir(run, cache=cache, as_lists=True)
+    output = PwOutput.from_dir(run, cache=cache)
+    assert len(list((tmp_path / "cache").glob("*.npz"))) == 1
+    assert isinstance(as_lists.get_output("structure")["cell"], list)
+    assert isinstance(output.get_output("structure")["cell"], np.ndarray)
+
+
+def test_cache_eviction(tmp_path):
+    """The least recently used entries are removed beyond `max_bytes`."""
+    cache = CacheConfig(tmp_path, max_bytes=None)
+    entries = []
+    for directory in (FIXTURES / "dos" / "collinear", FIXTURES / "dos" / "nospin"):
+        DosOutput.from_dir(directory, cache=cache)
+        key = cache.key(DosOutput, DosOutput.discover(directory).files, {})
+        entries.append(tmp_path / f"{key}.npz")
+    used, unused = entries
+    os.utime(used, ns=(0, 0))
+    os.utime(unused, ns=(1, 1))
+
+    # Loading an entry makes it the most recently used one
+    DosOutput.from_dir(FIXTURES / "dos" / "collinear", cache=cache)
+    bounded = CacheConfig(
+        tmp_path, max_bytes=used.stat().st_size + unused.stat().st_size
+    )
+    assert bounded.store("0" * 40, {})
+
+    assert used.exists()
+    assert not unused.exists()
+    assert (tmp_path / f"{'0' * 40}.npz").exists()
+
+
+def test_cache_eviction_scans(tmp_path, monkeypatch):
+    """The cache directory is only scanned without a total size, or beyond `max_bytes`."""
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or scandir(path))
+
+    cache = CacheConfig(tmp_path, max_bytes=1 << 20)
+    for number in range(5):
+        assert cache.store(f"{number:040d}", {"stdout": {"values": np.ones(100)}})
+    assert len(scans) == 1
+
+    entry_size = (tmp_path / f"{0:040d}.npz").stat().st_size
+    bounded = CacheConfig(tmp_path, max_bytes=6 * entry_size)
+    assert bounded.store(f"{5:040d}", {"stdout": {"values": np.ones(100)}})
+    assert len(scans) == 1
+    assert bounded.store(f"{6:040d}", {"stdout": {"values": np.ones(100)}})
+    assert len(scans) == 2
+    assert len(list(tmp_path.glob("*.npz"))) == 5
+    assert int((tmp_path / ".size").read_text()) == 5 * entry_size
+
+
+def test_cache_failed_write(tmp_path, monkeypatch):
+    """No temporary file is left when an entry cannot be moved into place."""
+
+    def replace(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", replace)
+    cache = CacheConfig(tmp_path)
+    with pytest.raises(OSError, match="disk full"):
+        cache.store("0" * 40, {"stdout": {"values": np.ones(2)}})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_invalid_entry(tmp_path):
+    """Corrupted entries are parsed again, and values that cannot be stored are skipped."""
+    cache = CacheConfig(tmp_path)
+    key = "0" * 40
+    (tmp_path / f"{key}.npz").write_bytes(b"not a zip file")
+
+    assert cache.load(key) is None
+    assert not (tmp_path / f"{key}.npz").exists()
+    assert not cache.store(key, {"stdout": {1: "integer keys"}})
+    assert cache.store(key, {"stdout": {"values": (1, np.float64(2.0), [np.ones(2)])}})
+    assert repr(cache.load(key)) == repr(
+        {"stdout": {"values": (1, np.float64(2.0), [np.ones(2)])}}
+    )
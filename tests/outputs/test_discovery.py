@@ -0,0 +1,112 @@
+"""Tests for locating the output files in a calculation directory."""
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs import DiscoveredFiles, DosOutput, PwOutput
+
+PW_FIXTURE = Path(__file__).parent / "fixtures" / "pw" / "nospin"
+
+
+@pytest.fixture
+def calculation(tmp_path):
+    """A pw.x directory with the usual `<outdir>/<prefix>.save` layout."""
+    save = tmp_path / "out" / "pwscf.save"
+    save.mkdir(parents=True)
+    shutil.copy(PW_FIXTURE / "data-file-schema.xml", save)
+    for index in range(5):
+        (save / f"wfc{index + 1}.dat").write_bytes(b"\0" * 16)
+
+    (tmp_path / "pw.in").write_text("&control\n/\n")
+    (tmp_path / "slurm-1234.txt").write_text("Program PWSCF mentioned in a job log\n")
+    shutil.copy(PW_FIXTURE / "pw.out", tmp_path / "aiida.out")
+
+    return tmp_path
+
+
+def test_discover(calculation):
+    discovered = PwOutput.discover(calculation)
+
+    assert discovered.files == {
+        "xml": calculation / "out" / "pwscf.save" / "data-file-schema.xml",
+        "stdout": calculation / "aiida.out",
+    }
+    assert PwOutput.from_files(**discovered.files).raw_outputs == (
+        PwOutput.from_dir(PW_FIXTURE).raw_outputs
+    )
+
+
+def test_discover_does_not_list_save_directories(calculation, monkeypatch):
+    listed = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        listed.append(Path(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    PwOutput.discover(calculation)
+
+    assert listed == [calculation, calculation / "out"]
+
+
+def test_discover_max_depth(calculation):
+    assert PwOutput.discover(calculation, max_depth=0).files["xml"] is None
+    assert PwOutput.from_dir(calculation, max_depth=0).raw_outputs.keys() == {"stdout"}
+
+
+def test_discover_header(calculation):
+    """Files are recognised from their header, with the filename hints tried first."""
+    (calculation / "aiida.out").rename(calculation / "stdout.txt")
+
+    assert PwOutput.discover(calculation).files["stdout"] == calculation / "stdout.txt"
+
+
+def test_discovered_files_roundtrip(calculation):
+    discovered = PwOutput.discover(calculation)
+
+    assert DiscoveredFiles.from_dict(discovered.to_dict()) == discovered
+
+
+def test_discover_invalid_directory(tmp_path):
+    with pytest.raises(ValueError, match="is not a valid directory"):
+        PwOutput.discover(tmp_path / "missing")
+
+
+def _compress(path, compress, suffix):
+    """Replace the file at `path` by its compressed version, with `suffix` appended."""
+    compressed = path.with_name(path.name + suffix)
+    compressed.write_bytes(compress(path.read_bytes()))
+    path.unlink()
+    return compressed
+
+
+def test_discover_compressed(calculation):
+    """Compressed files are found and parsed as their decompressed content."""
+    save = calculation / "out" / "pwscf.save"
+    xml = _compress(save / "data-file-schema.xml", lzma.compress, ".xz")
+    stdout = _compress(calculation / "aiida.out", gzip.compress, ".gz")
+
+    assert PwOutput.discover(calculation).files == {"xml": xml, "stdout": stdout}
+    assert PwOutput.from_dir(calculation).raw_outputs == (
+        PwOutput.from_dir(PW_FIXTURE).raw_outputs
+    )
+
+
+def test_compressed_detected_from_content(tmp_path):
+    """Compressed files are recognised from their first bytes, whatever their name."""
+    fixture = PW_FIXTURE.parent.parent / "dos" / "nospin"
+    dos = tmp_path / "prefix.dos"
+    dos.write_bytes(bz2.compress((fixture / "prefix.dos").read_bytes()))
+
+    np.testing.assert_equal(
+        DosOutput.from_files(dos=dos).raw_outputs,
+        DosOutput.from_files(dos=fixture / "prefix.dos").raw_outputs,
+    )
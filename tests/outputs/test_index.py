@@ -0,0 +1,113 @@
+"""Tests for the index of the files parsed by `from_dir`."""
+
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from qe_tools.outputs import (
+    BandsOutput,
+    CacheConfig,
+    DosOutput,
+    FingerprintIndex,
+    ProjwfcOutput,
+    PwOutput,
+    changed_since,
+)
+from qe_tools.outputs import _cache, _index
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def run(tmp_path):
+    shutil.copytree(FIXTURES / "pw" / "nospin", tmp_path / "run")
+    return tmp_path / "run"
+
+
+def test_changed_since(tmp_path, run):
+    """Runs are changed until they are recorded, and after a file changes."""
+    index = FingerprintIndex(tmp_path / "index.sqlite")
+    assert list(changed_since(index, [run])) == [run]
+
+    PwOutput.from_dir(run, index=index)
+    assert list(changed_since(index)) == []
+    assert list(changed_since(index, [run])) == []
+
+    with (run / "pw.out").open("a") as handle:
+        handle.write("\n")
+    assert list(changed_since(index, [run])) == [run]
+
+    PwOutput.from_dir(run, index=index)
+    assert list(changed_since(index, [run])) == []
+
+    (run / "new.txt").write_text("A new file in the directory")
+    assert list(changed_since(index, [run])) == [run]
+
+    PwOutput.from_dir(run, index=index)
+    (run / "pw.out").unlink()
+    assert list(changed_since(index, [run])) == [run]
+
+
+@pytest.mark.parametrize(
+    ("output_cls", "directory"),
+    [
+        (DosOutput, "dos/collinear"),
+        (BandsOutput, "bands/mgo"),
+        (ProjwfcOutput, "projwfc/mgo"),
+    ],
+)
+def test_changed_since_outputs(tmp_path, output_cls, directory):
+    """The runs of all the output classes are recorded by `from_dir`."""
+    index = FingerprintIndex(tmp_path / "index.sqlite")
+    output_cls.from_dir(FIXTURES / directory, index=index)
+    assert list(changed_since(index, [FIXTURES / directory])) == []
+
+
+@pytest.mark.parametrize("content_hash", [False, True])
+def test_changed_since_content_hash(tmp_path, run, content_hash):
+    """With `content_hash`, files with a new modification time but the same content are
+    not changed."""
+    index = FingerprintIndex(tmp_path / "index.sqlite", content_hash=content_hash)
+    PwOutput.from_dir(run, index=index)
+
+    os.utime(run / "pw.out", ns=(0, 0))
+    assert list(changed_since(index, [run])) == ([] if content_hash else [run])
+
+    content = (run / "pw.out").read_bytes()
+    (run / "pw.out").write_bytes(content[::-1])
+    os.utime(run / "pw.out", ns=(1, 1))
+    assert list(changed_since(index, [run])) == [run]
+
+
+def test_index_cache_key(tmp_path, run, monkeypatch):
+    """The cache key of files that did not change is computed from the recorded digests."""
+    cache = CacheConfig(tmp_path / "cache")
+    index = FingerprintIndex(tmp_path / "index.sqlite")
+    reference = PwOutput.from_dir(run, cache=cache, index=index)
+
+    def file_digest(path):
+        raise AssertionError(f"{path} was read again")
+
+    monkeypatch.setattr(_index, "_file_digest", file_digest)
+    monkeypatch.setattr(_cache, "_file_digest", file_digest)
+    cached = PwOutput.from_dir(run, cache=cache, index=index)
+
+    np.testing.assert_equal(cached.raw_outputs, reference.raw_outputs)
+    assert list(changed_since(index, [run])) == []
+
+
+def test_from_dirs_index(tmp_path, run):
+    """Worker processes of `from_dirs` record the runs in the same index."""
+    runs = [run, tmp_path / "copy"]
+    shutil.copytree(run, runs[1])
+    index = FingerprintIndex(tmp_path / "index.sqlite")
+
+    results = list(PwOutput.from_dirs(runs, workers=2, index=index))
+
+    assert all(result.error is None for result in results)
+    assert list(changed_since(index)) == []
+    rows = index._connect().execute("SELECT DISTINCT directory FROM files")
+    assert {Path(directory) for (directory,) in rows} == set(runs)
@@ -1,6 +1,8 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
+from glom import GlomError
 
 from qe_tools.outputs.pw import PwOutput
 
@@ -15,7 +17,7 @@ from qe_tools.outputs.pw import PwOutput
         "250521",
     ],
 )
-def test_default_xml(data_regression, fingerprint_heavy, xml_format):
+def test_default_xml(data_regression, fingerprint_heavy, to_jsonable, xml_format):
     """Test the default XML output of pw.x."""
 
     name = f"default_xml_{xml_format}"
@@ -27,7 +29,7 @@ def test_default_xml(data_regression, fingerprint_heavy, xml_format):
     data_regression.check(
         {
             "base_outputs": fingerprint_heavy(pw_out.get_output_dict()),
-            "raw_outputs": pw_out.raw_outputs,
+            "raw_outputs": to_jsonable(pw_out.raw_outputs),
         }
     )
 
@@ -68,7 +70,7 @@ def test_failed(data_regression, to_jsonable, fixture_directory):
     data_regression.check(
         {
             "base_outputs": to_jsonable(pw_out.get_output_dict()),
-            "raw_outputs": pw_out.raw_outputs,
+            "raw_outputs": to_jsonable(pw_out.raw_outputs),
         }
     )
 
@@ -127,3 +129,160 @@ def test_pymatgen_outputs(robust_data_regression_check):
             "fermi_energy": pw_out.get_output("fermi_energy", to="ase"),
         },
     )
+
+
+def test_fast_xml_mode():
+    """`xml_mode="fast"` gives the same outputs as the default validating mode."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_250521"
+
+    validated = PwOutput.from_dir(pw_directory)
+    fast = PwOutput.from_dir(pw_directory, xml_mode="fast")
+
+    np.testing.assert_equal(fast.raw_outputs, validated.raw_outputs)
+    assert fast.list_outputs() == validated.list_outputs()
+
+
+@pytest.mark.parametrize("name", ["collinear", "default_xml_230310"])
+def test_stream_xml_mode(name):
+    """`xml_mode="stream"` gives the same outputs, with band-structure data as arrays."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / name
+
+    validated = PwOutput.from_dir(pw_directory)
+    streamed = PwOutput.from_dir(pw_directory, xml_mode="stream")
+
+    ks_energies = streamed.raw_outputs["xml"]["output"]["band_structure"]["ks_energies"]
+    nks = validated.get_output("number_of_k_points")
+    assert ks_energies["k_point"]["$"].shape == (nks, 3)
+    assert ks_energies["eigenvalues"]["$"].shape[0] == nks
+
+    assert streamed.list_outputs() == validated.list_outputs()
+    for field in streamed.list_outputs():
+        np.testing.assert_equal(
+            streamed.get_output(field), validated.get_output(field), err_msg=field
+        )
+
+
+@pytest.mark.parametrize("xml_mode", ["validate", "fast"])
+def test_band_arrays(xml_mode):
+    """`band_arrays` changes the layout of `ks_energies`, not the outputs."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_240411"
+
+    reference = PwOutput.from_dir(pw_directory)
+    arrays = PwOutput.from_dir(pw_directory, xml_mode=xml_mode, band_arrays=True)
+
+    for field in reference.list_outputs():
+        np.testing.assert_equal(
+            arrays.get_output(field), reference.get_output(field), err_msg=field
+        )
+
+
+def test_array_outputs():
+    """Structure, forces and stress are arrays by default, and lists with `as_lists`."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_250521"
+
+    pw_out = PwOutput.from_dir(pw_directory)
+    nat = pw_out.get_output("number_of_atoms")
+
+    assert pw_out.get_output("forces").shape == (nat, 3)
+    assert pw_out.get_output("stress").shape == (3, 3)
+    structure = pw_out.get_output("structure")
+    assert structure["cell"].shape == (3, 3)
+    assert structure["positions"].shape == (nat, 3)
+
+    as_lists = PwOutput.from_dir(pw_directory, as_lists=True)
+
+    for name in ("forces", "stress"):
+        assert as_lists.get_output(name) == pw_out.get_output(name).tolist()
+    assert as_lists.get_output("structure")["positions"] == (
+        structure["positions"].tolist()
+    )
+    assert isinstance(as_lists.outputs.forces, list)
+
+
+def test_memoised_outputs():
+    """Outputs are evaluated once per instance, until `raw_outputs` is reassigned."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_250521"
+    pw_out = PwOutput.from_dir(pw_directory)
+
+    eigenvalues = pw_out.get_output("eigenvalues")
+    assert pw_out.get_output("eigenvalues") is eigenvalues
+    assert not eigenvalues.flags.writeable
+
+    # Each failed lookup raises a new error, whose traceback does not grow
+    errors = []
+    for _ in range(2):
+        with pytest.raises(GlomError) as error:
+            pw_out.get_output("fermi_energy_up")
+        errors.append(error)
+    assert errors[0].value is not errors[1].value
+    assert len(errors[0].traceback) == len(errors[1].traceback)
+
+    # The arrays of `raw_outputs` are not made read-only
+    pw_out.prefetch()
+    arrays = [pw_out.raw_outputs]
+    while arrays:
+        value = arrays.pop()
+        if isinstance(value, dict):
+            arrays.extend(value.values())
+        elif isinstance(value, list):
+            arrays.extend(value)
+        elif isinstance(value, np.ndarray):
+            assert value.flags.writeable
+
+    pw_out.raw_outputs = PwOutput.from_dir(pw_directory).raw_outputs
+    assert pw_out.get_output("eigenvalues") is not eigenvalues
+    np.testing.assert_equal(pw_out.get_output("eigenvalues"), eigenvalues)
+
+
+def test_prefetch():
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_250521"
+    pw_out = PwOutput.from_dir(pw_directory)
+
+    pw_out.prefetch(["total_energy", "forces", "fermi_energy_up"])
+    assert set(pw_out._output_cache) == {"total_energy", "forces", "fermi_energy_up"}
+
+    pw_out.prefetch()
+    pw_out.raw_outputs = {}
+    assert "total_energy" not in pw_out.list_outputs()
+
+
+@pytest.mark.parametrize("xml_mode", ["validate", "fast", "stream"])
+def test_selected_fields(xml_mode):
+    """Decoding only the XML needed for `fields` gives the same values for those fields."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_250521"
+    fields = ["total_energy", "forces", "alat", "job_done", "parameters.ecutwfc"]
+
+    full = PwOutput.from_dir(pw_directory)
+    selected = PwOutput.from_dir(pw_directory, xml_mode=xml_mode, fields=fields)
+
+    assert "band_structure" not in selected.raw_outputs["xml"]["output"]
+    assert "eigenvalues" not in selected.list_outputs()
+    for field in ["total_energy", "forces", "alat", "job_done"]:
+        np.testing.assert_equal(selected.get_output(field), full.get_output(field))
+    assert selected.get_output("parameters") == {
+        "ecutwfc": full.get_output("parameters")["ecutwfc"]
+    }
+
+
+def test_selected_fields_stdout():
+    """The body of the stdout is only parsed if `fields` includes a stdout output."""
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_230310"
+    full = PwOutput.from_dir(pw_directory)
+
+    selected = PwOutput.from_dir(pw_directory, fields=["total_energy"])
+    assert selected.raw_outputs["stdout"] == {
+        key: full.raw_outputs["stdout"][key]
+        for key in ("code_version", "wall_time_seconds")
+    }
+
+    selected = PwOutput.from_dir(pw_directory, fields=["highest_occupied_level"])
+    assert selected.get_output("highest_occupied_level") == full.get_output(
+        "highest_occupied_level"
+    )
+
+
+def test_selected_fields_unknown():
+    pw_directory = Path(__file__).parent / "fixtures" / "pw" / "default_xml_250521"
+
+    with pytest.raises(ValueError, match="not an output of `PwOutput`"):
+        PwOutput.from_dir(pw_directory, fields=["parameters.nonexistent"])
@@ -1,9 +1,12 @@
 import json
+import os
+import shutil
 from pathlib import Path
 
 import pytest
 
-from qe_tools.extractors import extract
+from qe_tools import extractors
+from qe_tools.extractors import _extract, extract, extract_many
 
 
 @pytest.mark.parametrize("parser", ["pw", "cp"])
@@ -12,3 +15,52 @@ def test_input_dict_extraction(parser: str):
     filepath = datadir / f"{parser}.in"
     refpath = datadir / "extractor_ref" / f"{parser}.json"
     assert extract(filepath.as_posix(), parser) == json.loads(refpath.read_text())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_extract_many(tmp_path, workers):
+    datadir = Path(__file__).resolve().parent / "data"
+    paths = [datadir / "pw.in", datadir / "non_matching_species.in", tmp_path]
+    sink = tmp_path / "extracted.jsonl"
+
+    results = {
+        result.path: result
+        for result in extract_many(paths, "pw", workers=workers, chunksize=2, sink=sink)
+    }
+
+    assert results.keys() == set(paths)
+    assert results[paths[0]].data == extract(paths[0].as_posix(), "pw")
+    assert "InputValidationError" in results[paths[1]].error
+    assert "PathIsNotAFileError" in results[paths[2]].error
+    records = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert {record["path"]: record["error"] is None for record in records} == {
+        str(path): path == paths[0] for path in paths
+    }
+
+
+def _extract_or_die(parser, path):
+    if path.name == "die.in":
+        os._exit(1)
+    return _extract(parser, path)
+
+
+def test_extract_many_worker_dies(tmp_path, monkeypatch):
+    datadir = Path(__file__).resolve().parent / "data"
+    paths = [tmp_path / f"{index}.in" for index in range(12)]
+    for path in paths:
+        shutil.copy(datadir / "pw.in", path)
+    paths.insert(5, tmp_path / "die.in")
+    sink = tmp_path / "extracted.jsonl"
+    monkeypatch.setattr(extractors, "_extract", _extract_or_die)
+
+    results = {
+        result.path: result
+        for result in extract_many(paths, "pw", workers=2, chunksize=1, sink=sink)
+    }
+
+    assert results.keys() == set(paths)
+    assert "BrokenProcessPool" in results[tmp_path / "die.in"].error
+    # Only the files in flight when the worker died fail with it
+    assert sum(not result.ok for result in results.values()) <= 4
+    records = [json.loads(line) for line in sink.read_text().splitlines()]
+    assert {record["path"] for record in records} == {str(path) for path in paths}
@@ -6,7 +6,13 @@ import unittest
 import numpy as np
 
 from qe_tools.exceptions import InputValidationError
-from qe_tools.inputs import CpInputFile, PwInputFile
+from qe_tools.inputs import (
+    CpInputFile,
+    PwInputFile,
+    parse_atomic_positions,
+    parse_namelists,
+    split_sections,
+)
 
 # Folder with input file examples
 data_folder = os.path.join(os.path.split(os.path.abspath(__file__))[0], "data")
@@ -300,6 +306,21 @@ class PwTest(CustomTestCase):
         with self.assertRaises(InputValidationError):
             self.singletest(label="non_matching_species")
 
+    def test_lazy_cards(self):
+        """The cards are parsed when accessed, or right away with `eager=True`."""
+        with open(os.path.join(data_folder, "non_matching_species.in")) as handle:
+            content = handle.read()
+
+        pw_input = PwInputFile(content)
+        self.assertEqual(pw_input.namelists["SYSTEM"]["ibrav"], 0)
+        self.assertNotIn("atomic_species", vars(pw_input))
+        self.assertEqual(pw_input.k_points["type"], "automatic")
+        with self.assertRaises(InputValidationError):
+            pw_input.atomic_species
+
+        with self.assertRaises(InputValidationError):
+            PwInputFile(content, eager=True)
+
     def test_non_matching_species_no_validation(self):
         self.singletest(label="non_matching_species", validate_species_names=False)
 
@@ -319,6 +340,98 @@ class PwTest(CustomTestCase):
         # Run the test
         mytest()
 
+    def test_namelist_tokens(self):
+        """Quotes, comments, commas, `d` exponents and array keys in namelists."""
+        txt = (
+            "&control\n"
+            "  title = 'a!b', prefix=\"it's\" ! a 'comment'\n"
+            "  conv_thr = 1.0d-8, tprnfor = .TRUE.\n"
+            "/\n"
+            "&SYSTEM\n"
+            "  starting_magnetization(1) = -0.5\n"
+            "  nat = 2 ,ecutwfc=30.\n"
+            "/\n"
+        )
+        self.assertEqual(
+            parse_namelists(txt),
+            {
+                "CONTROL": {
+                    "title": "a!b",
+                    "prefix": "it's",
+                    "conv_thr": 1e-8,
+                    "tprnfor": True,
+                },
+                "SYSTEM": {
+                    "starting_magnetization(1)": -0.5,
+                    "nat": 2,
+                    "ecutwfc": 30.0,
+                },
+            },
+        )
+
+        with self.assertRaisesRegex(ValueError, "is not closed"):
+            parse_namelists("&control\n  title = 'a\n/\n")
+
+    def test_atomic_positions_arrays(self):
+        """Large cards are read as arrays, and cards with comments as before."""
+        lines = [f"Si{i % 3} {i}.5 -{i}.75 .25 1 0 1\n" for i in range(3000)]
+        txt = "ATOMIC_POSITIONS {crystal}\n" + "".join(lines) + "K_POINTS gamma\n"
+
+        result = parse_atomic_positions(txt, arrays=True)
+        self.assertEqual(result["units"], "crystal")
+        self.assertEqual(result["names"][:4], ["Si0", "Si1", "Si2", "Si0"])
+        np.testing.assert_array_equal(
+            result["positions"][2999], [2999.5, -2999.75, 0.25]
+        )
+        np.testing.assert_array_equal(
+            result["fixed_coords"], [[False, True, False]] * 3000
+        )
+
+        positions = parse_atomic_positions(txt)
+        self.assertEqual(positions["positions"][1], [1.5, -1.75, 0.25])
+        self.assertEqual(positions["fixed_coords"][1], [False, True, False])
+
+        commented = parse_atomic_positions(txt.replace("1 0 1\n", "1 0 1\n# x\n", 1))
+        self.assertEqual(commented["positions"], positions["positions"])
+
+    def test_split_sections(self):
+        """Namelists and cards are split in one pass, with the options of the cards."""
+        txt = (
+            "&control\n"
+            "  title = 'ATOMIC_SPECIES'\n"
+            "/\n"
+            "ATOMIC_SPECIES\n"
+            "Si 28.0855 Si.pbe-rrkj.UPF\n"
+            "k_points { automatic }\n"
+            "2 2 2 0 0 0\n"
+            "&system\n"
+            "  ibrav = 2\n"
+            "/\n"
+            "ATOMIC_POSITIONS crystal\n"
+            "Si 0.0 0.0 0.0\n"
+        )
+
+        namelists, cards = split_sections(txt)
+
+        self.assertEqual(
+            namelists,
+            "&control\n  title = 'ATOMIC_SPECIES'\n/\n&system\n  ibrav = 2\n/\n",
+        )
+        self.assertEqual(
+            cards,
+            {
+                "ATOMIC_SPECIES": (
+                    None,
+                    "ATOMIC_SPECIES\nSi 28.0855 Si.pbe-rrkj.UPF\n",
+                ),
+                "K_POINTS": ("automatic", "k_points { automatic }\n2 2 2 0 0 0\n"),
+                "ATOMIC_POSITIONS": (
+                    "crystal",
+                    "ATOMIC_POSITIONS crystal\nSi 0.0 0.0 0.0\n",
+                ),
+            },
+        )
+
     ##Wyckoff position input (crystal_sg) not supported by this parser
     # def test_lattice_wyckoff_sio2(self):
     #   self.singletest(label='lattice_wyckoff_sio2')